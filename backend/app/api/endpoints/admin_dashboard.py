@@ -4,6 +4,11 @@ from typing import Dict, Any, List
 from ...core.admin_auth import get_current_admin
 from ...core.database import db_manager
 from ...core.cache import api_cache
+from ...core.image_cache import image_cache
+from ...core.search_index import catalog_index
+from ...services.cache_warmer import access_tracker
+from scraper.parsing import parse_cache
+from scraper.extractors.result_cache import extraction_cache
 import os
 import psutil
 import time
@@ -54,7 +59,13 @@ async def get_overview_stats(current_admin: str = Depends(get_current_admin)):
         # System Stats
         process = psutil.Process(os.getpid())
         stats["system"]["uptime"] = int(time.time() - process.create_time())
-        stats["system"]["cache_keys"] = len(api_cache.cache) if hasattr(api_cache, 'cache') else 0
+        stats["system"]["cache_keys"] = api_cache.memory.stats()["keys"]
+        stats["system"]["memory_cache"] = api_cache.memory.stats()
+        stats["system"]["cache_warmer"] = access_tracker.stats()
+        stats["system"]["parse_cache"] = parse_cache.stats()
+        stats["system"]["extractor_cache"] = extraction_cache.stats()
+        stats["system"]["image_cache"] = image_cache.stats()
+        stats["system"]["search_index"] = catalog_index.stats()
         
         return {
             "success": True,
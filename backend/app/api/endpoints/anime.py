@@ -1,5 +1,5 @@
 import base64
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Response
 from typing import List, Dict, Any
 from scraper.mycima import scraper as mycima_scraper
 from scraper.anime4up import anime4up_scraper
@@ -13,9 +13,9 @@ logger = logging.getLogger("api.anime")
 @router.get("/home")
 async def get_anime_home():
     cache_key = "anime_home_v2"
-    cached = await api_cache.get(cache_key)
+    cached = await api_cache.get_raw(cache_key)
     if cached:
-        return cached
+        return Response(content=cached, media_type="application/json")
     
     try:
         # Fetch data from ArabSeed 'cartoon-series' category
@@ -38,9 +38,9 @@ async def get_anime_home():
 @router.get("/list")
 async def get_anime_list(page: int = 1):
     cache_key = f"anime_list_v2_{page}"
-    cached = await api_cache.get(cache_key)
+    cached = await api_cache.get_raw(cache_key)
     if cached:
-        return cached
+        return Response(content=cached, media_type="application/json")
     
     try:
         # Fetch pagination from ArabSeed
@@ -54,9 +54,9 @@ async def get_anime_list(page: int = 1):
 @router.get("/search")
 async def search_anime(q: str):
     cache_key = f"anime_search_v2_{q}"
-    cached = await api_cache.get(cache_key)
+    cached = await api_cache.get_raw(cache_key)
     if cached:
-        return cached
+        return Response(content=cached, media_type="application/json")
     
     try:
         # User wants anime search. 
@@ -1,9 +1,10 @@
-from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi import APIRouter, HTTPException, Query, Depends, Response
 from typing import List, Optional
 from ...models.schemas import CourseProgressUpdate
 from ...core.cache import api_cache
 from ...core.database import db_manager
 from scraper.courses import courses_scraper
+import copy
 import logging
 
 router = APIRouter(prefix="/courses", tags=["courses"])
@@ -12,8 +13,8 @@ logger = logging.getLogger("api.courses")
 @router.get("/latest")
 async def get_latest_courses(page: int = 1):
     cache_key = f"courses_latest_{page}"
-    cached = await api_cache.get(cache_key)
-    if cached: return cached
+    cached = await api_cache.get_raw(cache_key)
+    if cached: return Response(content=cached, media_type="application/json")
     
     try:
         items = await courses_scraper.fetch_latest_courses(page=page)
@@ -26,8 +27,8 @@ async def get_latest_courses(page: int = 1):
 @router.get("/category/{cat_id}")
 async def get_category_courses(cat_id: str, page: int = 1):
     cache_key = f"courses_cat_{cat_id}_{page}"
-    cached = await api_cache.get(cache_key)
-    if cached: return cached
+    cached = await api_cache.get_raw(cache_key)
+    if cached: return Response(content=cached, media_type="application/json")
     
     try:
         items = await courses_scraper.fetch_category_courses(cat_id, page=page)
@@ -54,6 +55,8 @@ async def get_course_details(safe_id: str, user_id: Optional[str] = None):
             raise HTTPException(status_code=500, detail="Failed to fetch course details")
 
     if user_id and details:
+        # The cached object is shared through the memory tier; annotate a copy
+        details = copy.deepcopy(details)
         async with db_manager.get_connection() as db:
             cursor = await db.execute(
                 "SELECT lesson_id, completed FROM course_progress WHERE user_id = ? AND course_id = ?",
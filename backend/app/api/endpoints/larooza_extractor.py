@@ -3,16 +3,55 @@ Larooza Extractor API Endpoint
 استخراج سيرفرات Larooza وروابط المشاهدة المباشرة
 """
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from typing import List, Dict, Optional
 import logging
 import asyncio
+import json
 
 from scraper.engine import scraper as larooza_scraper
 from scraper.extractors.engine import ExtractorEngine
+from scraper.extractors.host_stats import host_stats
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/larooza", tags=["larooza"])
 
+async def _fetch_video_details(vid: str) -> Dict:
+    """Fetches video details, trying several Larooza domains until servers are found."""
+    # بناء الرابط الكامل (تجربة عدة نطاقات لضمان النتيجة)
+    base_domains = ["https://larooza.top", "https://q.larozavideo.net", "https://larooza.hair"]
+    details = None
+    
+    for domain in base_domains:
+        video_url = f"{domain}/video.php?vid={vid}"
+        import base64
+        safe_id = base64.urlsafe_b64encode(video_url.encode()).decode().strip('=')
+        
+        details = await larooza_scraper.fetch_details(safe_id)
+        if details and details.get('servers'):
+            break
+    
+    if not details:
+        raise HTTPException(status_code=404, detail="Video or Servers not found")
+    return details
+
+def _server_info(name: str, embed_url: str, result: Optional[dict]) -> Dict:
+    info = {
+        "name": name,
+        "embed_url": embed_url,
+        "direct_url": None,
+        "status": "failed",
+        "type": "embed"
+    }
+    if result and result.get('url'):
+        info.update({
+            "direct_url": result['url'],
+            "status": "success",
+            "type": result.get('type', 'hls'),
+            "headers": result.get('headers', {})
+        })
+    return info
+
 @router.get("/servers")
 async def get_video_servers(
     vid: str = Query(..., description="Video ID from Larooza (e.g., Yg22o3HXS)")
@@ -22,22 +61,7 @@ async def get_video_servers(
     ضمان السرعة عبر إرجاع السيرفرات فوراً
     """
     try:
-        # بناء الرابط الكامل (تجربة عدة نطاقات لضمان النتيجة)
-        base_domains = ["https://larooza.top", "https://q.larozavideo.net", "https://larooza.hair"]
-        details = None
-        video_url = ""
-        
-        for domain in base_domains:
-            video_url = f"{domain}/video.php?vid={vid}"
-            import base64
-            safe_id = base64.urlsafe_b64encode(video_url.encode()).decode().strip('=')
-            
-            details = await larooza_scraper.fetch_details(safe_id)
-            if details and details.get('servers'):
-                break
-        
-        if not details:
-            raise HTTPException(status_code=404, detail="Video or Servers not found")
+        details = await _fetch_video_details(vid)
         
         # تجهيز قائمة السيرفرات
         all_servers = []
@@ -71,7 +95,7 @@ async def get_video_servers(
             return info
 
         # تشغيل الاستخراج لجميع السيرفرات معاً لضمان السرعة
-        tasks = [process_server(s) for s in details.get('servers', [])]
+        tasks = [process_server(s) for s in host_stats.order_servers(details.get('servers', []))]
         all_servers = await asyncio.gather(*tasks)
         
         working_servers = [s for s in all_servers if s['status'] == 'success']
@@ -96,9 +120,58 @@ async def get_video_servers(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/first-playable")
+async def get_first_playable(
+    vid: str = Query(..., description="Video ID from Larooza (e.g., Yg22o3HXS)"),
+    stream: Optional[str] = Query(None, pattern="^(ndjson|sse)$", description="Stream every server result as it resolves"),
+    timeout: float = Query(20.0, ge=1.0, le=60.0, description="Overall resolution budget in seconds")
+):
+    """
+    إرجاع أول سيرفر يعمل فور استخراجه بدلاً من انتظار جميع السيرفرات
+    Servers are resolved concurrently (best hosts first); the rest keep
+    resolving in the background and fill the extraction cache.
+    """
+    details = await _fetch_video_details(vid)
+    names = {}
+    for server in details.get('servers', []):
+        if server.get('url'):
+            names.setdefault(server['url'], server.get('name', 'Unknown Server'))
+    if not names:
+        raise HTTPException(status_code=404, detail="Video or Servers not found")
+
+    if stream:
+        return StreamingResponse(
+            _stream_servers(names, timeout, stream),
+            media_type="text/event-stream" if stream == "sse" else "application/x-ndjson",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+
+    async for embed_url, result in ExtractorEngine.race(names, timeout=timeout):
+        if result and result.get('url'):
+            return {
+                "success": True,
+                "title": details.get('title', ''),
+                "poster": details.get('poster', ''),
+                "server": _server_info(names[embed_url], embed_url, result),
+                "total_count": len(names)
+            }
+    raise HTTPException(status_code=404, detail="No playable server found")
+
+async def _stream_servers(names: Dict[str, str], timeout: float, fmt: str):
+    working = 0
+    async for embed_url, result in ExtractorEngine.race(names, timeout=timeout):
+        info = _server_info(names[embed_url], embed_url, result)
+        working += info["status"] == "success"
+        payload = json.dumps(info, ensure_ascii=False)
+        yield f"event: server\ndata: {payload}\n\n" if fmt == "sse" else payload + "\n"
+    summary = json.dumps({"done": True, "working_count": working, "total_count": len(names)})
+    yield f"event: done\ndata: {summary}\n\n" if fmt == "sse" else summary + "\n"
+
+
 @router.get("/extract")
 async def extract_direct_url(
-    url: str = Query(..., description="Embed URL to extract direct video URL from")
+    url: str = Query(..., description="Embed URL to extract direct video URL from"),
+    refresh: bool = Query(False, description="Bypass the extraction cache")
 ):
     """
     استخراج الرابط المباشر من رابط embed
@@ -108,7 +181,7 @@ async def extract_direct_url(
     try:
         logger.info(f"🔍 Extracting: {url}")
         
-        result = await ExtractorEngine.extract(url)
+        result = await ExtractorEngine.extract(url, refresh=refresh)
         
         if not result or not result.get('url'):
             raise HTTPException(status_code=404, detail="Could not extract direct URL")
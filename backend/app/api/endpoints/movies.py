@@ -1,84 +1,142 @@
 import base64
-from fastapi import APIRouter, HTTPException, Query
-from typing import List
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 from datetime import datetime
 import asyncio
+import json
 from ...models.schemas import MovieBase, ContentDetails
-from ...core.cache import api_cache
+from ...core.cache import api_cache, refresher
+from ...core.config import settings
+from ...core.response_cache import CachedResponse, response_cache, encode_json
+from ...core.search_index import catalog_index, normalize_arabic
 from scraper.engine import scraper
 from scraper.mycima import scraper as mycima_scraper
 from scraper.anime4up import anime4up_scraper
+from scraper.utils import SingleFlight
 from ...core.scraper_settings import scraper_settings
+from ...core.scraper_manager import scraper_manager, CircuitOpenError
+from ...services.cache_warmer import access_tracker
 import logging
 
 router = APIRouter(prefix="/movies", tags=["movies"])
 logger = logging.getLogger("api.movies")
 
+# Concurrent cache misses for the same key share one scrape
+endpoint_flight = SingleFlight("movies_endpoints")
+
+async def _serve_swr(cache_key: str, build: Callable[[], Awaitable[Optional[CachedResponse]]]) -> Optional[CachedResponse]:
+    """
+    Stale-while-revalidate: fresh entries are returned as-is, entries past
+    their soft TTL are returned immediately while one background refresh
+    runs, and only missing or hard-expired entries block on the scrape.
+    """
+    loader = lambda: endpoint_flight.do(cache_key, build)
+    access_tracker.record(cache_key, loader, lambda: response_cache.stale_deadline(cache_key))
+    cached, stale = await response_cache.get_with_state(cache_key)
+    if cached is None:
+        return await loader()
+    if stale:
+        refresher.schedule(cache_key, loader)
+    return cached
+
 @router.get("/latest", response_model=List[MovieBase])
-async def get_latest(page: int = 1):
+async def get_latest(request: Request, page: int = 1):
     cache_key = f"latest_{page}"
-    cached = await api_cache.get(cache_key)
-    if cached:
-        return cached
-    
+    cached = await _serve_swr(cache_key, lambda: _build_latest(cache_key, page))
+    return cached.to_response(request)
+
+# A partial answer is refreshed soon even if its stragglers never deliver
+PARTIAL_STALE_AFTER = 60
+
+def _dedupe_by_title(sources: List[Optional[list]]) -> list:
+    seen = set()
+    merged = []
+    for source in sources:
+        for item in (source or []):
+            t = item.get('title', '').strip().lower()
+            if t and t not in seen:
+                merged.append(item)
+                seen.add(t)
+    return merged
+
+async def _aggregate(cache_key: str, calls: Dict[str, Callable[[], Awaitable[list]]], merge: Callable[[Dict[str, Any]], list],
+                     ttl: int, stale_after: int, empty_is_failure: bool = False) -> Optional[CachedResponse]:
+    """
+    Queries sources through their circuit breakers within the aggregate
+    latency budget. If some sources are still running when it expires,
+    the merged results gathered so far are cached (with a short soft TTL)
+    and returned, and the cache entry is rewritten once the stragglers
+    finish.
+    """
+    results, stragglers = await scraper_manager.gather(calls, settings.AGGREGATE_LATENCY_BUDGET, empty_is_failure)
+    items = merge(results)
+    if not items and stragglers is not None:
+        # Nothing to show yet: waiting is better than an empty page
+        results.update(await stragglers)
+        items, stragglers = merge(results), None
+    if not items:
+        return None
+
+    cached = await response_cache.set(
+        cache_key, encode_json(List[MovieBase], items), ttl_seconds=ttl,
+        stale_after=stale_after if stragglers is None else min(stale_after, PARTIAL_STALE_AFTER)
+    )
+
+    if stragglers is not None:
+        async def fill_in():
+            results.update(await stragglers)
+            full = merge(results)
+            if full and full != items:
+                await response_cache.set(cache_key, encode_json(List[MovieBase], full), ttl_seconds=ttl, stale_after=stale_after)
+        refresher.schedule(f"{cache_key}:stragglers", fill_in)
+    return cached
+
+def _source_items(results: Dict[str, Any], name: str, label: str) -> list:
+    """A source's items, logging why there are none."""
+    result = results.get(name)
+    if isinstance(result, CircuitOpenError):
+        logger.info(f"⚡ {label} skipped: {result}")
+    elif isinstance(result, Exception):
+        logger.warning(f"❌ {label}: {result}")
+    elif result:
+        logger.info(f"✅ {label}: {len(result)} items")
+        return result
+    elif name in results:
+        logger.warning(f"❌ {label}: No items returned")
+    return []
+
+async def _build_latest(cache_key: str, page: int) -> CachedResponse:
     try:
         # Get enabled scrapers based on settings
         enabled_sources = scraper_settings.get_enabled_sources()
         logger.info(f"Fetching latest with enabled sources: {enabled_sources}")
         
-        tasks = []
-        source_map = {}
-        
-        # Build tasks for enabled scrapers
+        calls = {}
+        # Build calls for enabled scrapers (keyed by ScraperManager name)
         if "larooza" in enabled_sources:
-            tasks.append(scraper.fetch_home(page=page))
-            source_map[len(tasks) - 1] = "larooza"
-        
+            calls["larooza"] = lambda: scraper.fetch_home(page=page)
         if "arabseed" in enabled_sources:
-            tasks.append(mycima_scraper.fetch_home(page=page))
-            source_map[len(tasks) - 1] = "arabseed"
+            calls["mycima"] = lambda: mycima_scraper.fetch_home(page=page)
         
         # If no sources enabled, return error
-        if not tasks:
+        if not calls:
             logger.error("No scrapers enabled!")
             raise HTTPException(status_code=503, detail="No content sources are currently enabled")
-        
-        # Fetch in parallel
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Process results with fallback
-        all_items = []
-        working_sources = []
-        
-        for idx, result in enumerate(results):
-            source_name = source_map.get(idx, "unknown")
-            if not isinstance(result, Exception) and result:
-                all_items.extend(result)
-                working_sources.append(source_name)
-                logger.info(f"✅ {source_name}: {len(result)} items")
-            else:
-                error_msg = str(result) if isinstance(result, Exception) else "No items returned"
-                logger.warning(f"❌ {source_name}: {error_msg}")
-        
-        # If all sources failed
-        if not all_items:
+
+        def merge(results: Dict[str, Any]) -> list:
+            sources = [_source_items(results, "larooza", "larooza"), _source_items(results, "mycima", "arabseed")]
+            # Merge and deduplicate if enabled
+            if scraper_settings.should_merge_results() and sum(1 for src in sources if src) > 1:
+                return _dedupe_by_title(sources)
+            return [item for src in sources for item in src]
+
+        cached = await _aggregate(cache_key, calls, merge, ttl=6 * 3600, stale_after=1800, empty_is_failure=True)
+        if cached is None:
+            # If all sources failed
             logger.error("All enabled scrapers failed to return content")
             raise HTTPException(status_code=503, detail="All content sources are currently unavailable")
-        
-        # Merge and deduplicate if enabled
-        if scraper_settings.should_merge_results() and len(working_sources) > 1:
-            seen = set()
-            merged = []
-            for item in all_items:
-                t = item.get('title', '').strip().lower()
-                if t and t not in seen:
-                    merged.append(item)
-                    seen.add(t)
-            all_items = merged
-        
-        if all_items:
-            await api_cache.set(cache_key, all_items, ttl_seconds=1800)
-            return all_items
+        return cached
             
     except HTTPException:
         raise
@@ -88,37 +146,26 @@ async def get_latest(page: int = 1):
     raise HTTPException(status_code=500, detail="Failed to fetch latest content")
 
 @router.get("/category/{cat_id}", response_model=List[MovieBase])
-async def get_category(cat_id: str, page: int = 1):
+async def get_category(request: Request, cat_id: str, page: int = 1):
     cache_key = f"cat_{cat_id}_{page}"
-    cached = await api_cache.get(cache_key)
-    if cached:
-        return cached
-        
-    try:
-        # Fetch from both in parallel
-        results = await asyncio.gather(
-            scraper.fetch_category(cat_id, page=page),
-            mycima_scraper.fetch_category(cat_id, page=page),
-            return_exceptions=True
-        )
-        
-        larooza_items = results[0] if not isinstance(results[0], Exception) else []
-        arabseed_items = results[1] if not isinstance(results[1], Exception) else []
+    cached = await _serve_swr(cache_key, lambda: _build_category(cache_key, cat_id, page))
+    return cached.to_response(request)
 
-        seen = set()
-        merged = []
-        
+async def _build_category(cache_key: str, cat_id: str, page: int) -> CachedResponse:
+    try:
+        # Fetch from both in parallel. ArabSeed is only asked for categories
+        # it has: an empty answer counts against its circuit breaker
+        calls = {"larooza": lambda: scraper.fetch_category(cat_id, page=page)}
+        if mycima_scraper.category_path(cat_id):
+            calls["mycima"] = lambda: mycima_scraper.fetch_category(cat_id, page=page)
         # Prioritize Larooza as primary for categories
-        for source in [larooza_items, arabseed_items]:
-            for item in (source or []):
-                t = item.get('title', '').strip().lower()
-                if t and t not in seen:
-                    merged.append(item)
-                    seen.add(t)
-                    
-        if merged:
-            await api_cache.set(cache_key, merged, ttl_seconds=3600)
-            return merged
+        merge = lambda results: _dedupe_by_title([
+            _source_items(results, "larooza", f"larooza category {cat_id}"),
+            _source_items(results, "mycima", f"arabseed category {cat_id}"),
+        ])
+        cached = await _aggregate(cache_key, calls, merge, ttl=12 * 3600, stale_after=3600, empty_is_failure=True)
+        if cached is not None:
+            return cached
             
     except Exception as e:
         logger.error(f"Error fetching category {cat_id}: {e}")
@@ -126,59 +173,154 @@ async def get_category(cat_id: str, page: int = 1):
     raise HTTPException(status_code=500, detail=f"Failed to fetch category {cat_id}")
 
 @router.get("/search", response_model=List[MovieBase])
-async def search(q: str):
-    cache_key = f"global_search_{q}"
-    cached = await api_cache.get(cache_key)
-    if cached:
-        return cached
-        
+async def search(request: Request, q: str):
+    """
+    Answers from the local catalog index; upstream sites are only searched
+    when the index has fewer than SEARCH_INDEX_MIN_RESULTS matches, and
+    their results top up the local ones.
+    """
+    q = q.strip()
+    cache_key = f"local_{_search_cache_key(q)}"
+    cached = await _serve_swr(cache_key, lambda: _build_local_search(cache_key, q))
+    return cached.to_response(request) if cached else []
+
+SEARCH_LIMIT = 60
+
+def _search_cache_key(q: str) -> str:
+    # Whitespace, diacritic and alef/hamza variants of a query share one entry
+    return f"global_search_{normalize_arabic(q)}"
+
+def _local_search(q: str) -> list:
+    """Indexed items matching `q` from the sources that are switched on."""
+    return catalog_index.search(q, SEARCH_LIMIT, sources=scraper_settings.get_enabled_sources())
+
+def _search_calls(q: str) -> Dict[str, Callable[[], Awaitable[list]]]:
+    return {
+        "larooza": lambda: scraper.search(q),
+        "mycima": lambda: mycima_scraper.search(q),
+        "anime4up": lambda: anime4up_scraper.search(q),
+    }
+
+SEARCH_LABELS = {"larooza": "Larooza search", "mycima": "ArabSeed search", "anime4up": "Anime search"}
+
+def _merge_search(q: str, results: Dict[str, Any]) -> list:
+    larooza_res = _source_items(results, "larooza", SEARCH_LABELS["larooza"])
+    arabseed_res = _source_items(results, "mycima", SEARCH_LABELS["mycima"])
+    anime_res = _source_items(results, "anime4up", SEARCH_LABELS["anime4up"])
+    # Merge and deduplicate
+    is_anime = any(k in q.lower() for k in ['انمي', 'أنمي', 'anime', 'episode', 'حلقة'])
+    sources = [anime_res, larooza_res, arabseed_res] if is_anime else [larooza_res, arabseed_res, anime_res]
+    return _dedupe_by_title(sources)[:SEARCH_LIMIT]
+
+# Index answers follow the crawler: they are rebuilt soon after new items land
+LOCAL_SEARCH_TTL = 3600
+LOCAL_SEARCH_STALE_AFTER = 300
+
+async def _build_local_search(cache_key: str, q: str) -> Optional[CachedResponse]:
+    local = await asyncio.to_thread(_local_search, q)
+    if len(local) < settings.SEARCH_INDEX_MIN_RESULTS:
+        upstream_key = _search_cache_key(q)
+        upstream = await _serve_swr(upstream_key, lambda: _build_search(upstream_key, q))
+        if not local:
+            return upstream
+        local = _dedupe_by_title([local, json.loads(upstream.body) if upstream else []])[:SEARCH_LIMIT]
+    return await response_cache.set(
+        cache_key, encode_json(List[MovieBase], local),
+        ttl_seconds=LOCAL_SEARCH_TTL, stale_after=LOCAL_SEARCH_STALE_AFTER
+    )
+
+async def _build_search(cache_key: str, q: str) -> Optional[CachedResponse]:
     try:
         # Perform all searches in parallel
-        results = await asyncio.gather(
-            scraper.search(q),
-            mycima_scraper.search(q),
-            anime4up_scraper.search(q),
-            return_exceptions=True
-        )
-        
-        larooza_res = results[0] if not isinstance(results[0], Exception) else []
-        arabseed_res = results[1] if not isinstance(results[1], Exception) else []
-        anime_res = results[2] if not isinstance(results[2], Exception) else []
-        
-        if isinstance(results[0], Exception): logger.error(f"Larooza search error: {results[0]}")
-        if isinstance(results[1], Exception): logger.error(f"ArabSeed search error: {results[1]}")
-        if isinstance(results[2], Exception): logger.error(f"Anime search error: {results[2]}")
-
-        # Merge and deduplicate
-        seen = set()
-        combined = []
-        is_anime = any(k in q.lower() for k in ['انمي', 'أنمي', 'anime', 'episode', 'حلقة'])
-        
-        sources = [anime_res, larooza_res, arabseed_res] if is_anime else [larooza_res, arabseed_res, anime_res]
-        for source in sources:
-            if not source: continue
-            for item in source:
-                t = item.get('title', '').strip().lower()
-                if t and t not in seen:
-                    combined.append(item)
-                    seen.add(t)
-            
-        final = combined[:60]
-        if final:
-            await api_cache.set(cache_key, final, ttl_seconds=3600)
-        return final
+        return await _aggregate(cache_key, _search_calls(q), lambda results: _merge_search(q, results), ttl=86400, stale_after=3600)
     except Exception as e:
         logger.error(f"Search API Error: {e}", exc_info=True)
-        return []
+    return None
+
+@router.get("/search/stream")
+async def search_stream(
+    q: str,
+    stream: str = Query("ndjson", pattern="^(ndjson|sse)$", description="Wire format of the stream"),
+    timeout: float = Query(20.0, ge=1.0, le=60.0, description="Seconds to keep the stream open for slow sources")
+):
+    """
+    Streams search results source by source: each scraper's new
+    (deduplicated) items are sent as soon as it answers, so the first
+    results arrive in the time of the fastest source. The merged list is
+    cached under the same key as /movies/search once every source is done.
+    """
+    return StreamingResponse(
+        _stream_search(q, stream, timeout),
+        media_type="text/event-stream" if stream == "sse" else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def _stream_search(q: str, fmt: str, timeout: float):
+    def event(name: str, payload: str) -> str:
+        return f"event: {name}\ndata: {payload}\n\n" if fmt == "sse" else payload + "\n"
+
+    q = q.strip()
+    cache_key = _search_cache_key(q)
+    cached, stale = await response_cache.get_with_state(cache_key)
+    if cached is not None and not stale:
+        body = cached.body.decode()
+        yield event("results", f'{{"source": "cache", "items": {body}}}')
+        yield event("done", json.dumps({"done": True, "total_count": len(json.loads(body)), "cached": True}))
+        return
+
+    tasks = {asyncio.ensure_future(scraper_manager.call(name, fn)): name for name, fn in _search_calls(q).items()}
+    pending = set(tasks)
+    results: Dict[str, Any] = {}
+    seen = set()
+    sent = 0
+    deadline = asyncio.get_running_loop().time() + timeout
+    try:
+        while pending:
+            remaining = deadline - asyncio.get_running_loop().time()
+            done, pending = await asyncio.wait(pending, timeout=max(0.0, remaining), return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                break
+            for task in done:
+                name = tasks[task]
+                results[name] = task.exception() or task.result()
+                # Incremental dedup against everything already sent
+                fresh = []
+                for item in _source_items(results, name, SEARCH_LABELS[name]):
+                    t = item.get('title', '').strip().lower()
+                    if t and t not in seen and sent + len(fresh) < SEARCH_LIMIT:
+                        seen.add(t)
+                        fresh.append(item)
+                sent += len(fresh)
+                body = encode_json(List[MovieBase], fresh).decode()
+                yield event("results", f'{{"source": {json.dumps(name)}, "items": {body}}}')
+        summary = {"done": True, "total_count": sent, "sources": list(results), "timed_out": [tasks[t] for t in pending]}
+        yield event("done", json.dumps(summary))
+    finally:
+        # Sources still running (timeout or client gone) finish in the
+        # background; the merged list is cached once all are in
+        async def store():
+            if pending:
+                await asyncio.wait(pending)
+            outcomes = {name: task.exception() or task.result() for task, name in tasks.items()}
+            final = _merge_search(q, outcomes)
+            if final:
+                await response_cache.set(cache_key, encode_json(List[MovieBase], final), ttl_seconds=86400, stale_after=3600)
+        refresher.schedule(f"{cache_key}:stream", store)
 
 @router.get("/details/{safe_id}", response_model=ContentDetails)
 async def get_details(safe_id: str, refresh: bool = False):
     cache_key = f"details_{safe_id}"
+    loader = lambda: endpoint_flight.do(cache_key, lambda: _load_details(cache_key, safe_id))
+    access_tracker.record(cache_key, loader, lambda: api_cache.stale_deadline(cache_key))
     if not refresh:
-        cached = await api_cache.get(cache_key)
+        cached, stale = await api_cache.get_with_state(cache_key)
         if cached:
+            if stale:
+                refresher.schedule(cache_key, loader)
             return cached
-        
+    return await loader()
+
+async def _load_details(cache_key: str, safe_id: str) -> dict:
     try:
         # 1. Decode URL and Identify Scraper
         import base64
@@ -290,7 +432,7 @@ async def get_details(safe_id: str, refresh: bool = False):
             if details.get("seasons"):
                 details["schema"]["numberOfSeasons"] = len(details.get("seasons", []))
         
-        await api_cache.set(cache_key, details, ttl_seconds=86400)
+        await api_cache.set(cache_key, details, ttl_seconds=86400, stale_after=3 * 3600)
         return details
     except HTTPException:
         raise
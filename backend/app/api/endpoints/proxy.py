@@ -1,35 +1,57 @@
-from fastapi import APIRouter, HTTPException, Query, Response
-from fastapi.responses import StreamingResponse
-import httpx
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse
+from typing import Optional
 import logging
 
+from ...core.config import settings
+from ...core.image_cache import image_cache, UpstreamError
+from ...core.response_cache import etag_matches
+
 router = APIRouter(prefix="/proxy", tags=["proxy"])
 logger = logging.getLogger("api.proxy")
 
+# Browsers may reuse a poster for a day and keep showing it while they refetch
+CACHE_CONTROL = f"public, max-age={settings.IMAGE_CACHE_REVALIDATE_AFTER}, stale-while-revalidate={settings.IMAGE_CACHE_TTL}"
+
 @router.get("/image")
-async def proxy_image(url: str = Query(...)):
+async def proxy_image(
+    request: Request,
+    url: str = Query(...),
+    w: Optional[int] = Query(None, ge=1, le=4096, description="Target width; snapped up to a fixed set of sizes"),
+    q: Optional[int] = Query(None, ge=1, le=100, description="Encoder quality"),
+    format: Optional[str] = Query(None, description="auto | webp | avif | jpeg | original"),
+):
     """
     Proxies images to bypass connection issues or CORS/Referer blocking.
+    Images are kept in the on-disk image cache and served with sendfile.
+    With `w`/`q`/`format` a resized variant is served instead; the format
+    is negotiated from the Accept header unless given explicitly.
     """
     if not url:
         raise HTTPException(status_code=400, detail="Missing URL")
 
     try:
-        async with httpx.AsyncClient(verify=False, follow_redirects=True, timeout=20.0) as client:
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                "Referer": "https://asd.pics/" # Use a static ASCII referer
-            }
-            resp = await client.get(url, headers=headers)
-            
-            if resp.status_code != 200:
-                logger.warning(f"Failed to fetch image: {url} - Status: {resp.status_code}")
-                return Response(status_code=404)
-
-            return Response(
-                content=resp.content,
-                media_type=resp.headers.get("content-type", "image/jpeg")
-            )
+        entry = await image_cache.get(url)
+    except UpstreamError as e:
+        logger.warning(f"Failed to fetch image: {url} - Status: {e.status_code}")
+        return Response(status_code=404)
     except Exception as e:
         logger.error(f"Image proxy error: {e}")
         return Response(status_code=500)
+
+    # Keep the blob on disk until FileResponse has opened it
+    image_cache.pin(entry.digest)
+    path, media_type, tag = image_cache.blob_path(entry.digest), entry.content_type, entry.digest
+    headers = {"Cache-Control": CACHE_CONTROL}
+    spec = image_cache.renderer.negotiate(request.headers.get("accept", ""), format, w, q)
+    if spec is not None:
+        if format in (None, "", "auto"):
+            headers["Vary"] = "Accept"
+        variant = await image_cache.get_variant(entry, spec)
+        if variant is not None:
+            path, media_type, tag = variant, spec.media_type, entry.digest + spec.suffix
+
+    headers["ETag"] = f'"{tag}"'
+    if etag_matches(request.headers.get("if-none-match", ""), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=media_type, headers=headers)
@@ -49,7 +49,7 @@ async def toggle_scraper(
         raise HTTPException(status_code=400, detail="Missing parameters")
     
     scraper_manager.set_scraper_enabled(scraper_name, enabled)
-    api_cache.clear()
+    await api_cache.clear()
     
     return {
         "status": "success",
@@ -73,7 +73,7 @@ async def set_scraper_priority(
         raise HTTPException(status_code=400, detail="Missing parameters")
     
     scraper_manager.set_scraper_priority(scraper_name, int(priority))
-    api_cache.clear()
+    await api_cache.clear()
     
     return {
         "status": "success",
@@ -94,9 +94,12 @@ async def clear_all_cache(authorization: str = Header(None)):
     from scraper.engine import scraper as larooza_scraper
     from scraper.mycima import scraper as mycima_scraper
     
+    from scraper.extractors.engine import ExtractorEngine
+    
     larooza_scraper.clear_cache()
     if hasattr(mycima_scraper, 'clear_cache'):
         mycima_scraper.clear_cache()
+    ExtractorEngine.clear_cache()
 
     return {
         "status": "success" if success else "partial_success",
@@ -118,3 +121,46 @@ async def get_available_scrapers(content_type: str = "arabic"):
         "primary_scraper": primary,
         "total_available": len(available)
     }
+
+@router.get("/coalescing")
+async def get_coalescing_stats(authorization: str = Header(None)):
+    """Single-flight counters: how many fetches were shared instead of repeated (Admin only)"""
+    if authorization != "admin_master_token_2025":
+        raise HTTPException(status_code=401, detail="غير مصرح لك")
+
+    from scraper.utils import SingleFlight
+    return {"single_flight": SingleFlight.all_stats()}
+
+@router.get("/extractor-health")
+async def get_extractor_health(authorization: str = Header(None)):
+    """Per-host extraction success rate and p50/p95 latency (Admin only)"""
+    if authorization != "admin_master_token_2025":
+        raise HTTPException(status_code=401, detail="غير مصرح لك")
+
+    from scraper.extractors.host_stats import host_stats
+    return {"hosts": host_stats.snapshot()}
+
+@router.get("/extractor-routes")
+async def get_extractor_routes(url: str = None, authorization: str = Header(None)):
+    """Dumps the extractor routing table, optionally resolving one url (Admin only)"""
+    if authorization != "admin_master_token_2025":
+        raise HTTPException(status_code=401, detail="غير مصرح لك")
+
+    from scraper.extractors.engine import extractor_router
+    result = {"routes": extractor_router.dump()}
+    if url:
+        result["resolved"] = {
+            "host": extractor_router.host_of(url),
+            "routes": [r.name for r in extractor_router.routes_for(url)],
+        }
+    return result
+
+@router.get("/mirrors")
+async def get_mirror_ranking(authorization: str = Header(None)):
+    """Mirror ranking (EWMA latency / error rate) and hedging counters (Admin only)"""
+    if authorization != "admin_master_token_2025":
+        raise HTTPException(status_code=401, detail="غير مصرح لك")
+
+    from scraper.engine import larooza_mirrors
+    from scraper.mycima import arabseed_mirrors
+    return {"larooza": larooza_mirrors.stats(), "arabseed": arabseed_mirrors.stats()}
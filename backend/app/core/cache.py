@@ -3,20 +3,99 @@ import os
 import time
 import logging
 import asyncio
-from typing import Optional, Any
+from collections import OrderedDict
+from typing import Optional, Any, Awaitable, Callable, Dict, List, Tuple
 from .config import settings
 import aiosqlite
 
 logger = logging.getLogger("cache")
 
+class MemoryLRU:
+    """
+    Byte-bounded in-process LRU holding both the decoded value and its
+    serialized JSON bytes. Entries expire at the same time as their
+    SQLite row and carry the same soft (stale) deadline.
+    """
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[float, bytes, Any, float]]" = OrderedDict()
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get_entry(self, key: str) -> Optional[Tuple[float, bytes, Any, float]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if time.time() >= entry[0]:
+            self.pop(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: str, raw: bytes, value: Any, expires_at: float, stale_at: Optional[float] = None):
+        if len(raw) > self.max_bytes:
+            return
+        self.pop(key)
+        self._entries[key] = (expires_at, raw, value, stale_at or expires_at)
+        self._size += len(raw)
+        while self._size > self.max_bytes:
+            _, old = self._entries.popitem(last=False)
+            self._size -= len(old[1])
+
+    def stale_deadline(self, key: str) -> Optional[float]:
+        """Soft deadline of a live entry, without counting a hit or touching the LRU order."""
+        entry = self._entries.get(key)
+        if entry is None or time.time() >= entry[0]:
+            return None
+        return entry[3]
+
+    def pop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry[1])
+
+    def clear(self):
+        self._entries.clear()
+        self._size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"keys": len(self._entries), "bytes": self._size, "max_bytes": self.max_bytes, "hits": self.hits, "misses": self.misses}
+
 class SQLiteCache:
-    def __init__(self, filename: str):
+    """
+    Async key/value cache on a single long-lived aiosqlite connection.
+    The database runs in WAL mode, writes are grouped into batched
+    transactions and expired rows are purged on a timer instead of
+    during reads. Hot keys are served from a MemoryLRU tier in front of
+    the database.
+
+    Entries may carry a soft TTL (`stale_after`) in addition to the hard
+    TTL: between the two they are still served but reported as stale so
+    callers can refresh them in the background (stale-while-revalidate).
+    """
+    def __init__(self, filename: str, flush_interval: float = 0.05, batch_size: int = 200, cleanup_interval: int = 300, memory_max_bytes: Optional[int] = None):
         self.filename = filename
         self.table_name = "kv_store"
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.cleanup_interval = cleanup_interval
         # Ensure dir exists
         os.makedirs(os.path.dirname(self.filename), exist_ok=True)
         self._init_lock = asyncio.Lock()
         self._initialized = False
+        self._db: Optional[aiosqlite.Connection] = None
+        self._pending: Dict[str, Tuple[str, float, float]] = {}
+        self._flushing: Dict[str, Tuple[str, float, float]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        # Only one batch is written at a time; clear() waits for it too
+        self._flush_lock = asyncio.Lock()
+        self._cleanup_task: Optional[asyncio.Task] = None
+        self.memory = MemoryLRU(memory_max_bytes if memory_max_bytes is not None else settings.API_MEMORY_CACHE_MAX_BYTES)
+        self._clear_hooks: List[Callable[[], None]] = []
 
     async def _init_db(self):
         if self._initialized:
@@ -26,153 +105,435 @@ class SQLiteCache:
             if self._initialized:
                 return
             try:
-                async with aiosqlite.connect(self.filename) as db:
-                    await db.execute(f"""
-                        CREATE TABLE IF NOT EXISTS {self.table_name} (
-                            key TEXT PRIMARY KEY,
-                            value TEXT,
-                            expires_at REAL
-                        )
-                    """)
-                    await db.execute(f"CREATE INDEX IF NOT EXISTS idx_expires ON {self.table_name} (expires_at)")
-                    await db.commit()
+                db = await aiosqlite.connect(self.filename)
+                await db.execute("PRAGMA journal_mode=WAL")
+                await db.execute("PRAGMA synchronous=NORMAL")
+                await db.execute("PRAGMA temp_store=MEMORY")
+                await db.execute("PRAGMA cache_size=-16000")
+                await db.execute("PRAGMA mmap_size=67108864")
+                await db.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {self.table_name} (
+                        key TEXT PRIMARY KEY,
+                        value TEXT,
+                        expires_at REAL,
+                        stale_at REAL
+                    )
+                """)
+                async with db.execute(f"PRAGMA table_info({self.table_name})") as cursor:
+                    columns = [row[1] for row in await cursor.fetchall()]
+                if "stale_at" not in columns:
+                    await db.execute(f"ALTER TABLE {self.table_name} ADD COLUMN stale_at REAL")
+                await db.execute(f"CREATE INDEX IF NOT EXISTS idx_expires ON {self.table_name} (expires_at)")
+                await db.commit()
+                self._db = db
+                self._cleanup_task = asyncio.create_task(self._cleanup_loop())
                 self._initialized = True
             except Exception as e:
                 logger.error(f"Failed to init SQLite cache: {e}")
 
-    async def get(self, key: str) -> Optional[Any]:
+    async def _cleanup_loop(self):
+        """Purges expired rows periodically, off the request path."""
+        while True:
+            await asyncio.sleep(self.cleanup_interval)
+            try:
+                await self._db.execute(f"DELETE FROM {self.table_name} WHERE expires_at < ?", (time.time(),))
+                await self._db.commit()
+            except Exception as e:
+                logger.error(f"SQLite cleanup error: {e}")
+
+    def _schedule_flush(self):
+        if len(self._pending) >= self.batch_size:
+            asyncio.create_task(self.flush())
+        elif self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._delayed_flush())
+
+    async def _delayed_flush(self):
+        await asyncio.sleep(self.flush_interval)
+        await self.flush()
+
+    async def flush(self):
+        """Writes all buffered set() calls in a single transaction."""
+        async with self._flush_lock:
+            if not self._pending or self._db is None:
+                return
+            batch, self._pending = self._pending, {}
+            self._flushing = batch
+            try:
+                await self._db.executemany(
+                    f"INSERT OR REPLACE INTO {self.table_name} (key, value, expires_at, stale_at) VALUES (?, ?, ?, ?)",
+                    [(key, *row) for key, row in batch.items()]
+                )
+                await self._db.commit()
+            except Exception as e:
+                logger.error(f"SQLite flush error ({len(batch)} keys): {e}")
+                # Keep the batch for the next flush; writes made meanwhile win
+                batch.update(self._pending)
+                self._pending = batch
+            finally:
+                self._flushing = {}
+
+    def _buffered(self, key: str) -> Optional[Tuple[str, float, float]]:
+        """Returns a write that has not reached the database yet."""
+        return self._pending.get(key) or self._flushing.get(key)
+
+    async def _get_entry(self, key: str, promote: bool = True) -> Optional[Tuple[float, bytes, Any, float]]:
+        """Looks a key up in memory first, then in SQLite (promoting hits unless `promote` is False)."""
+        entry = self.memory.get_entry(key)
+        if entry is not None:
+            return entry
+
         if not self._initialized:
             await self._init_db()
-            
+
+        now = time.time()
+        row = self._buffered(key)
+        if row is None:
+            async with self._db.execute(f"SELECT value, expires_at, stale_at FROM {self.table_name} WHERE key = ?", (key,)) as cursor:
+                row = await cursor.fetchone()
+
+        # Expired rows are left for the cleanup loop
+        if row and now < row[1]:
+            value_json, expires_at, stale_at = row
+            entry = (expires_at, value_json.encode(), json.loads(value_json), stale_at or expires_at)
+            if promote:
+                self.memory.put(key, entry[1], entry[2], expires_at, entry[3])
+            return entry
+        return None
+
+    async def get(self, key: str, memory: bool = True) -> Optional[Any]:
+        """`memory=False` is for layers with their own in-memory tier: hits are not kept here too."""
         try:
-            now = time.time()
-            async with aiosqlite.connect(self.filename) as db:
-                # Cleanup old entries occasionally (can be optimized to not run every get)
-                if int(now) % 100 == 0:
-                    await db.execute(f"DELETE FROM {self.table_name} WHERE expires_at < ?", (now,))
-                    await db.commit()
-
-                async with db.execute(f"SELECT value, expires_at FROM {self.table_name} WHERE key = ?", (key,)) as cursor:
-                    row = await cursor.fetchone()
-                    
-                if row:
-                    value_json, expires_at = row
-                    if now < expires_at:
-                        return json.loads(value_json)
-                    else:
-                        # Expired
-                        await db.execute(f"DELETE FROM {self.table_name} WHERE key = ?", (key,))
-                        await db.commit()
+            entry = await self._get_entry(key, promote=memory)
+            if entry is not None:
+                return entry[2]
         except Exception as e:
             logger.error(f"SQLite get error ({key}): {e}")
         return None
 
-    async def set(self, key: str, data: Any, ttl_seconds: Optional[int] = None):
+    async def stale_deadline(self, key: str) -> Optional[float]:
+        """Soft-TTL deadline of a live entry without counting it as a hit."""
+        deadline = self.memory.stale_deadline(key)
+        if deadline is not None:
+            return deadline
+        if not self._initialized:
+            await self._init_db()
+        row = self._buffered(key)
+        if row is None:
+            async with self._db.execute(f"SELECT value, expires_at, stale_at FROM {self.table_name} WHERE key = ?", (key,)) as cursor:
+                row = await cursor.fetchone()
+        if row and time.time() < row[1]:
+            return row[2] or row[1]
+        return None
+
+    async def get_with_state(self, key: str) -> Tuple[Optional[Any], bool]:
+        """Returns (value, is_stale); stale values are past their soft TTL."""
+        try:
+            entry = await self._get_entry(key)
+            if entry is not None:
+                return entry[2], time.time() >= entry[3]
+        except Exception as e:
+            logger.error(f"SQLite get error ({key}): {e}")
+        return None, False
+
+    async def get_raw(self, key: str) -> Optional[bytes]:
+        """Returns the cached value as serialized JSON bytes (no re-encoding)."""
+        try:
+            entry = await self._get_entry(key)
+            if entry is not None:
+                return entry[1]
+        except Exception as e:
+            logger.error(f"SQLite get_raw error ({key}): {e}")
+        return None
+
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Returns the live entries for `keys` using a single query."""
+        if not self._initialized:
+            await self._init_db()
+
+        found: Dict[str, Any] = {}
+        try:
+            now = time.time()
+            missing = []
+            for key in keys:
+                entry = self.memory.get_entry(key)
+                if entry is not None:
+                    found[key] = entry[2]
+                    continue
+                pending = self._buffered(key)
+                if pending:
+                    if now < pending[1]:
+                        found[key] = json.loads(pending[0])
+                else:
+                    missing.append(key)
+
+            if missing:
+                placeholders = ",".join("?" * len(missing))
+                async with self._db.execute(
+                    f"SELECT key, value, expires_at, stale_at FROM {self.table_name} WHERE key IN ({placeholders}) AND expires_at > ?",
+                    (*missing, now)
+                ) as cursor:
+                    for key, value_json, expires_at, stale_at in await cursor.fetchall():
+                        found[key] = json.loads(value_json)
+                        self.memory.put(key, value_json.encode(), found[key], expires_at, stale_at)
+        except Exception as e:
+            logger.error(f"SQLite get_many error: {e}")
+        return found
+
+    async def set(self, key: str, data: Any, ttl_seconds: Optional[int] = None, stale_after: Optional[int] = None,
+                  memory: bool = True):
         if not self._initialized:
             await self._init_db()
             
         try:
             ttl = ttl_seconds if ttl_seconds is not None else settings.CACHE_TTL
-            expires_at = time.time() + ttl
             value_json = json.dumps(data)
-            
-            async with aiosqlite.connect(self.filename) as db:
-                await db.execute(
-                    f"INSERT OR REPLACE INTO {self.table_name} (key, value, expires_at) VALUES (?, ?, ?)",
-                    (key, value_json, expires_at)
-                )
-                await db.commit()
+            now = time.time()
+            expires_at = now + ttl
+            stale_at = now + stale_after if stale_after is not None else expires_at
+            self._pending[key] = (value_json, expires_at, stale_at)
+            if memory:
+                self.memory.put(key, value_json.encode(), data, expires_at, stale_at)
+            else:
+                self.memory.pop(key)
+            self._schedule_flush()
         except Exception as e:
             logger.error(f"SQLite set error ({key}): {e}")
 
+    async def set_many(self, items: Dict[str, Any], ttl_seconds: Optional[int] = None):
+        if not self._initialized:
+            await self._init_db()
+
+        try:
+            ttl = ttl_seconds if ttl_seconds is not None else settings.CACHE_TTL
+            expires_at = time.time() + ttl
+            for key, data in items.items():
+                value_json = json.dumps(data)
+                self._pending[key] = (value_json, expires_at, expires_at)
+                self.memory.put(key, value_json.encode(), data, expires_at)
+            self._schedule_flush()
+        except Exception as e:
+            logger.error(f"SQLite set_many error: {e}")
+
+    def add_clear_hook(self, hook: Callable[[], None]):
+        """Registers a callback for layers that derive state from this cache."""
+        self._clear_hooks.append(hook)
+
     async def clear(self):
         if not self._initialized:
             await self._init_db()
         try:
-            async with aiosqlite.connect(self.filename) as db:
-                await db.execute(f"DELETE FROM {self.table_name}")
-                await db.commit()
+            async with self._flush_lock:
+                self._pending = {}
+                self._flushing = {}
+                self.memory.clear()
+                for hook in self._clear_hooks:
+                    hook()
+                await self._db.execute(f"DELETE FROM {self.table_name}")
+                await self._db.commit()
             logger.info("Cache cleared successfully")
         except Exception as e:
             logger.error(f"SQLite clear error: {e}")
 
-# Backward compatibility: Use simple JSON cache for scrapers to avoid event loop conflicts
+    async def close(self):
+        """Flushes pending writes and closes the shared connection."""
+        if not self._initialized:
+            return
+        if self._cleanup_task:
+            self._cleanup_task.cancel()
+        await self.flush()
+        await self._db.close()
+        self._db = None
+        self._initialized = False
+
+# Scrapers use a synchronous store to avoid async/event loop conflicts
 class PersistentCache:
     """
-    Simple JSON-based cache for scrapers (synchronous operations).
-    Scrapers use this to avoid async/event loop conflicts.
+    Indexed SQLite (WAL) store for scrapers (synchronous operations).
+    Each set() writes a single row instead of rewriting the whole file,
+    expired rows are swept by a background thread and the store is kept
+    under `max_bytes` by evicting the least recently used entries.
     """
-    def __init__(self, filename: str):
+    EVICT_BATCH = 256
+
+    def __init__(self, filename: str, max_bytes: Optional[int] = None, sweep_interval: int = 300):
+        # Older releases stored scraper caches as a single JSON document
+        if filename.endswith('.json'):
+            filename = filename[:-len('.json')] + '.db'
         self.filename = filename
-        self._cache = {}
+        self.table_name = "kv_store"
+        self.max_bytes = max_bytes if max_bytes is not None else settings.SCRAPER_CACHE_MAX_BYTES
+        self.sweep_interval = sweep_interval
         import threading
         self._lock = threading.Lock()
+        self._conn = None
+        self._total_bytes = 0
+        self._touched = {}
+        self._sweeper = None
         os.makedirs(os.path.dirname(self.filename), exist_ok=True)
-        self._load()
-    
-    def _load(self):
-        """Load cache from JSON file"""
-        if os.path.exists(self.filename):
+
+    def _connect(self):
+        """Open the store lazily on first use (no full load at startup)."""
+        if self._conn is not None:
+            return self._conn
+        import sqlite3
+        conn = sqlite3.connect(self.filename, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS {self.table_name} (
+                key TEXT PRIMARY KEY,
+                value TEXT,
+                expires_at REAL,
+                accessed_at REAL,
+                size INTEGER
+            )
+        """)
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_expires ON {self.table_name} (expires_at)")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_accessed ON {self.table_name} (accessed_at)")
+        row = conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.table_name}").fetchone()
+        self._total_bytes = row[0]
+        self._conn = conn
+        self._start_sweeper()
+        return conn
+
+    def _start_sweeper(self):
+        import threading
+        self._sweeper = threading.Thread(target=self._sweep_loop, name="cache-sweeper", daemon=True)
+        self._sweeper.start()
+
+    def _sweep_loop(self):
+        while True:
+            time.sleep(self.sweep_interval)
             try:
-                with open(self.filename, 'r', encoding='utf-8') as f:
-                    self._cache = json.load(f)
+                self.sweep()
             except Exception as e:
-                logger.warning(f"Failed to load cache from {self.filename}: {e}")
-                self._cache = {}
-    
-    def _save(self):
-        """Save cache to JSON file"""
+                logger.warning(f"Cache sweep failed for {self.filename}: {e}")
+
+    def sweep(self):
+        """Drop expired entries and flush pending LRU access times."""
+        with self._lock:
+            conn = self._connect()
+            self._flush_touched(conn)
+            conn.execute(f"DELETE FROM {self.table_name} WHERE expires_at < ?", (time.time(),))
+            row = conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.table_name}").fetchone()
+            self._total_bytes = row[0]
+
+    def _flush_touched(self, conn):
+        if not self._touched:
+            return
+        conn.executemany(
+            f"UPDATE {self.table_name} SET accessed_at = ? WHERE key = ?",
+            [(ts, key) for key, ts in self._touched.items()]
+        )
+        self._touched = {}
+
+    def _evict(self, conn):
+        """Evict least recently used entries until the store fits in max_bytes."""
+        if not self.max_bytes or self._total_bytes <= self.max_bytes:
+            return
+        self._flush_touched(conn)
+        target = int(self.max_bytes * 0.9)
+        # Walk idx_accessed in bounded batches rather than loading every row
+        while self._total_bytes > target:
+            rows = conn.execute(
+                f"SELECT key, size FROM {self.table_name} ORDER BY accessed_at ASC LIMIT ?",
+                (self.EVICT_BATCH,)
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                break
+            victims = []
+            for key, size in rows:
+                if self._total_bytes <= target:
+                    break
+                victims.append((key,))
+                self._total_bytes -= size or 0
+            conn.executemany(f"DELETE FROM {self.table_name} WHERE key = ?", victims)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get value from cache"""
         try:
-            import tempfile
             with self._lock:
-                # Write to temp file first, then rename (atomic operation)
-                temp_fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(self.filename), suffix='.tmp')
-                try:
-                    with os.fdopen(temp_fd, 'w', encoding='utf-8') as f:
-                        json.dump(self._cache, f)
-                    
-                    # On Windows, os.replace might still fail if file is held by another handle
-                    # We try a few times or ignore if it's just a cache write
-                    retries = 3
-                    while retries > 0:
-                        try:
-                            if os.path.exists(self.filename):
-                                os.remove(self.filename)
-                            os.rename(temp_path, self.filename)
-                            break
-                        except OSError:
-                            retries -= 1
-                            time.sleep(0.1)
-                except Exception as e:
-                    if os.path.exists(temp_path):
-                        os.unlink(temp_path)
-                    raise e
+                conn = self._connect()
+                row = conn.execute(
+                    f"SELECT value, expires_at FROM {self.table_name} WHERE key = ?", (key,)
+                ).fetchone()
+                if not row:
+                    return None
+                value_json, expires_at = row
+                now = time.time()
+                if now >= expires_at:
+                    # Left for the background sweeper
+                    return None
+                self._touched[key] = now
+            return json.loads(value_json)
         except Exception as e:
-            # logger.warning is enough, we don't want to crash on cache save failure
-            pass
-    
-    def get(self, key: str) -> Optional[Any]:
-        """Get value from cache"""
-        item = self._cache.get(key)
-        if item:
-            expire_time, data = item
-            if time.time() < expire_time:
-                return data
-            else:
-                del self._cache[key]
-                self._save()
+            logger.warning(f"Scraper cache get error ({key}): {e}")
         return None
-    
+
     def set(self, key: str, data: Any, ttl_seconds: Optional[int] = None):
         """Set value in cache"""
-        ttl = ttl_seconds if ttl_seconds is not None else settings.CACHE_TTL
-        self._cache[key] = (time.time() + ttl, data)
-        self._save()
-    
+        try:
+            ttl = ttl_seconds if ttl_seconds is not None else settings.CACHE_TTL
+            value_json = json.dumps(data)
+            size = len(value_json)
+            now = time.time()
+            with self._lock:
+                conn = self._connect()
+                old = conn.execute(f"SELECT size FROM {self.table_name} WHERE key = ?", (key,)).fetchone()
+                conn.execute(
+                    f"INSERT OR REPLACE INTO {self.table_name} (key, value, expires_at, accessed_at, size) VALUES (?, ?, ?, ?, ?)",
+                    (key, value_json, now + ttl, now, size)
+                )
+                self._touched.pop(key, None)
+                self._total_bytes += size - (old[0] if old else 0)
+                self._evict(conn)
+        except Exception as e:
+            # logger.warning is enough, we don't want to crash on cache save failure
+            logger.warning(f"Scraper cache set error ({key}): {e}")
+
     def clear(self):
         """Clear all cache"""
-        self._cache = {}
-        self._save()
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(f"DELETE FROM {self.table_name}")
+                self._touched = {}
+                self._total_bytes = 0
+        except Exception as e:
+            logger.warning(f"Scraper cache clear error: {e}")
+
+class BackgroundRefresher:
+    """
+    Runs at most one background refresh per key, so a stale entry served to
+    many clients triggers a single upstream reload.
+    """
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.scheduled = 0
+        self.failed = 0
+
+    def schedule(self, key: str, loader: Callable[[], Awaitable[Any]]) -> bool:
+        if key in self._tasks:
+            return False
+        self.scheduled += 1
+        task = asyncio.create_task(self._run(key, loader))
+        self._tasks[key] = task
+        task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        return True
+
+    async def _run(self, key: str, loader: Callable[[], Awaitable[Any]]):
+        try:
+            await loader()
+        except Exception as e:
+            # The stale entry keeps being served until its hard TTL
+            self.failed += 1
+            logger.warning(f"Background refresh failed for {key}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {"in_flight": len(self._tasks), "scheduled": self.scheduled, "failed": self.failed}
+
+refresher = BackgroundRefresher()
 
 # We will export a global singleton for the main API cache
 cache_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "cache")
@@ -188,7 +549,12 @@ os.makedirs(cache_dir, exist_ok=True)
 # So I cannot simply swap it to async without updating all call sites.
 # Given the user wants SPEED, updating `movies.py` to async cache is worth it.
 
-api_cache = SQLiteCache(os.path.join(cache_dir, "api_cache.db"))
+# API_MEMORY_CACHE_MAX_BYTES is split evenly between this tier and the
+# encoded-response tier of ResponseCache (see response_cache.py)
+api_cache = SQLiteCache(
+    os.path.join(cache_dir, "api_cache.db"),
+    memory_max_bytes=settings.API_MEMORY_CACHE_MAX_BYTES // 2
+)
 
 def clear_all_system_caches():
     """Clears API cache and all cached image files."""
@@ -196,13 +562,18 @@ def clear_all_system_caches():
         # 1. Clear API Persistent Cache
         # Since it is async, we need a loop
         try:
-            asyncio.get_event_loop().run_until_complete(api_cache.clear())
-        except:
-             # If loop is already running, this convenience function might fail.
-             # Ideally should be async.
-             pass
+            loop = asyncio.get_event_loop()
+            if loop.is_running():
+                # Called from an endpoint: schedule it on the running loop
+                loop.create_task(api_cache.clear())
+            else:
+                loop.run_until_complete(api_cache.clear())
+        except Exception as e:
+            logger.error(f"Failed to clear API cache: {e}")
         
         # 2. Clear Image Cache Directory
+        from .image_cache import image_cache
+        image_cache.clear()
         image_cache_dir = os.path.join(cache_dir, "images")
         if os.path.exists(image_cache_dir):
             import shutil
@@ -16,6 +16,26 @@ class Settings(BaseSettings):
     # Cache
     CACHE_TTL: int = 43200  # 12 hours
     IMAGE_CACHE_TTL: int = 604800  # 1 week
+    IMAGE_CACHE_REVALIDATE_AFTER: int = 86400  # conditional upstream check after 1 day
+    IMAGE_CACHE_MAX_BYTES: int = 512 * 1024 * 1024  # on-disk poster store
+    IMAGE_MAX_BYTES: int = 10 * 1024 * 1024  # largest single image we cache
+    IMAGE_RESIZE_WORKERS: int = max(1, min(4, (os.cpu_count() or 2) - 1))  # poster resize process pool
+    # Frequency-driven cache warmer
+    WARMER_INTERVAL: int = 120  # seconds between cycles
+    WARMER_TOP_K: int = 50
+    WARMER_BUDGET_PER_CYCLE: int = 10  # upstream refreshes per cycle
+    WARMER_HALF_LIFE: int = 3600  # decay of access counters
+    WARMER_MAX_TRACKED_KEYS: int = 5000
+    API_MEMORY_CACHE_MAX_BYTES: int = 64 * 1024 * 1024  # total in-process tiers (api_cache + response_cache)
+    SCRAPER_CACHE_MAX_BYTES: int = 256 * 1024 * 1024  # 256 MB per scraper store
+    
+    # Upstream sources
+    AGGREGATE_LATENCY_BUDGET: float = 6.0  # seconds before aggregate endpoints answer with partial results
+    BREAKER_FAILURE_THRESHOLD: int = 5  # consecutive failures that open a source's circuit
+    BREAKER_COOLDOWN: float = 30.0  # seconds an open circuit fails fast before a probe
+    BREAKER_MAX_COOLDOWN: float = 300.0
+    SEARCH_INDEX_MIN_RESULTS: int = 12  # local hits below this are topped up from upstream search
+    SEARCH_INDEX_RETENTION: int = 30 * 86400  # catalog items not seen for this long leave the index
     
     # Proxies
     PROXY_LIST: List[str] = [p.strip() for p in os.getenv("PROXY_LIST", "").split(",") if p.strip()]
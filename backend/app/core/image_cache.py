@@ -0,0 +1,448 @@
+import os
+import glob
+import json
+import time
+import hashlib
+import asyncio
+import logging
+from dataclasses import dataclass, asdict
+from typing import Optional, Dict, Any, Iterable, List, Tuple
+
+import httpx
+
+from .config import settings
+from .cache import cache_dir
+from .image_variants import VariantRenderer, VariantSpec
+from scraper.utils import SingleFlight
+
+logger = logging.getLogger("image_cache")
+
+UPSTREAM_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Referer": "https://asd.pics/",  # Use a static ASCII referer
+}
+CHUNK_SIZE = 64 * 1024
+# Seconds a blob handed out for serving is protected from deletion
+PIN_GRACE = 120
+# Temp files older than this belong to a write that died; newer ones may still be in progress
+STALE_TMP_AGE = 3600
+
+class UpstreamError(Exception):
+    """The origin answered with something other than an image."""
+    def __init__(self, status_code: int):
+        super().__init__(f"upstream status {status_code}")
+        self.status_code = status_code
+
+@dataclass
+class ImageEntry:
+    url: str
+    digest: str  # blake2b of the image bytes, names the blob on disk
+    content_type: str
+    size: int
+    fetched_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+class ImageCache:
+    """
+    Content-addressed image store on disk.
+
+    Blobs are named by the digest of their bytes (identical posters served
+    under several URLs are stored once) and each URL has a small metadata
+    file pointing at its blob. Entries younger than `fresh_ttl` are served
+    straight from disk; older ones are revalidated upstream with
+    If-None-Match / If-Modified-Since, and a stale copy is served if the
+    origin is unreachable. The store is kept under `max_bytes` by evicting
+    the least recently served URLs.
+
+    Resized / transcoded variants live next to their original blob, are
+    named after its digest and count towards `max_bytes`; they are
+    removed together with the original.
+
+    Disk writes and deletes run in worker threads. A blob that was just
+    handed out for serving is pinned for PIN_GRACE seconds: eviction
+    skips it and a replaced blob is only deleted once the pin expires.
+    """
+    def __init__(self, root: str, max_bytes: int, fresh_ttl: int, max_image_bytes: int, renderer: Optional[VariantRenderer] = None):
+        self.root = root
+        self.blob_dir = os.path.join(root, "blobs")
+        self.meta_dir = os.path.join(root, "meta")
+        self.max_bytes = max_bytes
+        self.fresh_ttl = fresh_ttl
+        self.max_image_bytes = max_image_bytes
+        self._entries: Dict[str, ImageEntry] = {}
+        self._accessed: Dict[str, float] = {}
+        self._blobs: Dict[str, Tuple[int, int]] = {}  # digest -> (size, refs)
+        self._variants: Dict[str, Dict[str, int]] = {}  # digest -> {suffix: size}
+        self._pins: Dict[str, float] = {}  # digest -> monotonic deadline
+        self.renderer = renderer or VariantRenderer(max_workers=1)
+        self._total_bytes = 0
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._flight = SingleFlight("image_cache")
+        self._variant_flight = SingleFlight("image_variants")
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.stale_served = 0
+        self.evicted = 0
+
+    @staticmethod
+    def url_key(url: str) -> str:
+        return hashlib.blake2b(url.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+
+    def blob_path(self, digest: str) -> str:
+        return os.path.join(self.blob_dir, digest[:2], digest)
+
+    def _meta_path(self, key: str) -> str:
+        return os.path.join(self.meta_dir, key[:2], key + ".json")
+
+    def _scan(self) -> Tuple[Dict[str, ImageEntry], Dict[str, int]]:
+        """Reads the metadata files and variant blobs left by a previous run."""
+        entries, variants = {}, {}
+        stale_before = time.time() - STALE_TMP_AGE
+        for dirpath, _, filenames in os.walk(self.blob_dir):
+            for name in filenames:
+                if name.endswith(".tmp"):
+                    self._sweep_tmp(os.path.join(dirpath, name), stale_before)
+                elif "." in name and not name.startswith("."):
+                    variants[name] = os.path.getsize(os.path.join(dirpath, name))
+        if not os.path.isdir(self.meta_dir):
+            return entries, variants
+        for dirpath, _, filenames in os.walk(self.meta_dir):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                if name.endswith(".tmp"):
+                    self._sweep_tmp(path, stale_before)
+                    continue
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        entry = ImageEntry(**json.load(f))
+                    if os.path.exists(self.blob_path(entry.digest)):
+                        entries[name[:-len(".json")]] = entry
+                    else:
+                        os.unlink(path)
+                except Exception:
+                    try:
+                        os.unlink(path)
+                    except OSError:
+                        pass
+        return entries, variants
+
+    @staticmethod
+    def _sweep_tmp(path: str, stale_before: float):
+        """Deletes a temp file left behind by an interrupted download, render or metadata write."""
+        try:
+            if os.path.getmtime(path) < stale_before:
+                os.unlink(path)
+        except OSError:
+            pass
+
+    async def _ensure_loaded(self):
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            entries, variants = await asyncio.to_thread(self._scan)
+            for key, entry in entries.items():
+                self._index(key, entry)
+                self._accessed[key] = entry.fetched_at
+            stray = []
+            for name, size in variants.items():
+                digest, suffix = name.split(".", 1)
+                if digest in self._blobs:
+                    self._add_variant(digest, "." + suffix, size)
+                else:
+                    stray.append(os.path.join(self.blob_dir, digest[:2], name))
+            await self._discard(paths=stray)
+            self._loaded = True
+            logger.info(f"Image cache loaded: {len(self._entries)} urls, {self._total_bytes} bytes")
+
+    def _index(self, key: str, entry: ImageEntry) -> Optional[str]:
+        """Indexes a URL; returns the digest of the blob it no longer uses, if now unreferenced."""
+        current = self._entries.get(key)
+        if current is not None and current.digest == entry.digest:
+            # Revalidated or refetched unchanged: keep the blob refs and variants
+            self._entries[key] = entry
+            return None
+        orphan = self._unindex(key)
+        self._entries[key] = entry
+        size, refs = self._blobs.get(entry.digest, (entry.size, 0))
+        if refs == 0:
+            self._total_bytes += size
+        self._blobs[entry.digest] = (size, refs + 1)
+        return orphan
+
+    def _unindex(self, key: str) -> Optional[str]:
+        """Drops a URL from the index; returns its blob digest if now unreferenced."""
+        entry = self._entries.pop(key, None)
+        self._accessed.pop(key, None)
+        if entry is None:
+            return None
+        size, refs = self._blobs[entry.digest]
+        if refs > 1:
+            self._blobs[entry.digest] = (size, refs - 1)
+            return None
+        del self._blobs[entry.digest]
+        self._total_bytes -= size + sum(self._variants.pop(entry.digest, {}).values())
+        return entry.digest
+
+    def _add_variant(self, digest: str, suffix: str, size: int):
+        variants = self._variants.setdefault(digest, {})
+        self._total_bytes += size - variants.get(suffix, 0)
+        variants[suffix] = size
+
+    @staticmethod
+    def _unlink(path: str):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+    def _write_meta(self, key: str, entry: ImageEntry):
+        path = self._meta_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(asdict(entry), f)
+            os.replace(tmp, path)
+        except BaseException:
+            self._unlink(tmp)
+            raise
+
+    def _drop_blob(self, digest: str):
+        """Deletes an unreferenced blob and its variants from disk."""
+        path = self.blob_path(digest)
+        for variant in glob.glob(glob.escape(path) + ".*"):
+            self._unlink(variant)
+        self._unlink(path)
+
+    def _delete_files(self, digests: List[str], paths: List[str]):
+        for digest in digests:
+            self._drop_blob(digest)
+        for path in paths:
+            self._unlink(path)
+
+    def pin(self, digest: str):
+        """Protects a blob (and its variants) from deletion while a response streams it."""
+        self._pins[digest] = time.monotonic() + PIN_GRACE
+
+    def _pinned_for(self, digest: str) -> float:
+        deadline = self._pins.get(digest)
+        if deadline is None:
+            return 0.0
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            del self._pins[digest]
+            return 0.0
+        return remaining
+
+    async def _discard(self, digests: Iterable[str] = (), paths: Iterable[str] = ()):
+        """Deletes unreferenced blobs and other files in a worker thread; pinned blobs later."""
+        now = []
+        for digest in digests:
+            if digest in self._blobs:
+                continue  # referenced again meanwhile
+            delay = self._pinned_for(digest)
+            if delay:
+                asyncio.get_running_loop().call_later(delay, lambda d=digest: asyncio.ensure_future(self._discard([d])))
+            else:
+                now.append(digest)
+        paths = list(paths)
+        if now or paths:
+            await asyncio.to_thread(self._delete_files, now, paths)
+
+    async def _evict(self):
+        """Evicts least recently served URLs until the store fits in 90% of max_bytes."""
+        if self._total_bytes <= self.max_bytes:
+            return
+        target = int(self.max_bytes * 0.9)
+        digests, paths = [], []
+        for key, _ in sorted(self._accessed.items(), key=lambda kv: kv[1]):
+            if self._total_bytes <= target:
+                break
+            entry = self._entries.get(key)
+            if entry is None or self._pinned_for(entry.digest):
+                continue
+            orphan = self._unindex(key)
+            paths.append(self._meta_path(key))
+            if orphan:
+                digests.append(orphan)
+            self.evicted += 1
+        await self._discard(digests, paths)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                verify=False,
+                follow_redirects=True,
+                timeout=20.0,
+                headers=UPSTREAM_HEADERS,
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=60),
+            )
+        return self._client
+
+    async def _download(self, url: str, cached: Optional[ImageEntry]) -> Optional[ImageEntry]:
+        """
+        Fetches `url` into a blob. With a cached entry the request is
+        conditional; returns None when the origin answers 304.
+        """
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        async with self._get_client().stream("GET", url, headers=headers) as resp:
+            if resp.status_code == 304 and cached is not None:
+                return None
+            if resp.status_code != 200:
+                raise UpstreamError(resp.status_code)
+
+            tmp = os.path.join(self.blob_dir, f".{self.url_key(url)}.{os.getpid()}.tmp")
+            hasher = hashlib.blake2b(digest_size=20)
+            size = 0
+            f = await asyncio.to_thread(self._open_tmp, tmp)
+            try:
+                try:
+                    async for chunk in resp.aiter_bytes(CHUNK_SIZE):
+                        size += len(chunk)
+                        if size > self.max_image_bytes:
+                            raise UpstreamError(413)
+                        hasher.update(chunk)
+                        await asyncio.to_thread(f.write, chunk)
+                finally:
+                    await asyncio.shield(asyncio.to_thread(f.close))
+                digest = hasher.hexdigest()
+                await asyncio.to_thread(self._commit_blob, tmp, digest)
+            except BaseException:
+                await asyncio.shield(asyncio.to_thread(self._unlink, tmp))
+                raise
+
+            return ImageEntry(
+                url=url,
+                digest=digest,
+                content_type=resp.headers.get("content-type", "image/jpeg"),
+                size=size,
+                fetched_at=time.time(),
+                etag=resp.headers.get("etag"),
+                last_modified=resp.headers.get("last-modified"),
+            )
+
+    def _open_tmp(self, tmp: str):
+        os.makedirs(self.blob_dir, exist_ok=True)
+        return open(tmp, "wb")
+
+    def _commit_blob(self, tmp: str, digest: str):
+        path = self.blob_path(digest)
+        if os.path.exists(path):
+            os.unlink(tmp)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp, path)
+
+    async def _refresh(self, key: str, url: str, cached: Optional[ImageEntry]) -> ImageEntry:
+        fetched = await self._download(url, cached)
+        if fetched is None:
+            # 304: the bytes on disk are still current
+            self.revalidated += 1
+            fetched = ImageEntry(**{**asdict(cached), "fetched_at": time.time()})
+        orphan = self._index(key, fetched)
+        self._accessed[key] = time.time()
+        await asyncio.to_thread(self._write_meta, key, fetched)
+        if orphan:
+            await self._discard([orphan])
+        await self._evict()
+        return fetched
+
+    async def get(self, url: str) -> ImageEntry:
+        """
+        Returns a cache entry whose blob is on disk, fetching or revalidating
+        it upstream when needed. Raises UpstreamError / httpx errors when
+        the image is neither cached nor fetchable.
+        """
+        await self._ensure_loaded()
+        key = self.url_key(url)
+        entry = self._entries.get(key)
+        if entry is not None and not os.path.exists(self.blob_path(entry.digest)):
+            # Blob removed behind our back (e.g. manual cache wipe)
+            self._unindex(key)
+            entry = None
+
+        if entry is not None and time.time() - entry.fetched_at < self.fresh_ttl:
+            self.hits += 1
+            self._accessed[key] = time.time()
+            return entry
+
+        self.misses += 1
+        try:
+            return await self._flight.do(key, lambda: self._refresh(key, url, entry))
+        except Exception:
+            if entry is None:
+                raise
+            self.stale_served += 1
+            self._accessed[key] = time.time()
+            return entry
+
+    async def get_variant(self, entry: ImageEntry, spec: VariantSpec) -> Optional[str]:
+        """
+        Path of the `spec` variant of a cached image, rendering it on first
+        use. Returns None when it cannot be produced (serve the original).
+        """
+        src = self.blob_path(entry.digest)
+        path = src + spec.suffix
+        if spec.suffix in self._variants.get(entry.digest, {}) and os.path.exists(path):
+            return path
+
+        async def render() -> Optional[str]:
+            size = await self.renderer.render(src, path, spec)
+            if size is None or entry.digest not in self._blobs:
+                return None
+            self._add_variant(entry.digest, spec.suffix, size)
+            await self._evict()
+            return path if os.path.exists(path) else None
+
+        return await self._variant_flight.do(entry.digest + spec.suffix, render)
+
+    def clear(self):
+        import shutil
+        self._entries.clear()
+        self._accessed.clear()
+        self._blobs.clear()
+        self._variants.clear()
+        self._total_bytes = 0
+        for path in (self.blob_dir, self.meta_dir):
+            shutil.rmtree(path, ignore_errors=True)
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self.renderer.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "urls": len(self._entries),
+            "blobs": len(self._blobs),
+            "variants": sum(len(v) for v in self._variants.values()),
+            "bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+            "stale_served": self.stale_served,
+            "evicted": self.evicted,
+            "renderer": self.renderer.stats(),
+        }
+
+image_cache = ImageCache(
+    os.path.join(cache_dir, "images"),
+    max_bytes=settings.IMAGE_CACHE_MAX_BYTES,
+    fresh_ttl=settings.IMAGE_CACHE_REVALIDATE_AFTER,
+    max_image_bytes=settings.IMAGE_MAX_BYTES,
+    renderer=VariantRenderer(max_workers=settings.IMAGE_RESIZE_WORKERS),
+)
@@ -0,0 +1,142 @@
+"""
+Resized / transcoded poster variants for /proxy/image.
+
+Variants are rendered with Pillow in a process pool so resizing never
+runs on the event loop. Pillow is optional: without it (or if a render
+fails) the original image is served unchanged.
+"""
+import os
+import asyncio
+import logging
+import importlib.util
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple, Optional
+
+logger = logging.getLogger("image_variants")
+
+# Requested widths are snapped up to one of these, bounding the variants per image
+WIDTHS = (160, 240, 320, 480, 640, 960, 1280)
+DEFAULT_QUALITY = 75
+MIN_QUALITY, MAX_QUALITY = 30, 95
+
+MEDIA_TYPES = {"avif": "image/avif", "webp": "image/webp", "jpeg": "image/jpeg"}
+# Preference order when the format is negotiated from the Accept header
+NEGOTIATION_ORDER = ("avif", "webp")
+
+class VariantSpec(NamedTuple):
+    width: Optional[int]
+    quality: int
+    fmt: str
+
+    @property
+    def suffix(self) -> str:
+        """File name suffix of this variant, appended to the original's digest."""
+        return f".{self.width or 0}w{self.quality}q.{self.fmt}"
+
+    @property
+    def media_type(self) -> str:
+        return MEDIA_TYPES[self.fmt]
+
+def snap_width(width: Optional[int]) -> Optional[int]:
+    if not width or width <= 0:
+        return None
+    return next((w for w in WIDTHS if w >= width), WIDTHS[-1])
+
+def _render(src: str, dst: str, width: Optional[int], quality: int, fmt: str) -> int:
+    """Runs in a worker process: writes the variant to `dst`, returns its size."""
+    from PIL import Image, ImageOps
+
+    with Image.open(src) as img:
+        img = ImageOps.exif_transpose(img)
+        if width and img.width > width:
+            img.thumbnail((width, round(img.height * width / img.width)), Image.Resampling.LANCZOS)
+        if fmt == "jpeg":
+            img = img.convert("RGB")
+        elif img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGBA" if "transparency" in img.info or img.mode in ("LA", "PA") else "RGB")
+        tmp = f"{dst}.{os.getpid()}.tmp"
+        options = {"quality": quality}
+        if fmt == "webp":
+            options["method"] = 4
+        elif fmt == "jpeg":
+            options.update(optimize=True, progressive=True)
+        try:
+            img.save(tmp, format=fmt.upper(), **options)
+            os.replace(tmp, dst)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+    return os.path.getsize(dst)
+
+class VariantRenderer:
+    """Negotiates variant specs and renders them in a lazily started process pool."""
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._formats: Optional[frozenset] = None
+        self.rendered = 0
+        self.failed = 0
+
+    @property
+    def available(self) -> bool:
+        return bool(self.formats)
+
+    @property
+    def formats(self) -> frozenset:
+        """Output formats the installed Pillow can encode (empty without Pillow)."""
+        if self._formats is None:
+            if importlib.util.find_spec("PIL") is None:
+                logger.warning("Pillow is not installed; /proxy/image serves originals only")
+                self._formats = frozenset()
+            else:
+                from PIL import features
+                self._formats = frozenset(f for f in MEDIA_TYPES if f == "jpeg" or features.check(f))
+        return self._formats
+
+    def negotiate(self, accept: str, fmt: Optional[str], width: Optional[int], quality: Optional[int]) -> Optional[VariantSpec]:
+        """
+        Builds the variant for a request, or None when the original should
+        be served. `fmt` may name a format explicitly; "auto" (or nothing,
+        when a width is requested) picks the best one the client accepts.
+        """
+        fmt = (fmt or "").lower()
+        if fmt == "original" or not self.available or (not fmt and not width):
+            return None
+        if fmt in ("", "auto"):
+            accept = (accept or "").lower()
+            fmt = next((f for f in NEGOTIATION_ORDER if MEDIA_TYPES[f] in accept and f in self.formats), "jpeg")
+        elif fmt == "jpg":
+            fmt = "jpeg"
+        if fmt not in self.formats:
+            return None
+        quality = min(max(quality or DEFAULT_QUALITY, MIN_QUALITY), MAX_QUALITY)
+        return VariantSpec(snap_width(width), quality, fmt)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: forking a process that runs an event loop and sqlite threads is unsafe
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    async def render(self, src: str, dst: str, spec: VariantSpec) -> Optional[int]:
+        loop = asyncio.get_running_loop()
+        try:
+            size = await loop.run_in_executor(self._get_pool(), _render, src, dst, spec.width, spec.quality, spec.fmt)
+            self.rendered += 1
+            return size
+        except Exception as e:
+            self.failed += 1
+            logger.warning(f"Variant render failed ({os.path.basename(dst)}): {e}")
+            return None
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self):
+        return {"formats": sorted(self.formats), "workers": self.max_workers, "rendered": self.rendered, "failed": self.failed}
@@ -0,0 +1,109 @@
+import hashlib
+import logging
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from functools import lru_cache
+from typing import Any, NamedTuple, Optional, Tuple
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+from .cache import MemoryLRU, SQLiteCache, api_cache
+from .config import settings
+
+logger = logging.getLogger("response_cache")
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+    last_modified: float
+
+    def to_response(self, request: Request, max_age: int = 0) -> Response:
+        """Serves the stored body, or 304 when the client already has it."""
+        headers = {
+            "ETag": self.etag,
+            "Last-Modified": formatdate(self.last_modified, usegmt=True),
+            "Cache-Control": f"public, max-age={max_age}" if max_age else "public, no-cache",
+        }
+        if _not_modified(request, self.etag, self.last_modified):
+            return Response(status_code=304, headers=headers)
+        return Response(content=self.body, media_type="application/json", headers=headers)
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Whether an If-None-Match header lists `etag` (weak comparison) or is "*"."""
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+def _not_modified(request: Request, etag: str, last_modified: float) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+@lru_cache(maxsize=None)
+def _adapter(response_type: Any) -> TypeAdapter:
+    return TypeAdapter(response_type)
+
+def encode_json(response_type: Any, data: Any) -> bytes:
+    """Validates and encodes `data` the same way FastAPI's response_model would."""
+    adapter = _adapter(response_type)
+    return adapter.dump_json(adapter.validate_python(data), by_alias=True)
+
+class ResponseCache:
+    """
+    Stores final encoded response bodies with their ETag so cache hits skip
+    pydantic validation and JSON encoding entirely. Entries live in this
+    cache's own memory tier and are persisted through the api_cache SQLite
+    store, bypassing that store's memory tier so bodies are held once.
+    """
+    def __init__(self, backend: SQLiteCache, max_bytes: int):
+        self.backend = backend
+        self.memory = MemoryLRU(max_bytes)
+        backend.add_clear_hook(self.memory.clear)
+
+    async def get_with_state(self, key: str) -> Tuple[Optional[CachedResponse], bool]:
+        """Returns (response, is_stale); see SQLiteCache soft TTLs."""
+        entry = self.memory.get_entry(key)
+        if entry is None:
+            stored = await self.backend.get(f"resp_{key}", memory=False)
+            if not stored:
+                return None, False
+            cached = CachedResponse(stored["body"].encode(), stored["etag"], stored["last_modified"])
+            stale_at = stored.get("stale_at") or stored["expires_at"]
+            self.memory.put(key, cached.body, cached, stored["expires_at"], stale_at)
+            return cached, time.time() >= stale_at
+        return entry[2], time.time() >= entry[3]
+
+    async def stale_deadline(self, key: str) -> Optional[float]:
+        """Soft-TTL deadline of a cached response without counting a hit."""
+        deadline = self.memory.stale_deadline(key)
+        if deadline is not None:
+            return deadline
+        return await self.backend.stale_deadline(f"resp_{key}")
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        cached, _ = await self.get_with_state(key)
+        return cached
+
+    async def set(self, key: str, body: bytes, ttl_seconds: int, stale_after: Optional[int] = None) -> CachedResponse:
+        now = time.time()
+        cached = CachedResponse(body, f'"{hashlib.sha1(body).hexdigest()}"', now)
+        expires_at = now + ttl_seconds
+        stale_at = now + stale_after if stale_after is not None else expires_at
+        self.memory.put(key, body, cached, expires_at, stale_at)
+        await self.backend.set(f"resp_{key}", {
+            "body": body.decode(),
+            "etag": cached.etag,
+            "last_modified": now,
+            "expires_at": expires_at,
+            "stale_at": stale_at,
+        }, ttl_seconds=ttl_seconds, stale_after=stale_after, memory=False)
+        return cached
+
+response_cache = ResponseCache(api_cache, settings.API_MEMORY_CACHE_MAX_BYTES - api_cache.memory.max_bytes)
@@ -4,12 +4,89 @@ Manages multiple scrapers with automatic failover
 """
 import asyncio
 import logging
-from typing import Dict, List, Any, Optional
+import time
+from typing import Awaitable, Callable, Dict, List, Any, Optional, Tuple
 from datetime import datetime
 import httpx
 
+from .config import settings
+
 logger = logging.getLogger("scraper_manager")
 
+class CircuitOpenError(Exception):
+    """Raised instead of calling a source whose circuit breaker is open."""
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"{name} circuit open, retry in {retry_in:.0f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+class CircuitBreaker:
+    """
+    Closed: calls pass through and consecutive failures are counted.
+    Open: after `failure_threshold` failures in a row calls fail fast for
+    `cooldown` seconds (doubling, up to `max_cooldown`, each time a probe
+    fails). Half-open: after the cooldown a single probe call is let
+    through; its outcome closes the circuit or opens it again.
+    """
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 30.0, max_cooldown: float = 300.0):
+        self.failure_threshold = failure_threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._probing = False
+
+    def retry_in(self) -> float:
+        return max(0.0, self.opened_at + self.cooldown - time.monotonic())
+
+    def allow(self) -> bool:
+        """Whether a call may go out now; claims the probe slot when half-open."""
+        if self.state == self.OPEN and self.retry_in() <= 0:
+            self.state = self.HALF_OPEN
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+        self.cooldown = self.base_cooldown
+        self._probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN:
+            self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+            self._open()
+        elif self.state == self.CLOSED and self.failures >= self.failure_threshold:
+            self._open()
+        self._probing = False
+
+    def release(self):
+        """Gives the probe slot back when a call was cancelled before finishing."""
+        self._probing = False
+
+    def _open(self):
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.failures,
+            "retry_in": round(self.retry_in(), 1) if self.state == self.OPEN else 0,
+            "rejected": self.rejected,
+        }
+
 class ScraperStatus:
     """Track scraper health and availability"""
     def __init__(self, name: str, url: str, enabled: bool = True, priority: int = 1):
@@ -22,6 +99,11 @@ class ScraperStatus:
         self.error_count = 0
         self.success_count = 0
         self.response_time = 0
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.BREAKER_FAILURE_THRESHOLD,
+            cooldown=settings.BREAKER_COOLDOWN,
+            max_cooldown=settings.BREAKER_MAX_COOLDOWN,
+        )
         
     def to_dict(self):
         return {
@@ -34,7 +116,8 @@ class ScraperStatus:
             "error_count": self.error_count,
             "success_count": self.success_count,
             "response_time": self.response_time,
-            "health_score": self.get_health_score()
+            "health_score": self.get_health_score(),
+            "circuit": self.breaker.to_dict()
         }
     
     def get_health_score(self) -> float:
@@ -131,6 +214,75 @@ class ScraperManager:
         if tasks:
             await asyncio.gather(*tasks, return_exceptions=True)
     
+    async def call(self, scraper_name: str, fn: Callable[[], Awaitable[Any]], empty_is_failure: bool = False) -> Any:
+        """
+        Runs one upstream call through the source's circuit breaker and
+        records its outcome. Raises CircuitOpenError without calling `fn`
+        while the circuit is open.
+        """
+        scraper = self.scrapers.get(scraper_name)
+        if scraper is None:
+            return await fn()
+        breaker = scraper.breaker
+        if not breaker.allow():
+            raise CircuitOpenError(scraper_name, breaker.retry_in())
+
+        start = time.monotonic()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception:
+            self._record(scraper, False, time.monotonic() - start)
+            raise
+        self._record(scraper, bool(result) or not empty_is_failure, time.monotonic() - start)
+        return result
+
+    def _record(self, scraper: ScraperStatus, ok: bool, elapsed: float):
+        if ok:
+            if scraper.breaker.state != CircuitBreaker.CLOSED:
+                logger.info(f"✅ Circuit closed for {scraper.name}")
+            scraper.breaker.record_success()
+            scraper.success_count += 1
+        else:
+            scraper.breaker.record_failure()
+            scraper.error_count += 1
+            if scraper.breaker.state == CircuitBreaker.OPEN:
+                logger.warning(f"⚡ Circuit open for {scraper.name} (retry in {scraper.breaker.retry_in():.0f}s)")
+        scraper.response_time = elapsed * 1000  # ms
+        scraper.last_check = datetime.now()
+        scraper.is_online = scraper.breaker.state != CircuitBreaker.OPEN
+
+    async def gather(self, calls: Dict[str, Callable[[], Awaitable[Any]]], budget: Optional[float] = None,
+                     empty_is_failure: bool = False) -> Tuple[Dict[str, Any], Optional[asyncio.Future]]:
+        """
+        Runs several sources concurrently through their breakers and waits
+        at most `budget` seconds. Returns the outcomes (result or exception)
+        of the sources that finished, and, when some did not, a future that
+        resolves to the outcomes of the stragglers, which keep running.
+        """
+        tasks = {name: asyncio.ensure_future(self.call(name, fn, empty_is_failure)) for name, fn in calls.items()}
+        if not tasks:
+            return {}, None
+        done, pending = await asyncio.wait(tasks.values(), timeout=budget)
+
+        def outcome(task: asyncio.Future) -> Any:
+            return task.exception() or task.result()
+
+        results = {name: outcome(task) for name, task in tasks.items() if task in done}
+        if not pending:
+            return results, None
+
+        late = {name: task for name, task in tasks.items() if task in pending}
+        logger.info(f"⏱️ Latency budget ({budget}s) exhausted, still waiting on: {', '.join(late)}")
+
+        async def stragglers() -> Dict[str, Any]:
+            await asyncio.wait(late.values())
+            return {name: outcome(task) for name, task in late.items()}
+
+        return results, asyncio.ensure_future(stragglers())
+
     def get_available_scrapers(self, content_type: str = "arabic") -> List[str]:
         """
         Get list of available scrapers sorted by priority
@@ -0,0 +1,322 @@
+"""
+Local full-text index over the scraped catalog.
+
+Every listing item the scrapers extract (home, category and search pages,
+warm-up) is fed into SQLite FTS5 tables in the application database, so
+/movies/search can answer from the index and only ask the upstream sites
+to top up sparse results. Titles and queries go through the same Arabic
+normalisation, so spelling variants of a query find the same titles.
+"""
+import difflib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from scraper.parsing import parse_cache
+from .config import settings
+
+logger = logging.getLogger("search_index")
+
+# Harakat, superscript alef and quranic marks, plus tatweel
+_DIACRITICS = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]")
+_LETTERS = str.maketrans({
+    "أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا",
+    "ى": "ي", "ئ": "ي", "ؤ": "و", "ة": "ه",
+    **{chr(0x0660 + i): str(i) for i in range(10)},  # Arabic-Indic digits
+    **{chr(0x06f0 + i): str(i) for i in range(10)},  # Persian digits
+})
+_NON_WORD = re.compile(r"[^\w]+|_")
+
+# Query words that describe the kind of title rather than the title itself;
+# scrapers strip most of them from titles, so requiring them would miss
+GENERIC_WORDS = frozenset((
+    "فيلم", "افلام", "مسلسل", "مسلسلات", "انمي", "مترجم", "مدبلج", "كامل", "حلقه", "الحلقه",
+    "movie", "film", "series", "anime",
+))
+
+# Extractor class (the start of a parse listener's qualname) -> source key
+SOURCES = {
+    "LaroozaScraper": "larooza",
+    "MyCimaScraper": "arabseed",
+    "Anime4UpScraper": "anime4up",
+}
+
+# Typo matching: trigram candidates fetched, and the word similarity they need
+TYPO_CANDIDATES = 200
+TYPO_MIN_SIMILARITY = 0.75
+
+def normalize_arabic(text: Optional[str]) -> str:
+    """
+    Folds a title or query to its index form: compatibility forms, diacritics
+    and tatweel removed, alef/hamza forms, alef maqsura and taa marbuta
+    unified, digits made ASCII, lowercased, punctuation turned into spaces.
+    """
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKC", text)
+    text = _DIACRITICS.sub("", text).translate(_LETTERS).lower()
+    return " ".join(_NON_WORD.sub(" ", text).split())
+
+def _quote(token: str) -> str:
+    return '"' + token.replace('"', '""') + '"'
+
+def _trigrams(word: str) -> List[str]:
+    return [word[i:i + 3] for i in range(len(word) - 2)]
+
+def _similarity(query_words: List[str], title: str) -> float:
+    """Mean over query words of the best match among the title's words."""
+    title_words = title.split()
+    if not title_words:
+        return 0.0
+    total = 0.0
+    for word in query_words:
+        best = 0.0
+        matcher = difflib.SequenceMatcher(None, "", word)
+        for candidate in title_words:
+            # Also compare against the word's start: the user may still be typing it
+            for target in {candidate, candidate[:len(word) + 1]}:
+                matcher.set_seq1(target)
+                if matcher.real_quick_ratio() > best and matcher.quick_ratio() > best:
+                    best = max(best, matcher.ratio())
+        total += best
+    return total / len(query_words)
+
+class CatalogIndex:
+    """
+    Catalog items in a plain table with two external-content FTS5 indexes
+    over the normalised title: a word index for prefix queries and a
+    trigram index for substring and typo-tolerant matching. Writes are
+    buffered and flushed in batches by a background thread so parsing
+    never waits on the database; items not seen for `retention` seconds
+    are pruned.
+    """
+    def __init__(self, filename: str, retention: int = 30 * 86400, flush_interval: float = 1.0, batch_size: int = 500):
+        self.filename = filename
+        self.retention = retention
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._trigram = False
+        self._pending: Dict[str, Tuple[str, str, str, float]] = {}
+        self._pending_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+        self._last_prune = 0.0
+        self.indexed = 0
+        self.queries = 0
+        self.typo_queries = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is not None:
+            return self._conn
+        conn = sqlite3.connect(self.filename, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS catalog_items (
+                rowid INTEGER PRIMARY KEY,
+                id TEXT UNIQUE,
+                source TEXT,
+                norm_title TEXT,
+                data TEXT,
+                seen_at REAL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_catalog_seen ON catalog_items (seen_at)")
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS catalog_fts USING fts5(
+                norm_title, content='catalog_items', content_rowid='rowid',
+                tokenize='unicode61 remove_diacritics 2'
+            )
+        """)
+        tables = ["catalog_fts"]
+        try:
+            conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS catalog_tri USING fts5(
+                    norm_title, content='catalog_items', content_rowid='rowid', tokenize='trigram'
+                )
+            """)
+            tables.append("catalog_tri")
+            self._trigram = True
+        except sqlite3.OperationalError as e:
+            # The trigram tokenizer needs SQLite 3.34+; prefix search still works
+            logger.warning(f"Trigram index unavailable, typo-tolerant search disabled: {e}")
+        for table in tables:
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_ai AFTER INSERT ON catalog_items BEGIN
+                    INSERT INTO {table}(rowid, norm_title) VALUES (new.rowid, new.norm_title);
+                END
+            """)
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_ad AFTER DELETE ON catalog_items BEGIN
+                    INSERT INTO {table}({table}, rowid, norm_title) VALUES ('delete', old.rowid, old.norm_title);
+                END
+            """)
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_au AFTER UPDATE OF norm_title ON catalog_items BEGIN
+                    INSERT INTO {table}({table}, rowid, norm_title) VALUES ('delete', old.rowid, old.norm_title);
+                    INSERT INTO {table}(rowid, norm_title) VALUES (new.rowid, new.norm_title);
+                END
+            """)
+        self._conn = conn
+        return conn
+
+    # --- Writes ---
+
+    def add_items(self, source: str, items: List[Dict[str, Any]]):
+        """Queues listing items for indexing; items without an id or title are skipped."""
+        now = time.time()
+        with self._pending_lock:
+            for item in items:
+                item_id, norm = item.get("id"), normalize_arabic(item.get("title"))
+                if not item_id or not norm:
+                    continue
+                self._pending[str(item_id)] = (source, norm, json.dumps(item, ensure_ascii=False), now)
+            if self._pending:
+                self._start_writer()
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def on_parsed(self, url: str, extractor: str, items: List[Dict[str, Any]]):
+        """ParseCache listener: indexes items of the catalog scrapers."""
+        source = SOURCES.get(extractor.split(".", 1)[0])
+        if source and items:
+            self.add_items(source, items)
+
+    def _start_writer(self):
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_loop, name="search-index-writer", daemon=True)
+            self._writer.start()
+
+    def _write_loop(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+                if time.time() - self._last_prune > 3600:
+                    self.prune()
+            except Exception as e:
+                logger.warning(f"Search index flush failed: {e}")
+
+    def flush(self):
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        rows = [(item_id, source, norm, data, seen) for item_id, (source, norm, data, seen) in pending.items()]
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN")
+            try:
+                conn.executemany("""
+                    INSERT INTO catalog_items (id, source, norm_title, data, seen_at) VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(id) DO UPDATE SET source = excluded.source, data = excluded.data, seen_at = excluded.seen_at
+                """, rows)
+                # Only a changed title touches the FTS indexes
+                conn.executemany(
+                    "UPDATE catalog_items SET norm_title = ? WHERE id = ? AND norm_title != ?",
+                    [(norm, item_id, norm) for item_id, _, norm, _, _ in rows],
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        self.indexed += len(rows)
+
+    def prune(self):
+        self._last_prune = time.time()
+        with self._lock:
+            cursor = self._connect().execute("DELETE FROM catalog_items WHERE seen_at < ?", (time.time() - self.retention,))
+        if cursor.rowcount:
+            logger.info(f"Pruned {cursor.rowcount} catalog items not seen for {self.retention // 86400} days")
+
+    # --- Queries ---
+
+    def search(self, query: str, limit: int = 60, sources: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Items matching `query`, best first: every word as a prefix, then
+        every word as a substring, then titles whose words are within a
+        typo or two of the query's. `sources` restricts the source keys.
+        """
+        words = normalize_arabic(query).split()
+        specific = [w for w in words if w not in GENERIC_WORDS] or words
+        if not specific:
+            return []
+        sources = None if sources is None else list(sources)
+        if sources == []:
+            return []
+        self.queries += 1
+        found: Dict[int, Dict[str, Any]] = {}
+        with self._lock:
+            conn = self._connect()
+            self._collect(conn, found, "catalog_fts", " AND ".join(_quote(w) + "*" for w in specific), sources, limit)
+            if self._trigram and len(found) < limit and all(len(w) >= 3 for w in specific):
+                self._collect(conn, found, "catalog_tri", " AND ".join(_quote(w) for w in specific), sources, limit)
+            if self._trigram and len(found) < limit:
+                self._collect_fuzzy(conn, found, specific, sources, limit)
+        return list(found.values())[:limit]
+
+    @staticmethod
+    def _query(conn: sqlite3.Connection, columns: str, table: str, match: str, sources: Optional[List[str]], order: str, limit: int):
+        source_filter = f"AND i.source IN ({', '.join('?' * len(sources))})" if sources else ""
+        return conn.execute(f"""
+            SELECT i.rowid, {columns} FROM {table} f JOIN catalog_items i ON i.rowid = f.rowid
+            WHERE {table} MATCH ? {source_filter} ORDER BY {order} LIMIT ?
+        """, (match, *(sources or ()), limit)).fetchall()
+
+    def _collect(self, conn: sqlite3.Connection, found: Dict[int, Dict[str, Any]], table: str, match: str,
+                 sources: Optional[List[str]], limit: int):
+        rows = self._query(conn, "i.data", table, match, sources, "f.rank, length(i.norm_title)", limit)
+        for rowid, data in rows:
+            if rowid not in found:
+                found[rowid] = json.loads(data)
+
+    def _collect_fuzzy(self, conn: sqlite3.Connection, found: Dict[int, Dict[str, Any]], words: List[str],
+                       sources: Optional[List[str]], limit: int):
+        grams = list(dict.fromkeys(g for w in words for g in _trigrams(w)))
+        if not grams:
+            return
+        self.typo_queries += 1
+        # Titles sharing any trigram with the query, reranked by word similarity
+        match = " OR ".join(_quote(g) for g in grams)
+        rows = self._query(conn, "i.norm_title, i.data", "catalog_tri", match, sources, "f.rank", TYPO_CANDIDATES)
+        scored = []
+        for rowid, norm, data in rows:
+            if rowid in found:
+                continue
+            score = _similarity(words, norm)
+            if score >= TYPO_MIN_SIMILARITY:
+                scored.append((score, rowid, data))
+        scored.sort(key=lambda s: -s[0])
+        for _, rowid, data in scored[:limit - len(found)]:
+            found[rowid] = json.loads(data)
+
+    def clear(self):
+        with self._pending_lock:
+            self._pending.clear()
+        with self._lock:
+            self._connect().execute("DELETE FROM catalog_items")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._connect().execute("SELECT source, COUNT(*) FROM catalog_items GROUP BY source").fetchall()
+        return {
+            "items": sum(count for _, count in rows),
+            "by_source": dict(rows),
+            "pending": len(self._pending),
+            "typo_tolerant": self._trigram,
+            "indexed": self.indexed,
+            "queries": self.queries,
+            "typo_queries": self.typo_queries,
+        }
+
+catalog_index = CatalogIndex(settings.DATABASE_NAME, retention=settings.SEARCH_INDEX_RETENTION)
+parse_cache.add_listener(catalog_index.on_parsed)
@@ -11,8 +11,12 @@ from contextlib import asynccontextmanager
 
 from .core.config import settings
 from .core.database import db_manager
+from .core.cache import api_cache
+from .core.image_cache import image_cache
 from .api.router import api_router
-from .services.worker import auto_broadcaster, warm_up_services, background_cache_refresher
+from .services.worker import auto_broadcaster, warm_up_services
+from .services.cache_warmer import frequency_cache_warmer
+from scraper.extractors.sessions import session_pool
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
@@ -29,7 +33,7 @@ async def lifespan(app: FastAPI):
         # Start background tasks
         asyncio.create_task(auto_broadcaster())
         asyncio.create_task(warm_up_services())
-        asyncio.create_task(background_cache_refresher())
+        asyncio.create_task(frequency_cache_warmer())
         
         logger.info("Application started successfully")
     except Exception as e:
@@ -39,6 +43,9 @@ async def lifespan(app: FastAPI):
     yield
     # Shutdown logic
     logger.info("Application shutting down")
+    await api_cache.close()
+    await session_pool.close()
+    await image_cache.close()
 
 app = FastAPI(
     title=settings.APP_TITLE,
@@ -0,0 +1,89 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ..core.cache import refresher
+from ..core.config import settings
+
+logger = logging.getLogger("cache_warmer")
+
+class _Access:
+    __slots__ = ("score", "last_seen", "loader", "deadline")
+
+    def __init__(self, score: float, last_seen: float, loader, deadline):
+        self.score = score
+        self.last_seen = last_seen
+        self.loader = loader
+        self.deadline = deadline
+
+class AccessTracker:
+    """
+    Exponentially decayed per-key hit counters recorded by the API layer.
+    Each key remembers how to reload itself and how to read its soft-TTL
+    deadline, so the warmer can refresh hot keys before they go stale.
+    """
+    def __init__(self, half_life: float, max_keys: int):
+        self.half_life = half_life
+        self.max_keys = max_keys
+        self._entries: Dict[str, _Access] = {}
+
+    def _decayed(self, access: _Access, now: float) -> float:
+        return access.score * 0.5 ** ((now - access.last_seen) / self.half_life)
+
+    def record(self, key: str, loader: Callable[[], Awaitable[Any]], deadline: Callable[[], Awaitable[Optional[float]]]):
+        now = time.time()
+        access = self._entries.get(key)
+        score = self._decayed(access, now) + 1 if access else 1.0
+        self._entries[key] = _Access(score, now, loader, deadline)
+        if len(self._entries) > self.max_keys:
+            self._prune(now)
+
+    def _prune(self, now: float):
+        keep = sorted(self._entries.items(), key=lambda kv: self._decayed(kv[1], now), reverse=True)
+        self._entries = dict(keep[:int(self.max_keys * 0.8)])
+
+    def top(self, k: int) -> List[Tuple[str, float, _Access]]:
+        now = time.time()
+        ranked = sorted(((key, self._decayed(a, now), a) for key, a in self._entries.items()), key=lambda x: x[1], reverse=True)
+        return ranked[:k]
+
+    def stats(self, k: int = 10) -> Dict[str, Any]:
+        return {
+            "tracked_keys": len(self._entries),
+            "top": [{"key": key, "score": round(score, 2)} for key, score, _ in self.top(k)],
+        }
+
+access_tracker = AccessTracker(settings.WARMER_HALF_LIFE, settings.WARMER_MAX_TRACKED_KEYS)
+
+async def warm_cycle(tracker: AccessTracker = access_tracker) -> int:
+    """Refreshes the hottest keys whose soft TTL ends before the next cycle."""
+    budget = settings.WARMER_BUDGET_PER_CYCLE
+    horizon = time.time() + settings.WARMER_INTERVAL * 1.5
+    scheduled = 0
+    for key, score, access in tracker.top(settings.WARMER_TOP_K):
+        if scheduled >= budget:
+            break
+        try:
+            deadline = await access.deadline()
+        except Exception as e:
+            logger.warning(f"Warmer could not read deadline for {key}: {e}")
+            continue
+        # Missing keys are left to the next request; only renew what is cached
+        if deadline is None or deadline > horizon:
+            continue
+        if refresher.schedule(key, access.loader):
+            scheduled += 1
+    return scheduled
+
+async def frequency_cache_warmer():
+    """Keeps frequently requested keys warm within an upstream request budget."""
+    logger.info("🔥 Frequency-driven cache warmer started")
+    while True:
+        await asyncio.sleep(settings.WARMER_INTERVAL)
+        try:
+            scheduled = await warm_cycle()
+            if scheduled:
+                logger.info(f"🔄 Warmer refreshed {scheduled} hot keys")
+        except Exception as e:
+            logger.error(f"❌ Cache warmer error: {e}")
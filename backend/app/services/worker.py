@@ -80,16 +80,3 @@ async def warm_up_services():
         logger.info("🚀 Deep warm-up complete. System is ready and lightning fast!")
     except Exception as e:
         logger.warning(f"⚠️ Warm-up partially failed: {e}")
-
-async def background_cache_refresher():
-    """Periodically refreshes popular content in the background."""
-    logger.info("🔄 Background Cache Refresher started")
-    while True:
-        try:
-            # Refresh every 30 minutes
-            await asyncio.sleep(1800) 
-            logger.info("🔄 Refreshing system cache...")
-            await warm_up_services()
-        except Exception as e:
-            logger.error(f"❌ Cache Refresher error: {e}")
-            await asyncio.sleep(60)
@@ -10,6 +10,8 @@ from urllib.parse import quote, urljoin, urlparse
 import httpx
 from bs4 import BeautifulSoup
 
+from scraper.parsing import make_soup, parse_items
+
 logger = logging.getLogger("anime4up_scraper")
 
 def retry(retries: int = 3, backoff: float = 1.0):
@@ -229,7 +231,7 @@ class Anime4UpScraper:
         try:
             html = await self._get_html(self.source_url)
             if html:
-                soup = BeautifulSoup(html, 'html.parser')
+                soup = make_soup(html)
                 # 1. Target main widgets which usually have a clear header and content
                 # We exclude broad '.row' unless it has a direct widget header to avoid sucking in the whole page
                 for widget in soup.select('.main-widget, .lucodeia-home-widget, .row.lucodeia-home-widget'):
@@ -262,13 +264,13 @@ class Anime4UpScraper:
         url = f"{self.source_url}/%d9%82%d8%a7%d8%a6%d9%85%d8%a9-%d8%a7%d9%84%d8%a7%d9%86%d9%85%d9%8a/page/{page}/"
         html = await self._get_html(url)
         if not html: return []
-        return self._extract_cards_source(BeautifulSoup(html, 'html.parser'))
+        return parse_items(url, html, self._extract_cards_source)
 
     async def search(self, query: str) -> List[Dict[str, Any]]:
         url = f"{self.source_url}/?s={quote(query)}"
         html = await self._get_html(url)
         if not html: return []
-        return self._extract_cards_source(BeautifulSoup(html, 'html.parser'))
+        return parse_items(url, html, self._extract_cards_source)
 
     async def fetch_details(self, safe_id: str) -> Dict[str, Any]:
         try:
@@ -286,7 +288,7 @@ class Anime4UpScraper:
         html = await self._get_html(url)
         if not html: return {}
         
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = make_soup(html)
         is_episode = "/episode/" in url
         
         details = {
@@ -306,7 +308,7 @@ class Anime4UpScraper:
                 a_url = urljoin(self.source_url, anime_link['href'])
                 a_html = await self._get_html(a_url)
                 if a_html:
-                    a_soup = BeautifulSoup(a_html, 'html.parser')
+                    a_soup = make_soup(a_html)
                     details["episodes"] = await self._get_all_episodes(a_soup, a_url)
                     details["description"] = a_soup.select_one('.anime-story').get_text(strip=True) if a_soup.select_one('.anime-story') else ""
                     details["poster"] = self._extract_poster(a_soup.select_one('.anime-thumbnail') or a_soup)
@@ -325,7 +327,7 @@ class Anime4UpScraper:
                 first_ep = details["episodes"][0]
                 ep_html = await self._get_html(first_ep["url"])
                 if ep_html:
-                    ep_soup = BeautifulSoup(ep_html, 'html.parser')
+                    ep_soup = make_soup(ep_html)
                     details["servers"] = self._extract_servers_source(ep_soup)
                     details["download_links"] = self._extract_downloads_source(ep_soup)
             
@@ -345,17 +347,78 @@ class Anime4UpScraper:
                  first_ep = details["episodes"][0]
                  ep_html = await self._get_html(first_ep["url"])
                  if ep_html:
-                    ep_soup = BeautifulSoup(ep_html, 'html.parser')
+                    ep_soup = make_soup(ep_html)
                     details["servers"] = self._extract_servers_source(ep_soup)
                     if not details["download_links"]:
                         details["download_links"] = self._extract_downloads_source(ep_soup)
 
         return details
 
+    def _pagination_urls(self, soup: BeautifulSoup, max_pages: int = 20) -> Optional[List[str]]:
+        """
+        Reads the page count from the first page's pagination block and builds
+        the URLs of pages 2..N. Returns None when the layout can't be read.
+        """
+        numbered = {}
+        for a in soup.select('a.page-numbers[href], .pagination a[href]'):
+            text = a.get_text(strip=True)
+            if text.isdigit():
+                numbered[int(text)] = urljoin(self.source_url, a['href'])
+        if not numbered:
+            return None
+
+        last_page = max(numbered)
+        if last_page < 2:
+            return None
+        # Build a template from any numbered link: /page/N/ or ?page=N
+        sample_num, sample_url = max(numbered.items())
+        template = None
+        for pattern in (rf'/page/{sample_num}(/|$)', rf'([?&](?:page|paged)=){sample_num}(?=&|$)'):
+            if re.search(pattern, sample_url):
+                template = (pattern, sample_url)
+                break
+        if not template:
+            return None
+
+        pattern, sample_url = template
+        urls = []
+        for num in range(2, min(last_page, max_pages) + 1):
+            if num in numbered:
+                urls.append(numbered[num])
+            elif pattern.startswith('/page/'):
+                urls.append(re.sub(pattern, f'/page/{num}\\1', sample_url))
+            else:
+                urls.append(re.sub(pattern, f'\\g<1>{num}', sample_url))
+        return urls
+
     async def _get_all_episodes(self, soup: BeautifulSoup, base_url: str) -> List[Dict[str, Any]]:
         all_episodes = self._extract_episodes_source(soup)
         seen_urls = {ep['url'] for ep in all_episodes}
+
+        page_urls = self._pagination_urls(soup)
+        if page_urls:
+            # Known page count: fetch the remaining pages concurrently (bounded by
+            # the scraper semaphore inside _get_html) and merge them in page order
+            pages = await asyncio.gather(*[self._get_html(u) for u in page_urls], return_exceptions=True)
+            for html in pages:
+                if not isinstance(html, str) or not html:
+                    continue
+                for ep in self._extract_episodes_source(make_soup(html)):
+                    if ep['url'] not in seen_urls:
+                        all_episodes.append(ep)
+                        seen_urls.add(ep['url'])
+        else:
+            await self._crawl_episode_pages(soup, base_url, all_episodes, seen_urls)
         
+        # Sort all episodes (descending by number)
+        try:
+            all_episodes.sort(key=lambda x: int(re.search(r'(\d+)', str(x["episode"])).group(1)) if re.search(r'(\d+)', str(x["episode"])) else 0, reverse=True)
+        except: pass
+        
+        return all_episodes
+
+    async def _crawl_episode_pages(self, soup: BeautifulSoup, base_url: str, all_episodes: List[Dict[str, Any]], seen_urls: set):
+        """Fallback: discover pages one at a time by following 'next' links."""
         checked_pages = {base_url}
         current_soup = soup
         
@@ -380,7 +443,7 @@ class Anime4UpScraper:
                 html = await self._get_html(page_url)
                 if not html: break
                 
-                current_soup = BeautifulSoup(html, 'html.parser')
+                current_soup = make_soup(html)
                 new_eps = self._extract_episodes_source(current_soup)
                 if not new_eps: break
                 
@@ -393,13 +456,6 @@ class Anime4UpScraper:
                 if not added_any: break
             else:
                 break
-        
-        # Sort all episodes (descending by number)
-        try:
-            all_episodes.sort(key=lambda x: int(re.search(r'(\d+)', str(x["episode"])).group(1)) if re.search(r'(\d+)', str(x["episode"])) else 0, reverse=True)
-        except: pass
-        
-        return all_episodes
 
     def _extract_episodes_source(self, soup: BeautifulSoup) -> List[Dict[str, Any]]:
         episodes = []
@@ -3,14 +3,27 @@ import base64
 import logging
 import re
 import time
+from collections import OrderedDict
 from typing import Any, Dict, List, Optional
 from urllib.parse import quote, urljoin, urlparse
 
 import httpx
 from bs4 import BeautifulSoup
 
+from scraper.parsing import make_soup, parse_items
+
 logger = logging.getLogger("animerco_scraper")
 
+AJAX_ACTIONS = ("player_ajax", "dooplay_player_ajax", "doo_player_ajax")
+AJAX_CONCURRENCY = 4
+# Episodes whose resolved servers are kept (LRU)
+SERVERS_CACHE_SIZE = 256
+AJAX_EMBED_PATTERNS = [
+    re.compile(r'src=["\'](.*?)["\']'),
+    re.compile(r'"embed_url"\s*:\s*"([^"]+)"'),
+    re.compile(r'<iframe[^>]+src=["\'](.*?)["\']'),
+]
+
 class AnimercoScraper:
     def __init__(self):
         self.base_url = "https://ww1.animerco.org"
@@ -24,6 +37,12 @@ class AnimercoScraper:
         self._cache = {}
         self._cache_ttl = 3600
         self._semaphore = asyncio.Semaphore(10)
+        # admin-ajax.php requests in flight against the site
+        self._ajax_semaphore = asyncio.Semaphore(AJAX_CONCURRENCY)
+        # Last (action, nonce field, nonce source) the site answered
+        self._ajax_variant: Optional[tuple] = None
+        self._servers_cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self.ajax_stats = {"posts": 0, "learned": 0}
     
     def _is_safe_server_url(self, url: str) -> bool:
         """Check if a server URL is safe to use by filtering out known malicious domains."""
@@ -141,7 +160,7 @@ class AnimercoScraper:
                 library_url = urljoin(self.base_url, f"/animes/page/{page}/" if page > 1 else "/animes/")
                 html_lib = await self._get_html(library_url)
                 if html_lib:
-                    soup_lib = BeautifulSoup(html_lib, 'html.parser')
+                    soup_lib = make_soup(html_lib)
                     lib_items = self._extract_anime_items(soup_lib)
                     if lib_items:
                         # Mix items into general library or page-specific sections
@@ -156,7 +175,7 @@ class AnimercoScraper:
             # 2. Fetch Featured and other sections from Root
             html_home = await self._get_html(self.base_url)
             if html_home:
-                soup_home = BeautifulSoup(html_home, 'html.parser')
+                soup_home = make_soup(html_home)
                 
                 # Featured slider
                 featured_soup = soup_home.select_one('.featured-slider, .featured-content, .slider, #slider, .hero-slider')
@@ -183,13 +202,13 @@ class AnimercoScraper:
         url = f"{self.base_url}/animes/page/{page}/" if page > 1 else f"{self.base_url}/animes/"
         html = await self._get_html(url)
         if not html: return []
-        return self._extract_anime_items(BeautifulSoup(html, 'html.parser'))
+        return parse_items(url, html, self._extract_anime_items)
 
     async def search(self, query: str) -> List[Dict[str, Any]]:
         url = f"{self.base_url}/?s={quote(query)}"
         html = await self._get_html(url)
         if not html: return []
-        return self._extract_anime_items(BeautifulSoup(html, 'html.parser'))
+        return parse_items(url, html, self._extract_anime_items)
 
     async def fetch_details(self, safe_id: str) -> Dict[str, Any]:
         try:
@@ -199,7 +218,7 @@ class AnimercoScraper:
         html = await self._get_html(url)
         if not html: return {}
         
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = make_soup(html)
         title_el = soup.find('h1')
         title = title_el.get_text(strip=True) if title_el else "Unknown"
         
@@ -237,7 +256,7 @@ class AnimercoScraper:
                 p_url = urljoin(self.base_url, parent_link['href'])
                 p_html = await self._get_html(p_url)
                 if p_html:
-                    p_soup = BeautifulSoup(p_html, 'html.parser')
+                    p_soup = make_soup(p_html)
                     # Pass p_url (parent url) not url
                     details["episodes"] = self._extract_episodes_from_soup(p_soup, p_url)
                     details["seasons"] = self._extract_seasons(p_soup)
@@ -255,7 +274,7 @@ class AnimercoScraper:
                     first_ep_url = eps[0]["url"]
                     ep_html = await self._get_html(first_ep_url)
                     if ep_html:
-                        ep_soup = BeautifulSoup(ep_html, 'html.parser')
+                        ep_soup = make_soup(ep_html)
                         details["servers"] = await self._extract_servers(ep_soup, first_ep_url)
                         details["download_links"] = self._extract_downloads(ep_soup)
                 except Exception as e:
@@ -267,7 +286,7 @@ class AnimercoScraper:
                     s_url = base64.urlsafe_b64decode(details["seasons"][0]["id"]).decode()
                     s_html = await self._get_html(s_url)
                     if s_html:
-                        s_soup = BeautifulSoup(s_html, 'html.parser')
+                        s_soup = make_soup(s_html)
                         details["episodes"] = self._extract_episodes_from_soup(s_soup, s_url)
                         
                         # Again, if we found episodes, fetch the first one's servers
@@ -276,7 +295,7 @@ class AnimercoScraper:
                             first_ep_url = eps[0]["url"]
                             ep_html = await self._get_html(first_ep_url)
                             if ep_html:
-                                ep_soup = BeautifulSoup(ep_html, 'html.parser')
+                                ep_soup = make_soup(ep_html)
                                 details["servers"] = await self._extract_servers(ep_soup, first_ep_url)
                                 details["download_links"] = self._extract_downloads(ep_soup)
                 except: pass
@@ -329,7 +348,85 @@ class AnimercoScraper:
             
         return episodes
 
+    def _ajax_variants(self) -> List[tuple]:
+        """All (action, field, nonce source) combinations, the last one that worked first."""
+        variants = [
+            (action, field, source)
+            for action in AJAX_ACTIONS
+            for source, field in (("data", "nonce"), ("data", "security"), ("dt", "nonce"), ("dt", "security"))
+        ]
+        if self._ajax_variant in variants:
+            variants.remove(self._ajax_variant)
+            variants.insert(0, self._ajax_variant)
+        return variants
+
+    def _parse_embed_url(self, text: str) -> Optional[str]:
+        """Embed URL from an admin-ajax player response."""
+        # Check if response contains iframe src
+        if 'src=' not in text and 'iframe' not in text and 'embed_url' not in text:
+            return None
+        for pattern in AJAX_EMBED_PATTERNS:
+            m = pattern.search(text)
+            if m:
+                url = m.group(1)
+                if url.startswith('//'): url = 'https:' + url
+                if url and url.startswith('http') and self._is_safe_server_url(url):
+                    return url
+        return None
+
+    async def _resolve_option(self, ajax_url: str, referer: str, post_id: str, nume: str, type_val: Optional[str],
+                              data_nonce: Optional[str], dt_ajax: Dict[str, Any]) -> Optional[str]:
+        """
+        Resolves one player option through admin-ajax.php, trying the
+        remembered AJAX variant first and re-learning it when it fails.
+        """
+        nonces = {"data": {"nonce": data_nonce, "security": data_nonce}, "dt": dt_ajax}
+        # Minimal headers to avoid WAF blocking
+        ajax_headers = {
+            "User-Agent": self.headers["User-Agent"],
+            "Referer": referer,
+            "Content-Type": "application/x-www-form-urlencoded"
+        }
+        for variant in self._ajax_variants():
+            action, field, source = variant
+            nonce = nonces[source].get(field)
+            if not nonce:
+                continue
+            payload = {"action": action, "post": post_id, "nume": nume, "type": type_val or "tv", field: nonce}
+            try:
+                async with self._ajax_semaphore:
+                    self.ajax_stats["posts"] += 1
+                    resp = await self.session.post(ajax_url, data=payload, headers=ajax_headers)
+            except Exception as e:
+                logger.debug(f"AJAX request failed: {e}")
+                continue
+            url = self._parse_embed_url(resp.text) if resp.status_code == 200 else None
+            if url:
+                if variant != self._ajax_variant:
+                    logger.info(f"Animerco AJAX variant learned: {variant}")
+                    self.ajax_stats["learned"] += 1
+                    self._ajax_variant = variant
+                return url
+        return None
+
     async def _extract_servers(self, soup: BeautifulSoup, current_url: str = "") -> List[Dict[str, Any]]:
+        entry = self._servers_cache.get(current_url)
+        if entry is not None:
+            ts, cached = entry
+            if time.time() - ts < self._cache_ttl:
+                self._servers_cache.move_to_end(current_url)
+                return [dict(s) for s in cached]
+            del self._servers_cache[current_url]
+
+        servers = await self._resolve_servers(soup, current_url)
+        if servers and current_url:
+            self._servers_cache[current_url] = (time.time(), [dict(s) for s in servers])
+            self._servers_cache.move_to_end(current_url)
+            while len(self._servers_cache) > SERVERS_CACHE_SIZE:
+                self._servers_cache.popitem(last=False)
+        return servers
+
+    async def _resolve_servers(self, soup: BeautifulSoup, current_url: str) -> List[Dict[str, Any]]:
         servers = []
         ajax_url = urljoin(self.base_url, "/wp-admin/admin-ajax.php")
         
@@ -352,105 +449,35 @@ class AnimercoScraper:
                     logger.error(f"Failed to parse dtAjax: {e}")
                 break
 
-        for opt in opts:
-            # Handle both <a> and <li> with data attributes
-            target = opt if opt.get('data-post') else opt.find('a', attrs={'data-post': True}) or opt
-            
+        # Handle both <a> and <li> with data attributes
+        targets = [opt if opt.get('data-post') else opt.find('a', attrs={'data-post': True}) or opt for opt in opts]
+
+        async def resolve(target) -> Optional[str]:
+            post_id, nume = target.get('data-post'), target.get('data-nume')
+            if not (post_id and nume):
+                return None
+            try:
+                return await self._resolve_option(
+                    ajax_url, current_url, post_id, nume, target.get('data-type'), target.get('data-nonce'), dt_ajax
+                )
+            except Exception as e:
+                logger.error(f"Server extraction error: {e}")
+                return None
+
+        # All options are resolved concurrently; results keep the page order
+        resolved = await asyncio.gather(*(resolve(t) for t in targets))
+
+        for target, url in zip(targets, resolved):
             name = target.get_text(strip=True)
-            post_id = target.get('data-post')
             nume = target.get('data-nume')
-            data_nonce = target.get('data-nonce')
-            type_val = target.get('data-type')
-            
-            if post_id and nume:
-                try:
-                    # Try common actions
-                    for action in ["player_ajax", "dooplay_player_ajax", "doo_player_ajax"]:
-                        # Prepare variations of payload
-                        payloads = []
-                        
-                        # Standard with 'nonce' key
-                        if data_nonce:
-                            payloads.append({
-                                "action": action,
-                                "post": post_id,
-                                "nume": nume,
-                                "type": type_val or "tv",
-                                "nonce": data_nonce
-                            })
-                            payloads.append({
-                                "action": action,
-                                "post": post_id,
-                                "nume": nume,
-                                "type": type_val or "tv",
-                                "security": data_nonce
-                            })
-                        
-                        # Using dtAjax values if available
-                        if dt_ajax.get('nonce'):
-                            payloads.append({
-                                "action": action,
-                                "post": post_id,
-                                "nume": nume,
-                                "type": type_val or "tv",
-                                "nonce": dt_ajax['nonce']
-                            })
-                            
-                        if dt_ajax.get('security'):
-                             payloads.append({
-                                "action": action,
-                                "post": post_id,
-                                "nume": nume,
-                                "type": type_val or "tv",
-                                "security": dt_ajax['security']
-                            })
-
-                        # Minimal headers to avoid WAF blocking
-                        ajax_headers = {
-                            "User-Agent": self.headers["User-Agent"],
-                            "Referer": current_url,
-                            "Content-Type": "application/x-www-form-urlencoded"
-                        }
-
-                        success = False
-                        for p in payloads:
-                            try:
-                                resp = await self.session.post(ajax_url, data=p, headers=ajax_headers)
-                                
-                                if resp.status_code == 200:
-                                    text = resp.text
-                                    # Check if response contains iframe src
-                                    if 'src=' in text or 'iframe' in text or 'embed_url' in text:
-                                        # Try multiple regex patterns
-                                        patterns = [
-                                            r'src=["\'](.*?)["\']',
-                                            r'"embed_url"\s*:\s*"([^"]+)"',
-                                            r'<iframe[^>]+src=["\'](.*?)["\']'
-                                        ]
-                                        
-                                        for pattern in patterns:
-                                            m = re.search(pattern, text)
-                                            if m:
-                                                url = m.group(1)
-                                                if url.startswith('//'): url = 'https:' + url
-                                                if url and url.startswith('http') and url not in seen_urls and self._is_safe_server_url(url):
-                                                    servers.append({
-                                                        "name": name or f"Server {nume}",
-                                                        "url": url,
-                                                        "type": "iframe"
-                                                    })
-                                                    seen_urls.add(url)
-                                                    success = True
-                                                    break
-                                        if success: break
-                            except Exception as e:
-                                logger.debug(f"AJAX request failed: {e}")
-                        
-                        if success: break
-                        
-                except Exception as e:
-                    logger.error(f"Server extraction error: {e}")
-            
+            if url and url not in seen_urls:
+                servers.append({
+                    "name": name or f"Server {nume}",
+                    "url": url,
+                    "type": "iframe"
+                })
+                seen_urls.add(url)
+
             # Fallback for direct links in options if AJAX fails or not present
             href = target.get('href')
             if href and 'javascript' not in href and '#' not in href:
@@ -602,8 +629,8 @@ class AnimercoScraper:
             "title": details.get("title", "Episode"),
             "servers": details.get("servers", []),
             "download_links": details.get("download_links", []),
-            "next_episode": self._extract_nav_link(BeautifulSoup("", "html.parser"), "التالية"), # Placeholder
-            "prev_episode": self._extract_nav_link(BeautifulSoup("", "html.parser"), "السابقة")
+            "next_episode": self._extract_nav_link(make_soup(""), "التالية"), # Placeholder
+            "prev_episode": self._extract_nav_link(make_soup(""), "السابقة")
         }
 
     def _extract_nav_link(self, soup: BeautifulSoup, text: str) -> Optional[str]:
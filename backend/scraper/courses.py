@@ -10,6 +10,8 @@ from bs4 import BeautifulSoup
 from urllib.parse import urljoin, quote, urlparse
 import time
 
+from scraper.parsing import make_soup, parse_items
+
 logger = logging.getLogger("courses_scraper")
 
 class CoursesScraper:
@@ -130,7 +132,7 @@ class CoursesScraper:
         url = f"{self.COURSES_URL}?page={page}"
         html = await self._get_html(url)
         if not html: return []
-        return self._extract_course_items(BeautifulSoup(html, 'html.parser'))
+        return parse_items(url, html, self._extract_course_items)
 
     async def fetch_category_courses(self, cat_id: str, page: int = 1) -> List[Dict[str, Any]]:
         # Map slugs to IDs if necessary
@@ -138,13 +140,13 @@ class CoursesScraper:
         url = f"{self.BASE_URL}/certified/cat/{actual_cat_id}?page={page}"
         html = await self._get_html(url)
         if not html: return []
-        return self._extract_course_items(BeautifulSoup(html, 'html.parser'))
+        return parse_items(url, html, self._extract_course_items)
 
     async def search_courses(self, query: str) -> List[Dict[str, Any]]:
         url = f"{self.COURSES_URL}?search={quote(query)}"
         html = await self._get_html(url)
         if not html: return []
-        return self._extract_course_items(BeautifulSoup(html, 'html.parser'))
+        return parse_items(url, html, self._extract_course_items)
 
     async def fetch_course_details(self, safe_id: str) -> Dict[str, Any]:
         try:
@@ -154,7 +156,7 @@ class CoursesScraper:
         html = await self._get_html(url)
         if not html: return {}
         
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = make_soup(html)
         
         title = soup.find('h1').get_text(strip=True) if soup.find('h1') else ""
         description = soup.select_one('.course-desc, .description, #description').get_text(strip=True) if soup.select_one('.course-desc, .description, #description') else ""
@@ -211,7 +213,7 @@ class CoursesScraper:
                 
                 for res in results:
                     if res:
-                        p_soup = BeautifulSoup(res, 'html.parser')
+                        p_soup = make_soup(res)
                         lessons.extend(extract_lessons_from_soup(p_soup))
                         
         # 3. Add Index
@@ -234,7 +236,7 @@ class CoursesScraper:
         if not html: return None
         
         # Search for YouTube iframe
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = make_soup(html)
         iframe = soup.select_one('iframe[src*="youtube.com"], iframe[src*="youtu.be"]')
         if iframe:
             return iframe.get('src')
@@ -12,6 +12,11 @@ from urllib.parse import quote, urljoin, urlparse
 
 import httpx
 from bs4 import BeautifulSoup
+
+from scraper.extractors.host_stats import host_stats
+from scraper.mirrors import MirrorTable, ResourceMissing
+from scraper.parsing import make_soup, parse_items
+from scraper.utils import SingleFlight
 try:
     from curl_cffi.requests import AsyncSession
     HAS_CURL_CFFI = True
@@ -82,7 +87,10 @@ class ScraperConfig:
         "plays": ["مسرحيات", "مسرحية", "masrh-5"],
         "anime-series": ["مسلسلات انمي", "كرتون", "6-anime-series"],
     }
-    
+
+# Mirror ranking shared by all LaroozaScraper instances (persisted across restarts)
+larooza_mirrors = MirrorTable("larooza", ScraperConfig.MIRRORS)
+
 class LaroozaScraper:
     """
     Refactored Larooza Scraper following Clean Code and SOLID principles.
@@ -113,7 +121,7 @@ class LaroozaScraper:
         # Persistent Cache Setup
         try:
             from app.core.cache import PersistentCache
-            cache_path = os.path.join(os.path.dirname(__file__), "..", "cache", "scraper_cache.json")
+            cache_path = os.path.join(os.path.dirname(__file__), "..", "cache", "scraper_cache.db")
             self._persistent_cache = PersistentCache(os.path.abspath(cache_path))
         except ImportError:
             self._persistent_cache = None
@@ -121,6 +129,8 @@ class LaroozaScraper:
         self._cache = {}
         self._cache_ttl = 3600 * 3 # 3 hours for faster updates
         self._semaphore = asyncio.Semaphore(50) # Maximum concurrency for speed
+        self._inflight = SingleFlight("larooza_html")
+        self._details_concurrency = 6 # Parallel upstream fetches per fetch_details call
         self._category_map = {}
         self._discovery_lock = asyncio.Lock()
         self._last_discovery = 0
@@ -151,7 +161,7 @@ class LaroozaScraper:
                 
             if resp.status_code == 200:
                 # Find result links
-                soup = BeautifulSoup(resp.text, 'html.parser')
+                soup = make_soup(resp.text)
                 results = soup.select('.result__a')
                 
                 for link in results[:3]: # Check top 3 results
@@ -195,7 +205,11 @@ class LaroozaScraper:
             return None
 
     async def _get_html(self, url: str) -> Optional[str]:
-        """Unified HTML fetching with caching, smart mirror rotation, and Domain Discovery."""
+        """Unified HTML fetching; concurrent requests for the same URL share one fetch."""
+        return await self._inflight.do(url, lambda: self._fetch_html(url))
+
+    async def _fetch_html(self, url: str) -> Optional[str]:
+        """HTML fetching with caching, smart mirror rotation, and Domain Discovery."""
         async with self._semaphore:
             now = time.time()
             
@@ -213,87 +227,74 @@ class LaroozaScraper:
                     return cached_data
             
             # Determine if we should try mirrors
-            is_base_url = False
-            path = ""
-            current_domain = urlparse(url).netloc
-            
+            parsed = urlparse(url)
+            current_domain = parsed.netloc
+            path = parsed.path
+            if parsed.query:
+                path += f"?{parsed.query}"
+            mirrors = larooza_mirrors.ranked()
             # Check if this URL belongs to one of our known mirrors
-            for mirror in ScraperConfig.MIRRORS + [self.base_url]:
-                if urlparse(mirror).netloc == current_domain:
-                    is_base_url = True
-                    # Extract relative path + query
-                    parsed = urlparse(url)
-                    path = parsed.path
-                    if parsed.query:
-                        path += f"?{parsed.query}"
-                    break
-            
-            # Prepare targets
+            is_base_url = any(urlparse(m).netloc == current_domain for m in mirrors + [self.base_url])
+
+            # Prepare targets: the url itself plus its counterpart on every mirror,
+            # tried in latency/error rank order with hedging
             targets = [url]
             if is_base_url:
-                # Add current base_url domain counterparts if different from input url
-                base_netloc = urlparse(self.base_url).netloc
-                if base_netloc != current_domain:
-                    targets.append(urljoin(self.base_url, path))
-                    
-                # Add rest of mirrors
-                for mirror in ScraperConfig.MIRRORS:
-                    m_netloc = urlparse(mirror).netloc
-                    if m_netloc not in [current_domain, base_netloc]:
-                        targets.append(urljoin(mirror, path))
-            
+                targets += [urljoin(mirror, path) for mirror in [self.base_url] + mirrors]
+
             last_error = None
             max_depth = 3
-            current_depth = 0
-            
-            # Use a while loop with a manual index to handle target list modifications during iteration
-            idx = 0
-            while idx < len(targets) and current_depth < max_depth:
-                target_url = targets[idx]
-                idx += 1
+
+            async def attempt(target_url: str) -> Optional[tuple]:
+                nonlocal last_error
                 try:
-                    logger.info(f"Fetching: {target_url} (Attempt {current_depth + 1})")
-                    if HAS_CURL_CFFI:
-                        resp = await self.session.get(target_url, headers=self.headers, allow_redirects=True)
-                    else:
-                        resp = await self.session.get(target_url, headers=self.headers, follow_redirects=True)
-                    
-                    if resp.status_code == 200:
+                    for depth in range(max_depth):
+                        logger.info(f"Fetching: {target_url} (Attempt {depth + 1})")
+                        if HAS_CURL_CFFI:
+                            resp = await self.session.get(target_url, headers=self.headers, allow_redirects=True)
+                        else:
+                            resp = await self.session.get(target_url, headers=self.headers, follow_redirects=True)
+
+                        if resp.status_code != 200:
+                            if resp.status_code in [404, 403, 503, 502, 500]:
+                                logger.warning(f"Got {resp.status_code} from {target_url}")
+                            if resp.status_code in [404, 410]:
+                                raise ResourceMissing(target_url)
+                            return None
+
                         # Check for Meta Refresh (Soft Redirect)
                         meta_refresh = re.search(r'<meta[^>]+http-equiv=["\']?refresh["\']?[^>]+content=["\']?\d+;URL=([^"\']+)["\']?', resp.text, re.IGNORECASE)
-                        if meta_refresh:
-                            refresh_url = meta_refresh.group(1)
-                            if not refresh_url.startswith('http'):
-                                refresh_url = urljoin(target_url, refresh_url)
-                            
-                            logger.info(f"🔄 Meta Refresh Detected -> {refresh_url}")
-                            if refresh_url not in targets:
-                                targets.append(refresh_url)
-                            current_depth += 1
-                            continue # Try the next target in the list (the one we just added)
-
-                        # Update base_url to the working one if we switched domains
-                        # This ensures future requests go directly to the working mirror
-                        new_base = f"{urlparse(target_url).scheme}://{urlparse(target_url).netloc}"
-                        if is_base_url and "laro" in new_base:
-                            if self.base_url != new_base:
-                                logger.info(f"🚀 Base URL auto-healed: {self.base_url} -> {new_base}")
-                                self.base_url = new_base
-                            # Also update config mirrors to keep it at top
-                            if new_base in ScraperConfig.MIRRORS:
-                                ScraperConfig.MIRRORS.remove(new_base)
-                            ScraperConfig.MIRRORS.insert(0, new_base)
-
-                        # Cache and return result
-                        self._cache[url] = (now, resp.text)
-                        if self._persistent_cache:
-                            self._persistent_cache.set(f"html_{url}", resp.text, ttl_seconds=self._cache_ttl)
-                        return resp.text
-                    elif resp.status_code in [404, 403, 503, 502, 500]:
-                         logger.warning(f"Got {resp.status_code} from {target_url}")
+                        if not meta_refresh:
+                            return target_url, resp.text
+                        refresh_url = meta_refresh.group(1)
+                        if not refresh_url.startswith('http'):
+                            refresh_url = urljoin(target_url, refresh_url)
+                        logger.info(f"🔄 Meta Refresh Detected -> {refresh_url}")
+                        target_url = refresh_url
+                except ResourceMissing:
+                    raise
                 except Exception as e:
                     last_error = e
                     logger.warning(f"Failed to fetch {target_url}: {e}")
+                return None
+
+            won = await larooza_mirrors.fetch(targets, attempt)
+            if won:
+                final_url, text = won[1]
+                # Update base_url to the working one if we switched domains
+                # This ensures future requests go directly to the working mirror
+                new_base = f"{urlparse(final_url).scheme}://{urlparse(final_url).netloc}"
+                if is_base_url and "laro" in new_base:
+                    larooza_mirrors.add(new_base)
+                    if self.base_url != new_base:
+                        logger.info(f"🚀 Base URL auto-healed: {self.base_url} -> {new_base}")
+                        self.base_url = new_base
+
+                # Cache and return result
+                self._cache[url] = (now, text)
+                if self._persistent_cache:
+                    self._persistent_cache.set(f"html_{url}", text, ttl_seconds=self._cache_ttl)
+                return text
             
             # --- LAST RESORT: DOMAIN DISCOVERY ---
             # If we are strictly looking for base URL content (home/category) and everything failed
@@ -305,8 +306,7 @@ class LaroozaScraper:
                         new_domain = await self._resolve_new_domain()
                         if new_domain:
                             self.base_url = new_domain
-                            if new_domain not in ScraperConfig.MIRRORS:
-                                ScraperConfig.MIRRORS.insert(0, new_domain)
+                            larooza_mirrors.add(new_domain, front=True)
                             
                             # Retry with new domain
                             final_url = urljoin(new_domain, path)
@@ -410,14 +410,14 @@ class LaroozaScraper:
         # Modified to use newvideos1.php as requested
         url = f"{self.base_url}/newvideos1.php?page={page}"
         html = await self._get_html(url)
-        return self._extract_items(BeautifulSoup(html, 'html.parser'), url) if html else []
+        return parse_items(url, html, lambda soup: self._extract_items(soup, url))
 
     async def search(self, query: str) -> List[Dict[str, Any]]:
         # Modified to use the correct keywords parameter
         url = f"{self.base_url}/search.php?keywords={quote(query)}"
         html = await self._get_html(url)
         # Search page uses the same container structure as Home
-        return self._extract_items(BeautifulSoup(html, 'html.parser'), url) if html else []
+        return parse_items(url, html, lambda soup: self._extract_items(soup, url))
 
     async def fetch_category(self, cat_id: str, page: int = 1) -> List[Dict[str, Any]]:
         # Resolve actual cat ID from keywords if possible
@@ -430,7 +430,7 @@ class LaroozaScraper:
         
         url = f"{self.base_url}/category.php?cat={actual_id}&page={page}"
         html = await self._get_html(url)
-        return self._extract_items(BeautifulSoup(html, 'html.parser'), url) if html else []
+        return parse_items(url, html, lambda soup: self._extract_items(soup, url))
 
     async def fetch_details(self, safe_id: str) -> Dict[str, Any]:
         """Detailed content extraction with server and download link resolution."""
@@ -455,7 +455,7 @@ class LaroozaScraper:
         html = await self._get_html(url)
         if not html: return {}
 
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = make_soup(html)
         title = soup.find('h1').get_text(strip=True) if soup.find('h1') else "Unknown"
         
         details = {
@@ -465,7 +465,7 @@ class LaroozaScraper:
             "poster": self._extract_poster(soup, url),
             "type": "series" if any(x in title for x in ["حلقة", "مسلسل", "موسم"]) else "movie",
             "servers": [],
-            "download_links": await self._extract_downloads(url),
+            "download_links": [],
             "episodes": [],
         }
 
@@ -482,23 +482,38 @@ class LaroozaScraper:
 
         if internal_embeds:
             logger.info(f"🔄 Found {len(internal_embeds)} internal Larooza embeds. Following for real hosts...")
-            for internal in internal_embeds:
-                try:
-                    inner_html = await self._get_html(internal['url'])
-                    if inner_html:
-                        inner_soup = BeautifulSoup(inner_html, 'html.parser')
-                        real_hosts = self._extract_servers(inner_soup, internal['url'])
-                        # Append any NEW real hosts found inside
-                        for rh in real_hosts:
-                            if not any(rh['url'] == s['url'] for s in details["servers"]):
-                                details["servers"].append(rh)
-                except: continue
 
-        # Filter out internal/recursive Larooza links to only show real video players
-        details["servers"] = [s for s in details["servers"] if not (any(x in s['url'] for x in ['video.php', 'play.php', 'embed.php']) and 'larooza' in s['url'])]
+        # Downloads, inner embeds and the episode list are independent: fetch them
+        # concurrently (capped per request) so cold latency is the slowest single hop
+        limit = asyncio.Semaphore(self._details_concurrency)
+
+        async def bounded(coro):
+            async with limit:
+                return await coro
 
+        jobs = [bounded(self._extract_downloads(url))]
         if details["type"] == "series":
-            details["episodes"] = await self._extract_series_episodes(soup, title, url)
+            jobs.append(bounded(self._extract_series_episodes(soup, title, url)))
+        jobs.extend(bounded(self._follow_internal_embed(internal['url'])) for internal in internal_embeds)
+        results = await asyncio.gather(*jobs, return_exceptions=True)
+
+        # Merge partial results; a failed branch only loses its own data
+        downloads, results = results[0], results[1:]
+        details["download_links"] = downloads if isinstance(downloads, list) else []
+        if details["type"] == "series":
+            episodes, results = results[0], results[1:]
+            details["episodes"] = episodes if isinstance(episodes, list) else []
+
+        for real_hosts in results:
+            if not isinstance(real_hosts, list):
+                continue
+            # Append any NEW real hosts found inside
+            for rh in real_hosts:
+                if not any(rh['url'] == s['url'] for s in details["servers"]):
+                    details["servers"].append(rh)
+
+        # Filter out internal/recursive Larooza links to only show real video players
+        details["servers"] = [s for s in details["servers"] if not (any(x in s['url'] for x in ['video.php', 'play.php', 'embed.php']) and 'larooza' in s['url'])]
 
         # PROMOTE Download Links to Servers if they are known video hosts
         video_hosts = ['voe', 'ok.ru', 'vk.com', 'vidmoly', 'dood', 'filemoon', 'mixdrop', 'upstream', 'vidoza', 'okprime', 'mp4upload', 'uploady']
@@ -522,7 +537,8 @@ class LaroozaScraper:
         seen_urls = set()
         active_idx = 1
         
-        for s in details.get('servers', []):
+        # Fastest reliable hosts first; hosts that keep failing are dropped
+        for s in host_stats.order_servers(details.get('servers', [])):
             url = s['url']
             url_lower = url.lower()
             
@@ -561,6 +577,13 @@ class LaroozaScraper:
             
         return details
 
+    async def _follow_internal_embed(self, embed_url: str) -> List[Dict[str, str]]:
+        """Fetches an internal embed.php/play.php page and returns the real hosts inside."""
+        inner_html = await self._get_html(embed_url)
+        if not inner_html:
+            return []
+        return self._extract_servers(make_soup(inner_html), embed_url)
+
     def _extract_description(self, soup: BeautifulSoup) -> str:
         desc_node = soup.select_one('.story, .desc, .entry-content')
         if not desc_node: return ""
@@ -780,7 +803,7 @@ class LaroozaScraper:
             html = await self._get_html(dl_url)
             if not html: continue
             
-            soup = BeautifulSoup(html, 'html.parser')
+            soup = make_soup(html)
             for a in soup.select('a[href*="http"]'):
                 href = a.get('href')
                 text = a.get_text(strip=True)
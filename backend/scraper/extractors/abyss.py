@@ -4,7 +4,7 @@ import base64
 import json
 import logging
 from typing import Optional
-from curl_cffi.requests import AsyncSession
+from scraper.extractors.sessions import session_pool
 
 logger = logging.getLogger(__name__)
 
@@ -16,7 +16,7 @@ class AbyssExtractor:
                 "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
                 "Referer": "https://larooza.website/"
             }
-            async with AsyncSession(impersonate="chrome124", verify=False) as session:
+            async with session_pool.session() as session:
                 # Handle short.icu redirection
                 resp = await session.get(url, headers=headers, allow_redirects=True)
                 text = resp.text
@@ -4,7 +4,6 @@ import re
 import logging
 from typing import Optional
 from urllib.parse import urlparse, parse_qs
-from curl_cffi.requests import AsyncSession
 
 logger = logging.getLogger(__name__)
 
@@ -5,8 +5,9 @@ import json
 import logging
 from typing import Optional
 from urllib.parse import urlparse
-from curl_cffi.requests import AsyncSession
-from scraper.extractors.okprime import OkPrimeExtractor
+from scraper.extractors.sessions import session_pool
+from scraper.extractors.url_filter import basic_filter
+from scraper.extractors.packer import unpack, unpack_all
 
 logger = logging.getLogger(__name__)
 
@@ -53,14 +54,12 @@ class BypassExtractor:
     @staticmethod
     async def _extract_mixdrop(url: str) -> Optional[dict]:
         try:
-            async with AsyncSession(impersonate="chrome124", verify=False) as session:
+            async with session_pool.session() as session:
                 resp = await session.get(url, timeout=15)
                 text = resp.text
                 
                 # Check for packed JS
-                if "eval(function(p,a,c,k,e,d)" in text:
-                    unpacked = OkPrimeExtractor._decode_packed(text)
-                    if unpacked: text += unpacked
+                text = unpack_all(text)
                 
                 match = re.search(r'MDCore\.wurl\s*=\s*["\']([^"\']+)["\']', text)
                 if match:
@@ -73,12 +72,12 @@ class BypassExtractor:
     @staticmethod
     async def _extract_upstream(url: str) -> Optional[dict]:
         try:
-            async with AsyncSession(impersonate="chrome124", verify=False) as session:
+            async with session_pool.session() as session:
                 resp = await session.get(url, timeout=15)
                 text = resp.text
                 
                 if "eval(function(p,a,c,k,e,d)" in text:
-                    unpacked = OkPrimeExtractor._decode_packed(text)
+                    unpacked = unpack(text)
                     if unpacked:
                         m3u8_match = re.search(r'file\s*:\s*["\']([^"\']+)["\']', unpacked)
                         if m3u8_match:
@@ -89,7 +88,7 @@ class BypassExtractor:
     @staticmethod
     async def _extract_vidoza(url: str) -> Optional[dict]:
         try:
-            async with AsyncSession(impersonate="chrome124", verify=False) as session:
+            async with session_pool.session() as session:
                 resp = await session.get(url, timeout=15)
                 text = resp.text
                 
@@ -106,7 +105,7 @@ class BypassExtractor:
         Specialized logic for Streamtape.
         """
         try:
-            async with AsyncSession(impersonate="chrome124", verify=False) as session:
+            async with session_pool.session() as session:
                 resp = await session.get(url, timeout=15)
                 text = resp.text
                 
@@ -131,36 +130,36 @@ class BypassExtractor:
     @staticmethod
     async def _extract_reviewrate(url: str) -> Optional[dict]:
         try:
-            async with AsyncSession(impersonate="chrome124", verify=False) as session:
+            async with session_pool.session() as session:
                 resp = await session.get(url, timeout=15)
                 text = resp.text
                 
-                # Check for direct MP4
-                match = re.search(r'(https?://[^\s"\']+\.mp4[^\s"\']*)', text)
-                if match:
-                    return {"url": match.group(1), "type": "mp4", "headers": {"Referer": url}}
+                # Check for direct MP4, skipping ad/tracker assets
+                stream = basic_filter.first(re.findall(r'(https?://[^\s"\']+\.mp4[^\s"\']*)', text))
+                if stream:
+                    return {"url": stream, "type": "mp4", "headers": {"Referer": url}}
                 
                 # Check for m3u8
-                match = re.search(r'(https?://[^\s"\']+\.m3u8[^\s"\']*)', text)
-                if match:
-                    return {"url": match.group(1), "type": "hls", "headers": {"Referer": url}}
+                stream = basic_filter.first(re.findall(r'(https?://[^\s"\']+\.m3u8[^\s"\']*)', text))
+                if stream:
+                    return {"url": stream, "type": "hls", "headers": {"Referer": url}}
         except: pass
         return None
 
     @staticmethod
     async def _extract_up4fun(url: str) -> Optional[dict]:
         try:
-            async with AsyncSession(impersonate="chrome124", verify=False) as session:
+            async with session_pool.session() as session:
                 resp = await session.get(url, timeout=15)
                 text = resp.text
                 
                 if "eval(function(p,a,c,k,e,d)" in text:
-                    unpacked = OkPrimeExtractor._decode_packed(text)
+                    unpacked = unpack(text)
                     if unpacked:
                         # Search for file: "..." or src: "..."
-                        match = re.search(r'(?:file|src)\s*[:=]\s*["\'](https?://[^"\']+)["\']', unpacked)
-                        if match:
-                            s_url = match.group(1).replace(r'\/', '/')
+                        candidates = re.findall(r'(?:file|src)\s*[:=]\s*["\'](https?://[^"\']+)["\']', unpacked)
+                        s_url = basic_filter.first(c.replace(r'\/', '/') for c in candidates)
+                        if s_url:
                             return {
                                 "url": s_url, 
                                 "type": "hls" if ".m3u8" in s_url else "mp4", 
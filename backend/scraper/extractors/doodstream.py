@@ -3,7 +3,7 @@ import time
 import random
 import string
 import logging
-from curl_cffi.requests import AsyncSession
+from scraper.extractors.sessions import session_pool
 
 logger = logging.getLogger(__name__)
 
@@ -23,7 +23,7 @@ class DoodstreamExtractor:
                 "Referer": url,
             }
 
-            async with AsyncSession(impersonate="chrome124", verify=False) as session:
+            async with session_pool.session() as session:
                 # 1. Fetch the Embed Page
                 logger.info(f"Fetching Doodstream embed: {url}")
                 resp = await session.get(url, headers=headers)
@@ -3,7 +3,8 @@ import re
 import logging
 import base64
 from typing import Optional, Dict
-from curl_cffi.requests import AsyncSession
+from scraper.extractors.sessions import session_pool
+from scraper.extractors.packer import unpack as unpack_packed
 
 logger = logging.getLogger(__name__)
 
@@ -13,25 +14,7 @@ class DsvplayExtractor:
     @staticmethod
     def unpack(packed: str) -> str:
         """Simple unpacker for 'packed' JavaScript (p,a,c,k,e,d)"""
-        try:
-            pattern = r"}\('(.*)',\s*(\d+),\s*(\d+),\s*'(.*)'\.split\('\|'\)"
-            match = re.search(pattern, packed)
-            if not match: return packed
-            
-            p, a, c, k = match.groups()
-            a, c = int(a), int(c)
-            k = k.split('|')
-            
-            def e(c):
-                return ('' if c < a else e(int(c / a))) + chr(c % a + 161 if c % a > 35 else c % a + 29 if c % a > 9 else c % a + 48)
-
-            while c > 0:
-                c -= 1
-                if k[c]:
-                    p = re.sub(rf'\b{e(c)}\b', k[c], p)
-            return p
-        except Exception:
-            return packed
+        return unpack_packed(packed) or packed
 
     @classmethod
     async def extract(cls, url: str) -> Optional[Dict]:
@@ -42,7 +25,7 @@ class DsvplayExtractor:
                 "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8"
             }
             
-            async with AsyncSession(impersonate="chrome124", verify=False, timeout=30) as session:
+            async with session_pool.session(timeout=30) as session:
                 logger.info(f"🔍 Deep extracting Dsvplay: {url}")
                 resp = await session.get(url, headers=headers, allow_redirects=True)
                 
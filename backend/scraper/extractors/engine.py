@@ -1,8 +1,12 @@
+import asyncio
 import logging
 import re
-from typing import Optional
+import time
+from typing import AsyncIterator, Iterable, Optional, Set, Tuple
 from urllib.parse import urlparse
-from curl_cffi.requests import AsyncSession
+from scraper.extractors.sessions import session_pool
+from scraper.extractors.result_cache import extraction_cache
+from scraper.extractors.host_stats import host_stats
 
 # Import Extractors
 from scraper.extractors.okprime import OkPrimeExtractor
@@ -15,124 +19,185 @@ from scraper.extractors.vk import VKExtractor
 from scraper.extractors.universal import UniversalExtractor
 from scraper.extractors.dsvplay import DsvplayExtractor
 from scraper.extractors.shorticu import ShortIcuExtractor
+from scraper.extractors.mediaflow import MEDIAFLOW_HOSTS, extract_with_mediaflow
+from scraper.extractors.registry import extractor_router
+from scraper.extractors.url_filter import ad_filter
+from scraper.extractors.packer import unpack_all
 
 logger = logging.getLogger(__name__)
 
+# --- Host routing table (tried in this order; see ExtractorRouter) ---
+
+@extractor_router.route("arabseed", domains=("asd.homes", "asd.life", "asd.movie", "asd.cloud"))
+async def _route_arabseed(url: str) -> Optional[dict]:
+    return await ArabSeedExtractor.extract(url)
+
+@extractor_router.route(
+    "okprime",
+    domains=("short.icu",),
+    # Larooza mirrors rotate TLDs (.mom, .homes, .bond, ...); match their labels instead
+    brands=("larooza", "laroza", "larozavideo", "okprime", "film77", "vidspeed", "abstream"),
+)
+async def _route_okprime(url: str) -> Optional[dict]:
+    res = await OkPrimeExtractor.extract(url)
+    if res:
+        return {
+            "url": res["url"],
+            "type": "hls",
+            "headers": res.get("headers", {})
+        }
+    return None
+
+@extractor_router.route("vidmoly", brands=("vidmoly", "vidoba", "flashtoro"))
+async def _route_vidmoly(url: str) -> Optional[dict]:
+    return await VidmolyExtractor.extract(url)
+
+@extractor_router.route("voe", domains=("voe.sx",), brands=("lauradaydo",), patterns=(r"v-o-e",))
+async def _route_voe(url: str) -> Optional[dict]:
+    return await VoeExtractor.extract(url)
+
+@extractor_router.route(
+    "bypass",
+    brands=("mixdrop", "mxdrop", "streamtape", "upstream", "vidoza", "videzz", "reviewrate", "up4fun", "savefiles"),
+)
+async def _route_bypass(url: str) -> Optional[dict]:
+    return await BypassExtractor.extract(url)
+
+@extractor_router.route(
+    "doodstream",
+    brands=("ds2play", "bysezejataos", "frizat"),
+    patterns=(r"(^|\.)d[o0]{2,}d",),  # dood, d000d, dooood, doodstream, doody...
+)
+async def _route_doodstream(url: str) -> Optional[dict]:
+    mp4 = await DoodstreamExtractor.extract(url)
+    if mp4:
+        return {
+            "url": mp4,
+            "type": "mp4",
+            "headers": {"Referer": f"https://{urlparse(url).netloc.lower()}/"}
+        }
+    return None
+
+@extractor_router.route("okru", domains=("ok.ru",), brands=("odnoklassniki",))
+async def _route_okru(url: str) -> Optional[dict]:
+    try:
+        from scraper.extractors.okru import OkRuExtractor
+        return await OkRuExtractor.extract(url)
+    except Exception:
+        return None
+
+@extractor_router.route("vk", domains=("vk.com",))
+async def _route_vk(url: str) -> Optional[dict]:
+    return await VKExtractor.extract(url)
+
+@extractor_router.route("dsvplay", brands=("dsvplay",))
+async def _route_dsvplay(url: str) -> Optional[dict]:
+    return await DsvplayExtractor.extract(url)
+
+@extractor_router.route("shorticu", domains=("short.icu",))
+async def _route_shorticu(url: str) -> Optional[dict]:
+    return await ShortIcuExtractor.extract(url)
+
+@extractor_router.route(
+    "universal",
+    brands=("film77", "vidspeed", "abstream", "mxdrop", "minochinos", "uploady", "1cloudfile", "usersdrive"),
+)
+async def _route_universal(url: str) -> Optional[dict]:
+    return await UniversalExtractor.extract(url)
+
+def _mediaflow_route(host_key: str):
+    async def handler(url: str) -> Optional[dict]:
+        return await extract_with_mediaflow(host_key, url)
+    return handler
+
+for _key, _brands in MEDIAFLOW_HOSTS.items():
+    extractor_router.register(f"mediaflow:{_key}", _mediaflow_route(_key), brands=_brands)
+
 class ExtractorEngine:
     """
     Central routing engine for "Hybrid Cloud Extraction".
     """
-    _cache = {}
-    
+    # Race-mode extractions that outlive their request (they fill the cache)
+    _background: Set[asyncio.Task] = set()
+
     @staticmethod
     def clear_cache():
-        """Clears the in-memory extraction cache."""
-        ExtractorEngine._cache.clear()
+        """Clears the extraction result cache (memory and disk)."""
+        extraction_cache.clear()
         logger.info("🧹 ExtractorEngine Cache Cleared")
 
     @staticmethod
-    async def extract(url: str) -> Optional[dict]:
+    async def extract(url: str, refresh: bool = False) -> Optional[dict]:
         """
         Returns cached result or performs extraction.
+        Failures are cached briefly too; pass refresh=True to bypass the cache.
         """
-        import time
-        now = time.time()
-        if url in ExtractorEngine._cache:
-            ts, data = ExtractorEngine._cache[url]
-            if now - ts < 3600: # 1 hour cache
-                logger.info(f"⚡ Cache Hit (ExtractorEngine): {url}")
+        if not refresh:
+            found, data = extraction_cache.get(url)
+            if found:
+                logger.info(f"⚡ Cache Hit (ExtractorEngine{'' if data else ', failed'}): {url}")
                 return data
         
         # Logic is moved to _extract_internal
-        res = await ExtractorEngine._extract_internal(url)
-        
-        if res:
-            ExtractorEngine._cache[url] = (now, res)
+        started = time.monotonic()
+        try:
+            res = await ExtractorEngine._extract_internal(url)
+        except asyncio.CancelledError:
+            # Callers give up on slow hosts (wait_for): the host was slow, not broken
+            host_stats.record_timeout(url, time.monotonic() - started)
+            raise
+        host_stats.record(url, bool(res), time.monotonic() - started)
+        extraction_cache.set(url, res or None)
         return res
 
     @staticmethod
-    async def _extract_internal(url: str) -> Optional[dict]:
+    async def race(urls: Iterable[str], timeout: float = 20.0) -> AsyncIterator[Tuple[str, Optional[dict]]]:
         """
-        Internal extraction logic.
+        Extracts all `urls` concurrently and yields (url, result) as each one
+        finishes, best-ranked hosts first when several finish together.
+        Extractions still running when the caller stops iterating are left
+        to complete in the background so their results land in the cache.
         """
-        try:
-            # Domain-specific routing
-            domain = urlparse(url).netloc.lower()
-            
-            # 1. ArabSeed / asd.homes
-            if any(x in domain for x in ['asd.homes', 'asd.life', 'asd.movie', 'asd.cloud']):
-                res = await ArabSeedExtractor.extract(url)
-                if res: return res
-
-            # 1b. Larooza / OkPrime / Local Domains
-            if any(x in domain for x in ['larooza', 'okprime', 'laroza', 'mom', 'homes', 'bond', 'film77', 'vidspeed', 'short.icu', 'abstream', 'rox']):
-                res = await OkPrimeExtractor.extract(url)
-                if res:
-                    return {
-                        "url": res["url"],
-                        "type": "hls",
-                        "headers": res.get("headers", {})
-                    }
-
-            # 2. Vidmoly / Vidoba
-            if any(x in domain for x in ['vidmoly', 'vidoba', 'flashtoro']):
-                res = await VidmolyExtractor.extract(url)
-                if res: return res
-
-            # 5. Voe.sx / Lauradaydo
-            if any(x in domain for x in ['voe.sx', 'lauradaydo', 'v-o-e']):
-                res = await VoeExtractor.extract(url)
-                if res: return res
-
-            # 6. Stream-Bypass Integrated Hosts (Mixdrop, Streamtape, Upstream, Vidoza, ReviewRate, Up4fun, SaveFiles)
-            if any(x in domain for x in ['mixdrop', 'mxdrop', 'streamtape', 'upstream', 'vidoza', 'videzz', 'reviewrate', 'up4fun', 'savefiles']):
-                res = await BypassExtractor.extract(url)
-                if res: return res
-
-            # 7. Doodstream
-            if any(x in domain for x in ['dood', 'ds2play', 'd000d', 'd0000d', 'dooood', 'bysezejataos', 'frizat', 'doody']):
-                mp4 = await DoodstreamExtractor.extract(url)
-                if mp4:
-                    return {
-                        "url": mp4, 
-                        "type": "mp4", 
-                        "headers": {"Referer": f"https://{domain}/"}
-                    }
-
-            # 9. OkRu
-            if 'ok.ru' in domain or 'odnoklassniki' in domain:
-                try:
-                    from scraper.extractors.okru import OkRuExtractor
-                    res = await OkRuExtractor.extract(url)
-                    if res: return res
-                except Exception: pass
-
-            # 10. VK.com
-            if 'vk.com' in domain:
-                res = await VKExtractor.extract(url)
-                if res: return res
+        ranked = host_stats.rank(dict.fromkeys(u for u in urls if u), lambda u: u)
+        order = {url: i for i, url in enumerate(ranked)}
+        tasks = {}
+        for url in ranked:
+            task = asyncio.create_task(ExtractorEngine.extract(url))
+            ExtractorEngine._background.add(task)
+            task.add_done_callback(ExtractorEngine._background.discard)
+            tasks[task] = url
 
-            # 11. Dsvplay
-            if 'dsvplay' in domain:
-                res = await DsvplayExtractor.extract(url)
-                if res: return res
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        pending = set(tasks)
+        while pending:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            for task in sorted(done, key=lambda t: order[tasks[t]]):
+                result = None if task.cancelled() or task.exception() else task.result()
+                yield tasks[task], result
 
-            # 12. Short.icu
-            if 'short.icu' in domain:
-                res = await ShortIcuExtractor.extract(url)
-                if res: return res
-
-            # 13. Universal Extractor (Film77, Vidspeed, Abstream, Mxdrop, etc.)
-            if any(x in domain for x in ['film77', 'vidspeed', 'abstream', 'mxdrop', 'minochinos', 'uploady', '1cloudfile', 'usersdrive']):
-                res = await UniversalExtractor.extract(url)
+    @staticmethod
+    async def _extract_internal(url: str) -> Optional[dict]:
+        """
+        Internal extraction logic: the routes registered for the url's host
+        are tried in order, then the generic fallback.
+        """
+        try:
+            # Registered host routes, in registration order
+            for route in extractor_router.routes_for(url):
+                res = await route.handler(url)
                 if res: return res
 
+            domain = urlparse(url).netloc.lower()
 
             # --- Enhanced Generic Fallback ---
             # Note: Already imported at top of file
             
-            # Use AsyncSession (impersonate) for better bypass
-            async with AsyncSession(impersonate="chrome124", verify=False, allow_redirects=True, timeout=20) as session:
+            # Borrow the pooled impersonating session for better bypass
+            async with session_pool.session(allow_redirects=True, timeout=20) as session:
                 headers = {
                     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36",
                     "Referer": url,
@@ -173,21 +238,7 @@ class ExtractorEngine:
                             domain = urlparse(final_url).netloc.lower()
 
                     # 2. Unpack MULTIPLE times if needed (Deep Unpacking)
-                    all_text = text
-                    for _ in range(5): # Up to 5 levels of unpacking
-                        if "eval(function(p,a,c,k,e,d)" in all_text:
-                            packed_matches = re.findall(r'eval\(function\(p,a,c,k,e,d\).+?split\([\'"]\|[\'"]\)\)', all_text, re.DOTALL)
-                            if not packed_matches: break
-                            
-                            new_text = ""
-                            for p in packed_matches:
-                                unpacked = OkPrimeExtractor._decode_packed(p)
-                                if unpacked: new_text += unpacked
-                            
-                            if not new_text or new_text in all_text: break
-                            all_text += "\n" + new_text
-                        else:
-                            break
+                    all_text = unpack_all(text, max_depth=5)
 
                     # 3. Protocol-relative URL fix (e.g. //s-delivery33.mxcontent.net/...)
                     all_text = re.sub(r'["\']//([^"\'\s]+\.(?:m3u8|mp4)[^"\'\s]*)', r'"https://\1', all_text)
@@ -213,33 +264,26 @@ class ExtractorEngine:
                     if voe_source:
                          s_url = voe_source.group(1).replace(r'\/', '/')
                          # Check for ad-related content
-                         if not any(x in s_url.lower() for x in ['track', 'pixel', 'ads', 'loading', 'placeholder', 'advertisement', 'promo', 'popup', 'popunder', 'popad', 'click', 'tracker', 'analytics', 'stat', 'beacon', 'affiliate', 'banner', 'doubleclick', 'googlesyndication', 'google-analytics', 'googletagmanager', 'facebook', 'connect.facebook', 'twitter', 'google', 'amazon-adsystem', 'pubmatic', 'taboola', 'outbrain', 'revcontent', 'adnxs', 'aaxads', 'zedo', 'exoclick', 'popads', 'popcash', 'propellerads', 'onclickads', 'realsrv', 'juicyads', 'melbet', '1xbet', 'mostbet', 'bet365', 'tapbit', 'okx', 'cryptoad', 'smartcpm', 'clickunder', 'adtarget', 'traffic']):
+                         if not ad_filter.is_blocked(s_url):
                              return {"url": s_url, "type": "mp4" if ".mp4" in s_url else "hls", "headers": {"Referer": final_url}}
 
                     # High priority: m3u8
                     m3u8_matches = re.findall(r'(https?://[^"\']+\.m3u8[^"\']*)', all_text)
-                    if m3u8_matches:
-                        for m_url in m3u8_matches:
-                            if any(x in m_url.lower() for x in ['track', 'pixel', 'ads', 'loading', 'placeholder', 'advertisement', 'promo', 'popup', 'popunder', 'popad', 'click', 'tracker', 'analytics', 'stat', 'beacon', 'affiliate', 'banner', 'doubleclick', 'googlesyndication', 'google-analytics', 'googletagmanager', 'facebook', 'connect.facebook', 'twitter', 'google', 'amazon-adsystem', 'pubmatic', 'taboola', 'outbrain', 'revcontent', 'adnxs', 'aaxads', 'zedo', 'exoclick', 'popads', 'popcash', 'propellerads', 'onclickads', 'realsrv', 'juicyads', 'melbet', '1xbet', 'mostbet', 'bet365', 'tapbit', 'okx', 'cryptoad', 'smartcpm', 'clickunder', 'adtarget', 'traffic']): continue
-                            clean_url = m_url.replace(r'\/', '/')
-                            # Verify it doesn't look like a fake/placeholder
-                            if 'bunny' not in clean_url.lower():
-                                return {"url": clean_url, "type": "hls", "headers": {"Referer": final_url}}
+                    clean_url = ad_filter.first(m_url.replace(r'\/', '/') for m_url in m3u8_matches)
+                    if clean_url:
+                        return {"url": clean_url, "type": "hls", "headers": {"Referer": final_url}}
                     
                     # Medium priority: mp4
                     mp4_matches = re.findall(r'(https?://[^"\']+\.mp4[^"\']*)', all_text)
-                    if mp4_matches:
-                        for m_url in mp4_matches:
-                            if any(x in m_url.lower() for x in ['track', 'pixel', 'ads', 'loading', 'placeholder', 'advertisement', 'promo', 'popup', 'popunder', 'popad', 'click', 'tracker', 'analytics', 'stat', 'beacon', 'affiliate', 'banner', 'doubleclick', 'googlesyndication', 'google-analytics', 'googletagmanager', 'facebook', 'connect.facebook', 'twitter', 'google', 'amazon-adsystem', 'pubmatic', 'taboola', 'outbrain', 'revcontent', 'adnxs', 'aaxads', 'zedo', 'exoclick', 'popads', 'popcash', 'propellerads', 'onclickads', 'realsrv', 'juicyads', 'melbet', '1xbet', 'mostbet', 'bet365', 'tapbit', 'okx', 'cryptoad', 'smartcpm', 'clickunder', 'adtarget', 'traffic']): continue
-                            clean_url = m_url.replace(r'\/', '/')
-                            if 'bunny' not in clean_url.lower():
-                                return {"url": clean_url, "type": "mp4", "headers": {"Referer": final_url}}
+                    clean_url = ad_filter.first(m_url.replace(r'\/', '/') for m_url in mp4_matches)
+                    if clean_url:
+                        return {"url": clean_url, "type": "mp4", "headers": {"Referer": final_url}}
                     
                     # Search specifically for file: "https://..." in scripts (JWPlayer/VideoJS style)
                     script_file_match = re.search(r'file\s*[:=]\s*["\'](https?://[^"\']+)["\']', all_text)
                     if script_file_match:
                         file_url = script_file_match.group(1).replace(r'\/', '/')
-                        if any(x in file_url.lower() for x in ['.m3u8', '.mp4']) and 'bunny' not in file_url.lower() and not any(x in file_url.lower() for x in ['track', 'pixel', 'ads', 'loading', 'placeholder', 'advertisement', 'promo', 'popup', 'popunder', 'popad', 'click', 'tracker', 'analytics', 'stat', 'beacon', 'affiliate', 'banner', 'doubleclick', 'googlesyndication', 'google-analytics', 'googletagmanager', 'facebook', 'connect.facebook', 'twitter', 'google', 'amazon-adsystem', 'pubmatic', 'taboola', 'outbrain', 'revcontent', 'adnxs', 'aaxads', 'zedo', 'exoclick', 'popads', 'popcash', 'propellerads', 'onclickads', 'realsrv', 'juicyads', 'melbet', '1xbet', 'mostbet', 'bet365', 'tapbit', 'okx', 'cryptoad', 'smartcpm', 'clickunder', 'adtarget', 'traffic']):
+                        if ad_filter.score(file_url) > 0:
                             return {
                                 "url": file_url, 
                                 "type": "hls" if ".m3u8" in file_url else "mp4",
@@ -257,7 +301,7 @@ class ExtractorEngine:
                                 if stream_match:
                                     s_url = stream_match.group(1)
                                     # Check for ad-related content
-                                    if not any(x in s_url.lower() for x in ['track', 'pixel', 'ads', 'loading', 'placeholder', 'advertisement', 'promo', 'popup', 'popunder', 'popad', 'click', 'tracker', 'analytics', 'stat', 'beacon', 'affiliate', 'banner', 'doubleclick', 'googlesyndication', 'google-analytics', 'googletagmanager', 'facebook', 'connect.facebook', 'twitter', 'google', 'amazon-adsystem', 'pubmatic', 'taboola', 'outbrain', 'revcontent', 'adnxs', 'aaxads', 'zedo', 'exoclick', 'popads', 'popcash', 'propellerads', 'onclickads', 'realsrv', 'juicyads', 'melbet', '1xbet', 'mostbet', 'bet365', 'tapbit', 'okx', 'cryptoad', 'smartcpm', 'clickunder', 'adtarget', 'traffic']):
+                                    if not ad_filter.is_blocked(s_url):
                                         return {
                                             "url": s_url, 
                                             "type": "hls" if ".m3u8" in s_url else "mp4",
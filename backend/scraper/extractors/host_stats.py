@@ -0,0 +1,148 @@
+import bisect
+import math
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, TypeVar
+from urllib.parse import urlparse
+
+T = TypeVar("T")
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.1, 0.2, 0.35, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 7.5, 10.0, 15.0, 20.0, 30.0, math.inf)
+
+class _Host:
+    __slots__ = ("success", "failure", "buckets", "updated_at", "last_ok")
+
+    def __init__(self, now: float):
+        self.success = 0.0
+        self.failure = 0.0
+        self.buckets = [0.0] * len(LATENCY_BUCKETS)
+        self.updated_at = now
+        self.last_ok: Optional[float] = None
+
+    def decay(self, factor: float, now: float):
+        self.success *= factor
+        self.failure *= factor
+        self.buckets = [w * factor for w in self.buckets]
+        self.updated_at = now
+
+    def quantile(self, q: float) -> Optional[float]:
+        total = sum(self.buckets)
+        if total <= 0:
+            return None
+        threshold, seen = total * q, 0.0
+        for bound, weight in zip(LATENCY_BUCKETS, self.buckets):
+            seen += weight
+            if seen >= threshold:
+                return bound if bound != math.inf else LATENCY_BUCKETS[-2] * 2
+        return LATENCY_BUCKETS[-2] * 2
+
+class HostStats:
+    """
+    Per-host extraction telemetry: success/failure counts and a latency
+    histogram (for p50/p95), all decaying with a half-life so a host that
+    recovers, or goes bad, is reflected within the hour. Used to try the
+    hosts most likely to produce a playable stream first and to drop hosts
+    that have been failing consistently.
+    """
+    def __init__(self, half_life: float = 3600, dead_after: float = 5, dead_rate: float = 0.1):
+        self.half_life = half_life
+        self.dead_after = dead_after  # Decayed attempts needed before a host can be pruned
+        self.dead_rate = dead_rate
+        self._hosts: Dict[str, _Host] = {}
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        return urlparse(url or "").netloc.lower().removeprefix("www.")
+
+    def _entry(self, url: str) -> Optional[_Host]:
+        return self._decayed(self.host_of(url))
+
+    def _decayed(self, host: str) -> Optional[_Host]:
+        entry = self._hosts.get(host)
+        if entry is not None:
+            now = time.time()
+            entry.decay(0.5 ** ((now - entry.updated_at) / self.half_life), now)
+        return entry
+
+    def record(self, url: str, ok: bool, latency: float):
+        host = self.host_of(url)
+        if not host:
+            return
+        entry = self._decayed(host)
+        if entry is None:
+            entry = self._hosts[host] = _Host(time.time())
+        if ok:
+            entry.success += 1
+            entry.last_ok = time.time()
+        else:
+            entry.failure += 1
+        entry.buckets[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+
+    def record_timeout(self, url: str, elapsed: float):
+        """
+        Records an extraction the caller gave up on: `elapsed` is only a
+        lower bound on the host's latency, so it slows the host down in the
+        ranking without counting as a failure (which could prune it).
+        """
+        host = self.host_of(url)
+        if not host:
+            return
+        entry = self._decayed(host)
+        if entry is None:
+            entry = self._hosts[host] = _Host(time.time())
+        entry.buckets[bisect.bisect_left(LATENCY_BUCKETS, elapsed)] += 1
+
+    @staticmethod
+    def _rate(entry: Optional[_Host]) -> float:
+        if entry is None:
+            return 0.5  # Unknown hosts sit between good and bad ones
+        # Laplace smoothing keeps one lucky or unlucky call from dominating
+        return (entry.success + 1) / (entry.success + entry.failure + 2)
+
+    def success_rate(self, url: str) -> float:
+        return self._rate(self._entry(url))
+
+    def is_dead(self, url: str) -> bool:
+        entry = self._entry(url)
+        return (entry is not None
+                and entry.success + entry.failure >= self.dead_after
+                and self._rate(entry) < self.dead_rate)
+
+    def score(self, url: str) -> float:
+        """Higher is better: success probability per second of median latency."""
+        entry = self._entry(url)
+        p50 = entry.quantile(0.5) if entry else None
+        return self._rate(entry) / (1.0 + (p50 if p50 is not None else 5.0))
+
+    def rank(self, items: Iterable[T], url_of: Callable[[T], str]) -> List[T]:
+        """Stable sort of `items` by the score of their urls, best first."""
+        return sorted(items, key=lambda item: -self.score(url_of(item)))
+
+    def order_servers(self, servers: List[Dict[str, Any]], url_key: str = "url") -> List[Dict[str, Any]]:
+        """
+        Drops servers on consistently failing hosts (unless that would drop
+        them all) and moves the fastest reliable hosts to the front. Ties
+        keep the caller's order, so static priorities still apply.
+        """
+        return self.rank(self.drop_dead(servers, url_key), lambda s: s.get(url_key, ""))
+
+    def drop_dead(self, servers: List[Dict[str, Any]], url_key: str = "url") -> List[Dict[str, Any]]:
+        """Servers not on consistently failing hosts, or all of them if none is left."""
+        alive = [s for s in servers if not self.is_dead(s.get(url_key, ""))]
+        return alive or list(servers)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        result = {}
+        for host in list(self._hosts):
+            entry = self._decayed(host)
+            result[host] = {
+                "success": round(entry.success, 2),
+                "failure": round(entry.failure, 2),
+                "success_rate": round(self._rate(entry), 3),
+                "p50": entry.quantile(0.5),
+                "p95": entry.quantile(0.95),
+                "last_ok": entry.last_ok,
+            }
+        return result
+
+host_stats = HostStats()
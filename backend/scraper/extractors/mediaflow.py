@@ -0,0 +1,60 @@
+"""
+Bridge to the vendored mediaflow-proxy extractors (ExtractorFactory).
+The package is imported lazily on first use; if it or its dependencies
+are missing, its routes simply report no result.
+"""
+import os
+import sys
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+_MEDIAFLOW_ROOT = os.path.join(os.path.dirname(__file__), "mediaflow-proxy-main")
+
+# ExtractorFactory key -> host labels it serves (hosts without a native extractor)
+MEDIAFLOW_HOSTS = {
+    "FileMoon": ("filemoon",),
+    "FileLions": ("filelions",),
+    "LuluStream": ("lulustream", "luluvdo"),
+    "StreamWish": ("streamwish", "swdyu", "wishembed"),
+    "Supervideo": ("supervideo",),
+    "Uqload": ("uqload",),
+    "TurboVidPlay": ("turbovidplay",),
+    "VixCloud": ("vixcloud",),
+    "Maxstream": ("maxstream",),
+    "Fastream": ("fastream",),
+}
+
+_factory = None
+_unavailable = False
+
+def _load_factory():
+    global _factory, _unavailable
+    if _factory is not None or _unavailable:
+        return _factory
+    if _MEDIAFLOW_ROOT not in sys.path:
+        sys.path.append(_MEDIAFLOW_ROOT)
+    try:
+        from mediaflow_proxy.extractors.factory import ExtractorFactory
+        _factory = ExtractorFactory
+    except Exception as e:
+        _unavailable = True
+        logger.warning(f"mediaflow extractors unavailable: {e}")
+    return _factory
+
+async def extract_with_mediaflow(host_key: str, url: str) -> Optional[dict]:
+    factory = _load_factory()
+    if factory is None:
+        return None
+    try:
+        extractor = factory.get_extractor(host_key, {"referer": url})
+        res = await extractor.extract(url)
+    except Exception as e:
+        logger.debug(f"mediaflow {host_key} failed for {url}: {e}")
+        return None
+    dest = (res or {}).get("destination_url")
+    if not dest:
+        return None
+    is_hls = res.get("mediaflow_endpoint") == "hls_manifest_proxy" or ".m3u8" in dest
+    return {"url": dest, "type": "hls" if is_hls else "mp4", "headers": res.get("request_headers", {})}
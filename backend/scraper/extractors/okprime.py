@@ -1,6 +1,7 @@
 import re
 import logging
-from curl_cffi.requests import AsyncSession
+from scraper.extractors.sessions import session_pool
+from scraper.extractors.packer import unpack, unpack_all
 
 logger = logging.getLogger(__name__)
 
@@ -8,45 +9,9 @@ class OkPrimeExtractor:
     @staticmethod
     def _decode_packed(packed_str):
         """
-        Decodes Dean Edwards packer code.
+        Decodes Dean Edwards packer code (see scraper.extractors.packer).
         """
-        try:
-            # More flexible pattern for Dean Edwards packer
-            pattern = r"\}\s*\(\s*['\"](.*?)['\"]\s*,\s*(\d+)\s*,\s*(\d+)\s*,\s*['\"](.*?)['\"]\s*\.\s*split\s*\(\s*['\"]\|['\"]\s*\)"
-            match = re.search(pattern, packed_str)
-            
-            if not match:
-                # Try another common pattern
-                pattern = r"return p\}\s*\(\s*['\"](.*?)['\"]\s*,\s*(\d+)\s*,\s*(\d+)\s*,\s*['\"](.*?)['\"]\s*\.split"
-                match = re.search(pattern, packed_str)
-            
-            if not match:
-                return None
-                
-            p = match.group(1)
-            a = int(match.group(2))
-            c = int(match.group(3))
-            k = match.group(4).split('|')
-            
-            def baseN(num, b):
-                return ((num == 0) and "0") or \
-                       (baseN(num // b, b).lstrip("0") + "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"[num % b])
-
-            d = {}
-            for i in range(c):
-                key = baseN(i, a)
-                if i < len(k):
-                     val = k[i] if k[i] else key
-                     d[key] = val
-                     
-            def replace(match):
-                word = match.group(0)
-                return d.get(word, word)
-            
-            return re.sub(r"\b\w+\b", replace, p)
-        except Exception as e:
-            logger.error(f"Error unpacking script: {e}")
-            return None
+        return unpack(packed_str)
 
     @classmethod
     async def extract(cls, url: str, depth: int = 0) -> dict | None:
@@ -67,7 +32,7 @@ class OkPrimeExtractor:
         }
 
         try:
-            async with AsyncSession(impersonate="chrome124", verify=False, timeout=20) as session:
+            async with session_pool.session(timeout=20) as session:
                 logger.info(f"Fetching OkPrime [D:{depth}]: {url}")
                 resp = await session.get(url, headers=headers)
                 if resp.status_code != 200: return None
@@ -95,12 +60,7 @@ class OkPrimeExtractor:
 
                 # 3. Find and unpack the script (Dean Edwards Packer)
                 # Patterns to find packed code: eval(function(p,a,c,k,e,d)...)
-                all_text = content
-                packed_matches = re.findall(r'eval\(function\(p,a,c,k,e,d\).+?split\([\'"]\|[\'"]\)\)', content, re.DOTALL)
-                for p in packed_matches:
-                    unpacked = cls._decode_packed(p)
-                    if unpacked:
-                        all_text += "\n" + unpacked
+                all_text = unpack_all(content)
 
                 # 4. Extract direct Stream (M3U8 highest priority, then MP4)
                 # Priority 1: M3U8
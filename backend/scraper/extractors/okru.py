@@ -4,7 +4,7 @@ import json
 import logging
 from typing import Optional
 from html import unescape
-from curl_cffi.requests import AsyncSession
+from scraper.extractors.sessions import session_pool
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +20,7 @@ class OkRuExtractor:
                 'Referer': 'https://ok.ru/'
             }
             
-            async with AsyncSession(impersonate="chrome124", verify=False, timeout=30) as client:
+            async with session_pool.session(timeout=30) as client:
                 response = await client.get(url, headers=headers, allow_redirects=True)
                 if response.status_code != 200: return None
 
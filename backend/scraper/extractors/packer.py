@@ -0,0 +1,111 @@
+"""
+Dean Edwards p.a.c.k.e.r. unpacker shared by all extractors.
+
+Symbol keys are built with an iterative base conversion and substituted
+in one split/join pass over the payload's word tokens. Results are
+memoised by payload digest, since the same player script is often
+unpacked by several extractors for one page.
+"""
+import hashlib
+import logging
+import re
+from collections import OrderedDict
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+PACKED_MARKER = "eval(function(p,a,c,k,e,"
+
+# A whole packed script, as it appears in a page; the stock packer ends the
+# call with ",0,{}))", some obfuscators drop those two arguments
+_PACKED_BLOCK = re.compile(
+    r"eval\(function\(p,a,c,k,e,[dr]\).+?split\(\s*['\"]\|['\"]\s*\)(?:\s*,\s*0\s*,\s*\{\s*\})?\s*\)",
+    re.DOTALL,
+)
+# The packer's call arguments: payload, radix, count, keywords
+_ARGS = re.compile(
+    r"\}\s*\(\s*(['\"])(.*?)\1\s*,\s*(\d+|\[\])\s*,\s*(\d+)\s*,\s*(['\"])(.*?)\5\s*\.\s*split\s*\(\s*['\"]\|['\"]\s*\)",
+    re.DOTALL,
+)
+_TOKEN = re.compile(r"(\w+)")
+_ALPHABET = "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+_cache: "OrderedDict[bytes, Optional[str]]" = OrderedDict()
+_CACHE_SIZE = 256
+
+def detect(text: str) -> bool:
+    return PACKED_MARKER in text
+
+def to_base(num: int, radix: int) -> str:
+    """Iterative equivalent of the packer's recursive encoder."""
+    if num == 0:
+        return "0"
+    digits = []
+    while num:
+        num, rem = divmod(num, radix)
+        digits.append(_ALPHABET[rem])
+    return "".join(reversed(digits))
+
+def _decode(packed: str) -> Optional[str]:
+    match = _ARGS.search(packed)
+    if not match:
+        return None
+    payload, radix, count, keywords = match.group(2), match.group(3), int(match.group(4)), match.group(6)
+    radix = 62 if radix == "[]" else int(radix)
+    if not 2 <= radix <= 62:
+        return None
+    symbols = keywords.split("|")[:count]
+    table = {to_base(i, radix): word for i, word in enumerate(symbols) if word}
+
+    payload = payload.replace("\\\\", "\\").replace("\\'", "'")
+    # Odd positions of the split are the \w+ tokens; swap each for its symbol
+    parts = _TOKEN.split(payload)
+    get = table.get
+    parts[1::2] = [get(word, word) for word in parts[1::2]]
+    return "".join(parts)
+
+def unpack(packed: str) -> Optional[str]:
+    """Unpacks one packed script; None when `packed` is not packer output."""
+    if not packed:
+        return None
+    key = hashlib.blake2b(packed.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+    if key in _cache:
+        _cache.move_to_end(key)
+        return _cache[key]
+    try:
+        result = _decode(packed)
+    except Exception as e:
+        logger.debug(f"Unpacking failed: {e}")
+        result = None
+    _cache[key] = result
+    if len(_cache) > _CACHE_SIZE:
+        _cache.popitem(last=False)
+    return result
+
+def find_packed(text: str) -> List[str]:
+    return _PACKED_BLOCK.findall(text) if detect(text) else []
+
+def unpack_all(text: str, max_depth: int = 5) -> str:
+    """
+    Returns `text` followed by every unpacked layer, up to `max_depth`
+    levels of packed-inside-packed. Only the newly unpacked code is scanned
+    at each level, and the result is joined once at the end.
+    """
+    layers: List[str] = []
+    seen = set()
+    frontier = [text]
+    for _ in range(max_depth):
+        found = []
+        for chunk in frontier:
+            for block in find_packed(chunk):
+                if block in seen:
+                    continue
+                seen.add(block)
+                unpacked = unpack(block)
+                if unpacked:
+                    found.append(unpacked)
+        if not found:
+            break
+        layers.extend(found)
+        frontier = found
+    return "\n".join([text] + layers) if layers else text
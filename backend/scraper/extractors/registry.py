@@ -0,0 +1,86 @@
+import logging
+import re
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Pattern, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[str], Awaitable[Optional[dict]]]
+
+class Route(NamedTuple):
+    name: str
+    handler: Handler
+    domains: Tuple[str, ...]   # Host suffixes on label boundaries ("ok.ru" matches "m.ok.ru")
+    brands: Tuple[str, ...]    # Exact host labels, for hosts that rotate TLDs ("mixdrop" matches "mixdrop.ag")
+    patterns: Tuple[str, ...]  # Regexes on the host, for anything the two above cannot express
+
+class ExtractorRouter:
+    """
+    Declarative host -> extractor routing. Routes are compiled into hash
+    tables keyed by domain suffix and by host label, so resolving a host
+    costs one lookup per label instead of scanning every substring list.
+    A host may match several routes; they are returned in registration
+    order, which is the order the engine tries them in.
+    """
+    def __init__(self, cache_size: int = 4096):
+        self._routes: List[Route] = []
+        self._domains: Dict[str, List[int]] = {}
+        self._brands: Dict[str, List[int]] = {}
+        self._patterns: List[Tuple[Pattern, int]] = []
+        self._resolved: "OrderedDict[str, Tuple[Route, ...]]" = OrderedDict()
+        self._cache_size = cache_size
+
+    def register(self, name: str, handler: Handler, domains=(), brands=(), patterns=()) -> Route:
+        route = Route(name, handler, tuple(domains), tuple(brands), tuple(patterns))
+        index = len(self._routes)
+        self._routes.append(route)
+        for domain in route.domains:
+            self._domains.setdefault(domain.lower().strip("."), []).append(index)
+        for brand in route.brands:
+            self._brands.setdefault(brand.lower(), []).append(index)
+        for pattern in route.patterns:
+            self._patterns.append((re.compile(pattern, re.IGNORECASE), index))
+        self._resolved.clear()
+        return route
+
+    def route(self, name: str, domains=(), brands=(), patterns=()):
+        """Decorator form of register()."""
+        def decorator(handler: Handler) -> Handler:
+            self.register(name, handler, domains, brands, patterns)
+            return handler
+        return decorator
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        return urlparse(url or "").netloc.lower().split(":")[0].removeprefix("www.")
+
+    def _resolve(self, host: str) -> Tuple[Route, ...]:
+        labels = host.split(".")
+        matched = set()
+        for i in range(len(labels)):
+            matched.update(self._domains.get(".".join(labels[i:]), ()))
+        # The last label is the TLD; brands are matched on the labels before it
+        for label in labels[:-1]:
+            matched.update(self._brands.get(label, ()))
+        for regex, index in self._patterns:
+            if index not in matched and regex.search(host):
+                matched.add(index)
+        return tuple(self._routes[i] for i in sorted(matched))
+
+    def routes_for(self, url: str) -> Tuple[Route, ...]:
+        host = self.host_of(url)
+        routes = self._resolved.get(host)
+        if routes is None:
+            routes = self._resolved[host] = self._resolve(host)
+            if len(self._resolved) > self._cache_size:
+                self._resolved.popitem(last=False)
+        return routes
+
+    def dump(self) -> List[Dict[str, Any]]:
+        return [
+            {"name": r.name, "domains": list(r.domains), "brands": list(r.brands), "patterns": list(r.patterns)}
+            for r in self._routes
+        ]
+
+extractor_router = ExtractorRouter()
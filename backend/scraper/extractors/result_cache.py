@@ -0,0 +1,115 @@
+import os
+import time
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+logger = logging.getLogger(__name__)
+
+# Signed stream URLs expire at host-specific rates; first match wins.
+HOST_TTLS = (
+    (("streamtape",), 1200),
+    (("dood", "d000d", "ds2play", "dooood"), 1800),
+    (("voe.sx", "lauradaydo"), 1800),
+    (("mixdrop", "mxdrop"), 1800),
+    (("ok.ru", "odnoklassniki", "vk.com"), 3600),
+    (("vidmoly", "vidoba"), 3600),
+)
+DEFAULT_TTL = 3600
+NEGATIVE_TTL = 120
+# Keep a margin so clients are not handed a URL about to expire
+EXPIRY_MARGIN = 60
+
+class ExtractionCache:
+    """
+    Results of ExtractorEngine.extract, keyed by embed url. A bounded LRU in
+    memory sits in front of an on-disk store (SQLite WAL), which survives
+    restarts and is shared by every worker process. Failed extractions are
+    remembered for NEGATIVE_TTL so a dead host is not retried on each load.
+    """
+    def __init__(self, max_entries: int = 2000, persistent: bool = True):
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, Tuple[float, Optional[dict]]]" = OrderedDict()
+        self._store = None
+        if persistent:
+            try:
+                from app.core.cache import PersistentCache
+                path = os.path.join(os.path.dirname(__file__), "..", "..", "cache", "extractor_cache.db")
+                self._store = PersistentCache(os.path.abspath(path), max_bytes=32 * 1024 * 1024)
+            except ImportError:
+                self._store = None
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def ttl_for(url: str, result: Optional[dict]) -> int:
+        """Seconds to cache `result`; 0 when its stream url expires too soon to hand out."""
+        if not result:
+            return NEGATIVE_TTL
+        host = urlparse(url).netloc.lower()
+        ttl = next((t for fragments, t in HOST_TTLS if any(f in host for f in fragments)), DEFAULT_TTL)
+        # Respect an explicit expiry carried by the signed stream url
+        query = parse_qs(urlparse(result.get("url") or "").query)
+        for name in ("expires", "expiry", "exp", "e"):
+            value = (query.get(name) or [""])[0]
+            if value.isdigit():
+                expires_at = int(value) / 1000 if len(value) > 11 else int(value)
+                remaining = int(expires_at - time.time()) - EXPIRY_MARGIN
+                ttl = max(0, min(ttl, remaining))
+                break
+        return ttl
+
+    def _remember(self, url: str, expires_at: float, result: Optional[dict]):
+        self._memory[url] = (expires_at, result)
+        self._memory.move_to_end(url)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, url: str) -> Tuple[bool, Optional[dict]]:
+        """Returns (found, result); a cached failure is (True, None)."""
+        entry = self._memory.get(url)
+        if entry is not None and entry[0] > time.time():
+            self._memory.move_to_end(url)
+        else:
+            entry = None
+            if self._store:
+                stored = self._store.get(f"extract_{url}")
+                if stored:
+                    entry = (stored["expires_at"], stored["result"])
+                    self._remember(url, *entry)
+        if entry is None:
+            self.misses += 1
+            return False, None
+        if entry[1] is None:
+            self.negative_hits += 1
+        else:
+            self.hits += 1
+        return True, entry[1]
+
+    def set(self, url: str, result: Optional[dict]):
+        ttl = self.ttl_for(url, result)
+        if ttl <= 0:
+            # Already (nearly) expired: serving it from cache would only fail in the player
+            self._memory.pop(url, None)
+            return
+        expires_at = time.time() + ttl
+        self._remember(url, expires_at, result)
+        if self._store:
+            self._store.set(f"extract_{url}", {"expires_at": expires_at, "result": result}, ttl_seconds=ttl)
+
+    def clear(self):
+        self._memory.clear()
+        if self._store:
+            self._store.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._memory),
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+        }
+
+extraction_cache = ExtractionCache()
@@ -0,0 +1,166 @@
+import asyncio
+import http.cookies
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from curl_cffi import CurlOpt
+from curl_cffi.requests import AsyncSession, Cookies
+
+logger = logging.getLogger(__name__)
+
+class PooledSession:
+    """
+    Per-call view of a shared AsyncSession. Applies the caller's defaults
+    (timeout, redirects) and the per-host limit; leaving the `async with`
+    block does not close the underlying session.
+
+    Only connections are shared: each view has its own cookie jar, so
+    cookies and anti-bot tokens picked up by one extraction never reach
+    another, and concurrent extractions of one host do not clobber each
+    other's state. The shared session's jar is never written to.
+    """
+    def __init__(self, pool: "SessionPool", session: AsyncSession, defaults: Dict[str, Any]):
+        self._pool = pool
+        self._session = session
+        self._defaults = defaults
+        self.cookies = Cookies()
+
+    async def request(self, method: str, url: str, **kwargs):
+        for key, value in self._defaults.items():
+            kwargs.setdefault(key, value)
+        cookies = Cookies(self.cookies)
+        if kwargs.get("cookies"):
+            cookies.update(kwargs["cookies"])
+        kwargs["cookies"] = cookies
+        kwargs["discard_cookies"] = True
+        async with self._pool._host_slot(url):
+            resp = await self._session.request(method, url, **kwargs)
+        self._keep_cookies(resp)
+        return resp
+
+    def _keep_cookies(self, resp):
+        """Stores the Set-Cookie headers of the response and its redirects in this view's jar."""
+        for hop in [*resp.history, resp]:
+            host = urlparse(hop.url or "").hostname or ""
+            for header in hop.headers.get_list("set-cookie"):
+                try:
+                    parsed = http.cookies.SimpleCookie()
+                    parsed.load(header)
+                except http.cookies.CookieError:
+                    continue
+                for name, morsel in parsed.items():
+                    self.cookies.set(name, morsel.value, domain=morsel["domain"] or host,
+                                     path=morsel["path"] or "/", secure=bool(morsel["secure"]))
+
+    async def get(self, url: str, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs):
+        return await self.request("POST", url, **kwargs)
+
+    async def head(self, url: str, **kwargs):
+        return await self.request("HEAD", url, **kwargs)
+
+    async def __aenter__(self) -> "PooledSession":
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+class SessionPool:
+    """
+    Process-wide curl_cffi sessions keyed by (impersonation profile, proxy).
+    Connections, TLS sessions and DNS lookups are reused across extractor
+    calls instead of being thrown away after every request; cookies are
+    scoped to each borrowed PooledSession.
+    """
+    def __init__(self, max_clients: int = 64, per_host: int = 6, dns_cache_ttl: int = 300):
+        self.max_clients = max_clients
+        self.per_host = per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self._sessions: Dict[Tuple[str, Optional[str]], AsyncSession] = {}
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.requests = 0
+
+    def _bind_loop(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Sessions and semaphores belong to the loop that created them
+            stale, self._sessions = list(self._sessions.values()), {}
+            self._host_limits.clear()
+            old_loop, self._loop = self._loop, loop
+            if stale:
+                self._close_stale(stale, old_loop)
+
+    @staticmethod
+    def _close_stale(sessions, loop: Optional[asyncio.AbstractEventLoop]):
+        """Closes sessions left on another event loop instead of leaking their handles."""
+        if loop is not None and loop.is_running():
+            for session in sessions:
+                asyncio.run_coroutine_threadsafe(session.close(), loop)
+            return
+        # Their loop has stopped, so close() cannot run on it; free the pooled
+        # curl handles directly (the multi handle goes with the session)
+        for session in sessions:
+            while True:
+                try:
+                    curl = session.pool.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if curl:
+                    curl.close()
+        logger.info(f"Dropped {len(sessions)} pooled session(s) of a stopped event loop")
+
+    def _get_session(self, impersonate: str, proxy: Optional[str]) -> AsyncSession:
+        self._bind_loop()
+        key = (impersonate, proxy)
+        session = self._sessions.get(key)
+        if session is None:
+            session = AsyncSession(
+                impersonate=impersonate,
+                proxy=proxy,
+                verify=False,
+                max_clients=self.max_clients,
+                curl_options={
+                    CurlOpt.DNS_CACHE_TIMEOUT: self.dns_cache_ttl,
+                    CurlOpt.TCP_KEEPALIVE: 1,
+                },
+            )
+            self._sessions[key] = session
+            logger.info(f"Opened pooled session for {impersonate} (proxy={proxy or 'none'})")
+        return session
+
+    @asynccontextmanager
+    async def _host_slot(self, url: str):
+        host = urlparse(url).netloc.lower()
+        limit = self._host_limits.get(host)
+        if limit is None:
+            limit = self._host_limits[host] = asyncio.Semaphore(self.per_host)
+        self.requests += 1
+        async with limit:
+            yield
+
+    def session(self, impersonate: str = "chrome124", proxy: Optional[str] = None, **defaults) -> PooledSession:
+        """Borrows the shared session; use as `async with session_pool.session(timeout=20) as s:`."""
+        return PooledSession(self, self._get_session(impersonate, proxy), defaults)
+
+    async def close(self):
+        sessions, self._sessions = list(self._sessions.values()), {}
+        for session in sessions:
+            try:
+                await session.close()
+            except Exception as e:
+                logger.debug(f"Error closing pooled session: {e}")
+        self._host_limits.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sessions": [f"{imp}|{proxy or '-'}" for imp, proxy in self._sessions],
+            "hosts": len(self._host_limits),
+            "requests": self.requests,
+        }
+
+session_pool = SessionPool()
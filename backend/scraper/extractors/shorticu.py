@@ -3,7 +3,7 @@ import re
 import logging
 import asyncio
 from typing import Optional, Dict
-from curl_cffi.requests import AsyncSession
+from scraper.extractors.sessions import session_pool
 from urllib.parse import urljoin
 
 logger = logging.getLogger(__name__)
@@ -17,7 +17,7 @@ class ShortIcuExtractor:
                 "Referer": "https://larooza.top/"
             }
             
-            async with AsyncSession(impersonate="chrome124", verify=False, timeout=20) as session:
+            async with session_pool.session(timeout=20) as session:
                 logger.info(f"🔗 Bypassing Short.icu: {url}")
                 
                 # تتبع التحويلات (Redirects)
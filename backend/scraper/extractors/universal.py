@@ -6,7 +6,9 @@ Supports: Film77, Vidspeed, Abstream, Mxdrop, Dsvplay, Short.icu, etc.
 import re
 import logging
 from typing import Optional, Dict
-from curl_cffi.requests import AsyncSession
+from scraper.extractors.sessions import session_pool
+from scraper.extractors.url_filter import basic_filter
+from scraper.extractors.packer import unpack, unpack_all
 from urllib.parse import urlparse, urljoin
 
 logger = logging.getLogger(__name__)
@@ -17,32 +19,7 @@ class UniversalExtractor:
     @staticmethod
     def _unpack_js(packed: str) -> str:
         """Unpacks JavaScript packed code (eval(function(p,a,c,k,e,d)))"""
-        try:
-            # Extract the packed parameters
-            match = re.search(
-                r"}\('(.+)',(\d+),(\d+),'(.+)'\.split\('\|'\)",
-                packed,
-                re.DOTALL
-            )
-            if not match:
-                return ""
-            
-            payload, radix, count, symbols = match.groups()
-            radix = int(radix)
-            count = int(count)
-            symbols = symbols.split('|')
-            
-            def lookup(match):
-                word = match.group(0)
-                pos = int(word, radix) if radix > 10 else int(word)
-                return symbols[pos] if pos < len(symbols) and symbols[pos] else word
-            
-            # Replace all words with their symbols
-            unpacked = re.sub(r'\b\w+\b', lookup, payload)
-            return unpacked
-        except Exception as e:
-            logger.debug(f"Unpack failed: {e}")
-            return ""
+        return unpack(packed) or ""
     
     @staticmethod
     async def extract(url: str) -> Optional[Dict]:
@@ -59,7 +36,7 @@ class UniversalExtractor:
                 "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8"
             }
             
-            async with AsyncSession(impersonate="chrome124", verify=False, allow_redirects=True) as session:
+            async with session_pool.session(allow_redirects=True) as session:
                 logger.info(f"🔍 Universal extracting: {domain}")
                 resp = await session.get(url, headers=headers, timeout=20)
                 
@@ -85,17 +62,7 @@ class UniversalExtractor:
                         domain = urlparse(final_url).netloc.lower()
                 
                 # Unpack JavaScript if needed
-                all_text = text
-                if "eval(function(p,a,c,k,e,d)" in text:
-                    packed_matches = re.findall(
-                        r'eval\(function\(p,a,c,k,e,d\).+?split\([\'\"]\|[\'\"]\)\)',
-                        text,
-                        re.DOTALL
-                    )
-                    for packed in packed_matches:
-                        unpacked = UniversalExtractor._unpack_js(packed)
-                        if unpacked:
-                            all_text += "\n" + unpacked
+                all_text = unpack_all(text)
                 
                 # Fix protocol-relative URLs
                 all_text = re.sub(r'["\']//([^"\'\s]+\.(?:m3u8|mp4))', r'"https://\1', all_text)
@@ -129,7 +96,7 @@ class UniversalExtractor:
                         
                         # Validate it's a real video URL
                         if any(ext in video_url.lower() for ext in ['.m3u8', '.mp4']):
-                            if not any(skip in video_url.lower() for skip in ['track', 'pixel', 'ads', 'loading']):
+                            if not basic_filter.is_blocked(video_url):
                                 logger.info(f"✅ {domain} extracted: {video_url[:80]}...")
                                 return {
                                     "url": video_url,
@@ -141,7 +108,7 @@ class UniversalExtractor:
                 # Priority: M3U8
                 m3u8_matches = re.findall(r'(https?://[^"\'\s]+\.m3u8[^"\'\s]*)', all_text)
                 for m3u8_url in m3u8_matches:
-                    if not any(skip in m3u8_url.lower() for skip in ['track', 'pixel', 'ads', 'loading']):
+                    if not basic_filter.is_blocked(m3u8_url):
                         clean_url = m3u8_url.replace(r'\/', '/')
                         logger.info(f"✅ {domain} extracted (M3U8): {clean_url[:80]}...")
                         return {
@@ -153,7 +120,7 @@ class UniversalExtractor:
                 # Priority: MP4
                 mp4_matches = re.findall(r'(https?://[^"\'\s]+\.mp4[^"\'\s]*)', all_text)
                 for mp4_url in mp4_matches:
-                    if not any(skip in mp4_url.lower() for skip in ['track', 'pixel', 'ads', 'loading']):
+                    if not basic_filter.is_blocked(mp4_url):
                         clean_url = mp4_url.replace(r'\/', '/')
                         logger.info(f"✅ {domain} extracted (MP4): {clean_url[:80]}...")
                         return {
@@ -2,7 +2,8 @@
 import re
 import logging
 from typing import Optional
-from curl_cffi.requests import AsyncSession
+from scraper.extractors.sessions import session_pool
+from scraper.extractors.packer import unpack
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +19,7 @@ class VidmolyExtractor:
                 "Referer": url
             }
             
-            async with AsyncSession(impersonate="chrome124", verify=False) as session:
+            async with session_pool.session() as session:
                 resp = await session.get(url, headers=headers)
                 text = resp.text
                 
@@ -45,8 +46,7 @@ class VidmolyExtractor:
                     # Generic unpacker (borrowed from OkPrime logic if needed, but usually simple regex works on unpacked too)
                     # For now, let's try to assume the sources are not heavily packed or we need a specific unpacker import
                     # We can assume `file:` is inside the packed code
-                    from scraper.extractors.okprime import OkPrimeExtractor
-                    unpacked = OkPrimeExtractor._decode_packed(text)
+                    unpacked = unpack(text)
                     if unpacked:
                         sources = re.findall(r'file\s*:\s*["\'](https?://[^"\']+)["\']', unpacked)
                         for src in sources:
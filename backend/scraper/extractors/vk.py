@@ -3,7 +3,7 @@ import re
 import json
 import logging
 from typing import Optional, Dict
-from curl_cffi.requests import AsyncSession
+from scraper.extractors.sessions import session_pool
 
 logger = logging.getLogger(__name__)
 
@@ -16,7 +16,7 @@ class VKExtractor:
                 "Referer": "https://vk.com/"
             }
             
-            async with AsyncSession(impersonate="chrome124", verify=False, timeout=30) as session:
+            async with session_pool.session(timeout=30) as session:
                 resp = await session.get(url, headers=headers, allow_redirects=True)
                 if resp.status_code != 200: return None
                 
@@ -6,7 +6,7 @@ import logging
 import asyncio
 from typing import Optional, Dict, Any
 from urllib.parse import urljoin
-from curl_cffi.requests import AsyncSession
+from scraper.extractors.sessions import session_pool
 
 logger = logging.getLogger(__name__)
 
@@ -52,7 +52,7 @@ class VoeExtractor:
             test_url = f"https://{domain}/e/{video_id}"
             try:
                 headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
-                async with AsyncSession(impersonate="chrome124", verify=False, timeout=15) as session:
+                async with session_pool.session(timeout=15) as session:
                     resp = await session.get(test_url, headers=headers, allow_redirects=True)
                     if resp.status_code != 200: continue
                     
@@ -0,0 +1,267 @@
+import asyncio
+import logging
+import math
+import os
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+from urllib.parse import urlparse
+
+logger = logging.getLogger("scraper.mirrors")
+
+T = TypeVar("T")
+
+# Prior for a mirror we have never measured: assume it is slowish but healthy
+PRIOR_LATENCY = 2.0
+# Seconds added to a mirror's score for an error rate of 1.0
+ERROR_PENALTY = 20.0
+# Hedge delay bounds and the default before any latency has been measured
+MIN_HEDGE_DELAY = 0.3
+MAX_HEDGE_DELAY = 4.0
+DEFAULT_HEDGE_DELAY = 1.5
+
+class ResourceMissing(Exception):
+    """Raised by a fetch attempt when the mirror answered but has no such page (e.g. 404)."""
+
+class _Mirror:
+    __slots__ = ("latency", "error", "samples", "recent")
+
+    def __init__(self, latency: Optional[float] = None, error: float = 0.0, samples: int = 0):
+        self.latency = latency
+        self.error = error
+        self.samples = samples
+        self.recent: deque = deque(maxlen=64)
+
+class MirrorTable:
+    """
+    Mirrors of one site ranked by an EWMA of latency and error rate, plus
+    hedged fetching across them: the best mirror is asked first and, if it
+    has not answered within the p90 of recent latencies, the next-best one
+    is raced against it; the first good answer wins and the rest are
+    cancelled. A failed attempt starts the next mirror immediately. An
+    attempt raising ResourceMissing also moves on, but only its latency is
+    recorded: a missing page says nothing about the mirror's health.
+
+    The ranking is saved to the scraper cache directory so a restart does
+    not begin by timing out on a mirror that was already known to be dead.
+    """
+    def __init__(self, name: str, mirrors: Iterable[str], alpha: float = 0.3, max_in_flight: int = 3,
+                 persistent: bool = True, save_interval: float = 30.0):
+        self.name = name
+        self.alpha = alpha
+        self.max_in_flight = max_in_flight
+        self.save_interval = save_interval
+        self._mirrors: Dict[str, _Mirror] = {}
+        self._order: List[str] = []  # Seed order, breaks ties between unmeasured mirrors
+        self._last_save = 0.0
+        self._dirty = False
+        self._save_task: Optional[asyncio.Future] = None
+        self.hedged = 0
+        self.hedge_wins = 0
+        for mirror in mirrors:
+            self.add(mirror)
+
+        self._store = None
+        if persistent:
+            try:
+                from app.core.cache import PersistentCache
+                path = os.path.join(os.path.dirname(__file__), "..", "cache", "mirrors.db")
+                self._store = PersistentCache(os.path.abspath(path), max_bytes=1024 * 1024)
+            except ImportError:
+                self._store = None
+        self._load()
+
+    @staticmethod
+    def origin_of(url: str) -> str:
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc}".lower()
+
+    def add(self, mirror: str, front: bool = False):
+        """Registers a mirror (e.g. a newly discovered domain)."""
+        mirror = self.origin_of(mirror)
+        if mirror not in self._mirrors:
+            self._mirrors[mirror] = _Mirror()
+        if mirror in self._order:
+            if not front:
+                return
+            self._order.remove(mirror)
+        self._order.insert(0, mirror) if front else self._order.append(mirror)
+
+    def _load(self):
+        if not self._store:
+            return
+        saved = self._store.get(f"mirrors_{self.name}") or {}
+        for mirror, state in saved.items():
+            # Domains discovered in earlier runs are kept, after the seed list
+            self.add(mirror)
+            self._mirrors[mirror] = _Mirror(state.get("latency"), state.get("error", 0.0), state.get("samples", 0))
+
+    def _snapshot(self, force: bool) -> Optional[Dict[str, Any]]:
+        """The state to persist, or None when there is nothing (yet) to save."""
+        if not self._store or not self._dirty:
+            return None
+        now = time.time()
+        if not force and now - self._last_save < self.save_interval:
+            return None
+        self._last_save = now
+        self._dirty = False
+        return {m: {"latency": s.latency, "error": s.error, "samples": s.samples} for m, s in self._mirrors.items()}
+
+    def _write(self, state: Dict[str, Any]):
+        self._store.set(f"mirrors_{self.name}", state, ttl_seconds=30 * 86400)
+
+    def save(self, force: bool = False):
+        state = self._snapshot(force)
+        if state is not None:
+            self._write(state)
+
+    def _save_soon(self):
+        """Persists the ranking at most every save_interval, off the event loop when there is one."""
+        state = self._snapshot(False)
+        if state is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write(state)
+            return
+        self._save_task = loop.create_task(asyncio.to_thread(self._write, state))
+
+    def _record_latency(self, entry: _Mirror, latency: float):
+        a = self.alpha
+        entry.latency = latency if entry.latency is None else (1 - a) * entry.latency + a * latency
+        entry.recent.append(latency)
+
+    def record(self, url: str, ok: bool, latency: float):
+        entry = self._mirrors.get(self.origin_of(url))
+        if entry is None:
+            return
+        entry.error = (1 - self.alpha) * entry.error + self.alpha * (0.0 if ok else 1.0)
+        if ok:
+            self._record_latency(entry, latency)
+        entry.samples += 1
+        self._dirty = True
+        self._save_soon()
+
+    def record_missing(self, url: str, latency: float):
+        """The mirror answered in `latency` that the resource does not exist; its error rate is unchanged."""
+        entry = self._mirrors.get(self.origin_of(url))
+        if entry is None:
+            return
+        self._record_latency(entry, latency)
+        entry.samples += 1
+        self._dirty = True
+        self._save_soon()
+
+    def record_timeout(self, url: str, elapsed: float):
+        """Folds in a lower bound on latency for an attempt that never finished."""
+        entry = self._mirrors.get(self.origin_of(url))
+        if entry is None:
+            return
+        latency = entry.latency if entry.latency is not None else PRIOR_LATENCY
+        if elapsed > latency:
+            entry.latency = (1 - self.alpha) * latency + self.alpha * elapsed
+            self._dirty = True
+
+    def score(self, mirror: str) -> float:
+        """Expected cost of asking `mirror` (lower is better)."""
+        entry = self._mirrors.get(self.origin_of(mirror))
+        if entry is None:
+            return PRIOR_LATENCY
+        latency = entry.latency if entry.latency is not None else PRIOR_LATENCY
+        return latency + entry.error * ERROR_PENALTY
+
+    def ranked(self) -> List[str]:
+        seed = {m: i for i, m in enumerate(self._order)}
+        return sorted(self._order, key=lambda m: (self.score(m), seed[m]))
+
+    def rank_urls(self, urls: Iterable[str]) -> List[str]:
+        """Orders candidate URLs by the rank of their mirror; unknown hosts keep their place."""
+        urls = list(dict.fromkeys(urls))
+        position = {u: i for i, u in enumerate(urls)}
+        return sorted(urls, key=lambda u: (self.score(u), position[u]))
+
+    def hedge_delay(self, url: str) -> float:
+        """p90 of the recent successful latencies of `url`'s mirror, clamped."""
+        entry = self._mirrors.get(self.origin_of(url))
+        samples = sorted(entry.recent) if entry else []
+        if not samples:
+            return DEFAULT_HEDGE_DELAY
+        p90 = samples[min(len(samples) - 1, math.ceil(0.9 * len(samples)) - 1)]
+        return min(max(p90, MIN_HEDGE_DELAY), MAX_HEDGE_DELAY)
+
+    async def fetch(self, urls: Iterable[str], attempt: Callable[[str], Awaitable[Optional[T]]]) -> Optional[Tuple[str, T]]:
+        """
+        Hedged fetch over candidate URLs (best mirror first). `attempt`
+        returns a result, or None / raises for a failed mirror, or raises
+        ResourceMissing when the mirror is fine but lacks the page. Returns
+        (winning url, result) or None when every candidate failed.
+        """
+        pending_urls = self.rank_urls(urls)
+        if not pending_urls:
+            return None
+        running: Dict[asyncio.Task, Tuple[str, float]] = {}
+
+        async def timed(url: str) -> Optional[T]:
+            start = time.monotonic()
+            try:
+                result = await attempt(url)
+            except asyncio.CancelledError:
+                raise
+            except ResourceMissing:
+                self.record_missing(url, time.monotonic() - start)
+                return None
+            except Exception as e:
+                logger.debug(f"[{self.name}] {url} failed: {e}")
+                result = None
+            self.record(url, result is not None, time.monotonic() - start)
+            return result
+
+        def launch():
+            url = pending_urls.pop(0)
+            running[asyncio.create_task(timed(url))] = (url, time.monotonic())
+
+        try:
+            launch()
+            first_url = next(iter(running.values()))[0]
+            while running:
+                # Wait for an answer, or until the newest attempt is overdue
+                newest_url, newest_start = max(running.values(), key=lambda v: v[1])
+                timeout = None
+                if pending_urls and len(running) < self.max_in_flight:
+                    timeout = max(0.0, newest_start + self.hedge_delay(newest_url) - time.monotonic())
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    self.hedged += 1
+                    launch()
+                    continue
+                for task in done:
+                    url, _ = running.pop(task)
+                    result = task.result()
+                    if result is not None:
+                        if url != first_url:
+                            self.hedge_wins += 1
+                        return url, result
+                # Failed attempts hand over to the next mirrors straight away
+                for _ in done:
+                    if pending_urls and len(running) < self.max_in_flight:
+                        launch()
+            return None
+        finally:
+            now = time.monotonic()
+            for task, (url, started) in running.items():
+                task.cancel()
+                # A cancelled loser was at least this slow; without this a hung
+                # mirror would never lose its rank
+                self.record_timeout(url, now - started)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ranked": [
+                {"mirror": m, "score": round(self.score(m), 3), "latency": self._mirrors[m].latency,
+                 "error_rate": round(self._mirrors[m].error, 3), "samples": self._mirrors[m].samples}
+                for m in self.ranked()
+            ],
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+        }
@@ -10,6 +10,11 @@ from urllib.parse import quote, urljoin, urlparse, unquote
 import httpx
 from bs4 import BeautifulSoup
 
+from scraper.extractors.host_stats import host_stats
+from scraper.mirrors import MirrorTable, ResourceMissing
+from scraper.parsing import make_soup, parse_items
+from scraper.utils import SingleFlight
+
 try:
     from curl_cffi.requests import AsyncSession
     HAS_CURL_CFFI = True
@@ -36,6 +41,55 @@ def retry(retries: int = 3, backoff: float = 1.0):
         return wrapper
     return decorator
 
+class HostRateLimiter:
+    """
+    Per-host token bucket for ArabSeed AJAX endpoints. Requests may run
+    concurrently as long as tokens are available; a 429/503 halves the
+    host's rate and pauses it (honouring Retry-After), and successes
+    slowly restore the rate (AIMD).
+    """
+    def __init__(self, rate: float = 4.0, burst: int = 4, min_rate: float = 0.5):
+        self.base_rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self._buckets: Dict[str, Dict[str, float]] = {}
+        self._lock = asyncio.Lock()
+
+    def _bucket(self, host: str) -> Dict[str, float]:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = {"tokens": float(self.burst), "rate": self.base_rate, "updated": time.monotonic(), "paused_until": 0.0}
+            self._buckets[host] = bucket
+        return bucket
+
+    async def acquire(self, host: str):
+        while True:
+            async with self._lock:
+                bucket = self._bucket(host)
+                now = time.monotonic()
+                bucket["tokens"] = min(self.burst, bucket["tokens"] + (now - bucket["updated"]) * bucket["rate"])
+                bucket["updated"] = now
+                if now >= bucket["paused_until"] and bucket["tokens"] >= 1:
+                    bucket["tokens"] -= 1
+                    return
+                wait = max(bucket["paused_until"] - now, (1 - bucket["tokens"]) / bucket["rate"])
+            await asyncio.sleep(wait)
+
+    def penalize(self, host: str, retry_after: Optional[float] = None):
+        bucket = self._bucket(host)
+        bucket["rate"] = max(self.min_rate, bucket["rate"] / 2)
+        bucket["tokens"] = 0.0
+        pause = retry_after if retry_after is not None else 1.0 / bucket["rate"]
+        bucket["paused_until"] = max(bucket["paused_until"], time.monotonic() + pause)
+        logger.warning(f"⏳ {host} is rate limiting us; slowing to {bucket['rate']:.2f} req/s for {pause:.1f}s")
+
+    def reward(self, host: str):
+        bucket = self._bucket(host)
+        bucket["rate"] = min(self.base_rate, bucket["rate"] + 0.25)
+
+# ArabSeed domains, ranked by measured latency and errors (shared, persisted)
+arabseed_mirrors = MirrorTable("arabseed", ["https://m2.arabseed.one", "https://asd.homes", "https://arabseed.live", "https://a.asd.homes"])
+
 class MyCimaScraper:
     """
     Scraper for ArabSeed (a.asd.homes) 
@@ -91,7 +145,7 @@ class MyCimaScraper:
         try:
             from app.core.cache import PersistentCache
             import os
-            cache_path = os.path.join(os.path.dirname(__file__), "..", "cache", "arabseed_cache.json")
+            cache_path = os.path.join(os.path.dirname(__file__), "..", "cache", "arabseed_cache.db")
             self._persistent_cache = PersistentCache(os.path.abspath(cache_path))
         except ImportError:
             self._persistent_cache = None
@@ -99,7 +153,8 @@ class MyCimaScraper:
         self._cache = {}
         self._cache_ttl = 3600 * 3 # 3 hours for faster updates
         self._semaphore = asyncio.Semaphore(50) # Maximum concurrency for speed
-        self.mirrors = ["https://m2.arabseed.one", "https://asd.homes", "https://arabseed.live", "https://a.asd.homes"]
+        self._inflight = SingleFlight("arabseed_html")
+        self._rate_limiter = HostRateLimiter()
 
     def clear_cache(self):
         """Clears both in-memory and persistent cache for this scraper."""
@@ -109,6 +164,10 @@ class MyCimaScraper:
         logger.info("🧹 ArabSeedScraper Cache Cleared")
 
     async def _get_html(self, url: str) -> Optional[str]:
+        # Concurrent requests for the same URL share one fetch
+        return await self._inflight.do(url, lambda: self._fetch_html(url))
+
+    async def _fetch_html(self, url: str) -> Optional[str]:
         async with self._semaphore:
             now = time.time()
             # 1. Memory Cache
@@ -129,45 +188,44 @@ class MyCimaScraper:
             query = urlparse(url).query
             if query: path += f"?{query}"
             
-            # Create a list of target URLs to try: current URL first, then mirrors
-            targets = [url]
-            for m in self.mirrors:
-                m_url = urljoin(m, path)
-                if m_url not in targets:
-                    targets.append(m_url)
+            # Candidate URLs: the url itself plus its counterpart on every mirror,
+            # tried in latency/error rank order with hedging
+            targets = [url] + [urljoin(m, path) for m in arabseed_mirrors.ranked()]
 
-            last_err = None
-            for target_url in targets:
+            async def attempt(target_url: str) -> Optional[str]:
                 try:
                     logger.info(f"Fetching (ArabSeed): {target_url}")
                     if HAS_CURL_CFFI:
                         resp = await self.session.get(target_url, headers=self.headers, allow_redirects=True)
                     else:
                         resp = await self.session.get(target_url, headers=self.headers, follow_redirects=True)
-                    
                     if resp.status_code == 200:
-                        # Auto-heal base_url if we found a working mirror
-                        new_base = f"{urlparse(target_url).scheme}://{urlparse(target_url).netloc}"
-                        if self.base_url != new_base:
-                            logger.info(f"🚀 ArabSeed auto-healed: {self.base_url} -> {new_base}")
-                            self.base_url = new_base
-                            # Rotate mirrors list
-                            if new_base in self.mirrors:
-                                self.mirrors.remove(new_base)
-                            self.mirrors.insert(0, new_base)
-
-                        self._cache[url] = (now, resp.text)
-                        if self._persistent_cache:
-                            self._persistent_cache.set(f"html_{url}", resp.text, ttl_seconds=self._cache_ttl)
                         return resp.text
-                    elif resp.status_code in [404, 403, 503]:
+                    if resp.status_code in [404, 403, 503]:
                         logger.warning(f"Mirror {target_url} returned {resp.status_code}")
-                        continue
+                    if resp.status_code in [404, 410]:
+                        raise ResourceMissing(target_url)
+                except ResourceMissing:
+                    raise
                 except Exception as e:
-                    last_err = e
                     logger.warning(f"Failed to fetch {target_url}: {e}")
-            
-            return None
+                return None
+
+            won = await arabseed_mirrors.fetch(targets, attempt)
+            if not won:
+                return None
+            target_url, text = won
+
+            # Auto-heal base_url if we found a working mirror
+            new_base = f"{urlparse(target_url).scheme}://{urlparse(target_url).netloc}"
+            if self.base_url != new_base:
+                logger.info(f"🚀 ArabSeed auto-healed: {self.base_url} -> {new_base}")
+                self.base_url = new_base
+
+            self._cache[url] = (now, text)
+            if self._persistent_cache:
+                self._persistent_cache.set(f"html_{url}", text, ttl_seconds=self._cache_ttl)
+            return text
 
     def _extract_items(self, soup: BeautifulSoup, base_url: str) -> List[Dict[str, Any]]:
         items = []
@@ -223,30 +281,34 @@ class MyCimaScraper:
             title = f"{title} - MOVIDO"
         return title.replace("LMINA", "MOVIDO").replace("lmina", "MOVIDO")
 
-    async def fetch_category(self, cat_id: str, page: int = 1) -> List[Dict[str, Any]]:
+    def category_path(self, cat_id: str) -> Optional[str]:
+        """Site path of a category, or None when ArabSeed has no such category."""
         path = self.category_map.get(cat_id)
+        # Try to use cat_id as fallback path if it looks like a relative path
+        if not path and cat_id.startswith('category/'):
+            path = f"/{cat_id}"
+        return path
+
+    async def fetch_category(self, cat_id: str, page: int = 1) -> List[Dict[str, Any]]:
+        path = self.category_path(cat_id)
         if not path:
-            # Try to use cat_id as fallback path if it looks like a relative path
-            if cat_id.startswith('category/'):
-                path = f"/{cat_id}"
-            else:
-                return []
-        
+            return []
+
         url = f"{self.base_url}{path}page/{page}/" if page > 1 else f"{self.base_url}{path}"
         html = await self._get_html(url)
-        return self._extract_items(BeautifulSoup(html, 'html.parser'), url) if html else []
+        return parse_items(url, html, lambda soup: self._extract_items(soup, url))
 
     async def fetch_home(self, page: int = 1) -> List[Dict[str, Any]]:
         # Recently added items
         url = f"{self.base_url}/recently/page/{page}/" if page > 1 else f"{self.base_url}/recently/"
         html = await self._get_html(url)
-        return self._extract_items(BeautifulSoup(html, 'html.parser'), url) if html else []
+        return parse_items(url, html, lambda soup: self._extract_items(soup, url))
 
     async def search(self, query: str) -> List[Dict[str, Any]]:
         # ArabSeed search structure
         url = f"{self.base_url}/find/?word={quote(query)}"
         html = await self._get_html(url)
-        return self._extract_items(BeautifulSoup(html, 'html.parser'), url) if html else []
+        return parse_items(url, html, lambda soup: self._extract_items(soup, url))
 
     async def fetch_details(self, safe_id: str) -> Dict[str, Any]:
         try:
@@ -265,7 +327,7 @@ class MyCimaScraper:
         html = await self._get_html(url)
         if not html: return {}
 
-        soup = BeautifulSoup(html, 'html.parser')
+        soup = make_soup(html)
         title_node = soup.select_one('h1') or soup.select_one('.Title, .title')
         title = title_node.get_text(strip=True) if title_node else "Unknown"
         
@@ -284,7 +346,7 @@ class MyCimaScraper:
         watch_url = url.strip('/') + '/watch/'
         watch_html = await self._get_html(watch_url)
         if watch_html:
-            watch_soup = BeautifulSoup(watch_html, 'html.parser')
+            watch_soup = make_soup(watch_html)
             # Extract servers (including AJAX ones)
             details["servers"] = await self._extract_watch_servers(watch_soup, watch_url)
 
@@ -292,7 +354,7 @@ class MyCimaScraper:
         download_url = url.strip('/') + '/download/'
         download_html = await self._get_html(download_url)
         if download_html:
-            details["download_links"] = self._extract_download_links(BeautifulSoup(download_html, 'html.parser'), download_url)
+            details["download_links"] = self._extract_download_links(make_soup(download_html), download_url)
         
         # Extract episodes if series
         if details["type"] == "series":
@@ -369,6 +431,20 @@ class MyCimaScraper:
             })
         return sorted(episodes, key=lambda x: x['episode'])
 
+    async def _post_ajax(self, url: str, data: Dict[str, str], headers: Dict[str, str], retries: int = 3):
+        """POSTs to an ArabSeed AJAX endpoint through the per-host rate limiter."""
+        host = urlparse(url).netloc
+        resp = None
+        for attempt in range(retries):
+            await self._rate_limiter.acquire(host)
+            resp = await self.session.post(url, data=data, headers=headers)
+            if resp.status_code not in (429, 503):
+                self._rate_limiter.reward(host)
+                return resp
+            retry_after = resp.headers.get("Retry-After")
+            self._rate_limiter.penalize(host, float(retry_after) if retry_after and retry_after.isdigit() else None)
+        return resp
+
     async def _get_ajax_server(self, post_id: str, server: str, quality: str, token: str, referer: Optional[str] = None) -> Optional[str]:
         """Fetch server URL via ArabSeed's AJAX endpoint"""
         ajax_url = f"{self.base_url}/get__watch__server/"
@@ -385,10 +461,7 @@ class MyCimaScraper:
             headers["Referer"] = referer
         
         try:
-            if HAS_CURL_CFFI:
-                resp = await self.session.post(ajax_url, data=data, headers=headers)
-            else:
-                resp = await self.session.post(ajax_url, data=data, headers=headers)
+            resp = await self._post_ajax(ajax_url, data, headers)
             
             if resp.status_code == 200:
                 json_data = resp.json()
@@ -444,19 +517,18 @@ class MyCimaScraper:
 
         # 3. Fetch servers for each quality using /get__quality__servers/
         if post_id and csrf_token:
-            quality_results = []
-            for qu in qualities:
-                res = await self._get_quality_servers_ajax(post_id, qu, csrf_token, base_url)
-                quality_results.append(res)
-                if len(qualities) > 1:
-                    await asyncio.sleep(0.5) # Avoid rate limits
+            # Probe all qualities at once; the host rate limiter paces them
+            quality_results = await asyncio.gather(
+                *[self._get_quality_servers_ajax(post_id, qu, csrf_token, base_url) for qu in qualities],
+                return_exceptions=True
+            )
             
             # 4. Each quality result is HTML with the server list
             watch_server_tasks = []
             for idx, html_fragment in enumerate(quality_results):
                 if isinstance(html_fragment, (str, bytes)) and html_fragment and "data-server" in str(html_fragment):
                     qu = qualities[idx]
-                    fragment_soup = BeautifulSoup(html_fragment, 'html.parser')
+                    fragment_soup = make_soup(html_fragment)
                     li_tags = fragment_soup.select('li[data-server]')
                     
                     if not li_tags:
@@ -660,8 +732,10 @@ class MyCimaScraper:
             # These passed filtering but are unknown
             return 10
         
-        # Sort by priority (highest first)
-        unique_results.sort(key=get_server_priority, reverse=True)
+        # Sort by priority (highest first); measured host health only prunes
+        # dead hosts and breaks ties within a quality tier
+        unique_results = host_stats.drop_dead(unique_results)
+        unique_results.sort(key=lambda s: (-get_server_priority(s), -host_stats.score(s['url'])))
         
         logger.info(f"🎯 Returning {len(unique_results)} clean servers (sorted by quality)")
         return unique_results
@@ -708,7 +782,7 @@ class MyCimaScraper:
         headers["Referer"] = referer
         
         try:
-            resp = await self.session.post(url, data=data, headers=headers)
+            resp = await self._post_ajax(url, data, headers)
             if resp.status_code == 200:
                 # Returns HTML string directly or JSON with html field
                 try:
@@ -0,0 +1,87 @@
+import os
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup, FeatureNotFound
+
+logger = logging.getLogger("scraper_parsing")
+
+# Tree builders in order of preference; lxml is C-backed and several times
+# faster than the pure-Python html.parser on large listing pages.
+_PREFERRED_PARSERS = ("lxml", "html.parser")
+
+def _select_parser() -> str:
+    forced = os.getenv("SCRAPER_HTML_PARSER")
+    candidates = ((forced,) if forced else ()) + _PREFERRED_PARSERS
+    for name in candidates:
+        try:
+            BeautifulSoup("", name)
+            return name
+        except FeatureNotFound:
+            logger.warning(f"HTML parser '{name}' is not available, trying next")
+    return "html.parser"
+
+HTML_PARSER = _select_parser()
+
+def make_soup(markup: Any) -> BeautifulSoup:
+    """Builds a BeautifulSoup tree with the fastest available parser."""
+    return BeautifulSoup(markup or "", HTML_PARSER)
+
+class ParseCache:
+    """
+    Remembers the items extracted from a page, keyed by extractor, url and a
+    digest of the HTML. A page served from the HTML cache is therefore only
+    parsed once; a changed page gets a new digest and is parsed again.
+
+    Listeners see every freshly extracted item list as
+    (url, extractor qualname, items), e.g. to feed the search index.
+    """
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str, bytes], List[Dict[str, Any]]]" = OrderedDict()
+        self._listeners: List[Callable[[str, str, List[Dict[str, Any]]], None]] = []
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _digest(html: str) -> bytes:
+        return hashlib.blake2b(html.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+    def get_or_parse(self, url: str, html: str, extract: Callable[[BeautifulSoup], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        key = (getattr(extract, "__qualname__", repr(extract)), url, self._digest(html))
+        items = self._entries.get(key)
+        if items is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+        else:
+            self.misses += 1
+            items = extract(make_soup(html))
+            self._entries[key] = items
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            for listener in self._listeners:
+                try:
+                    listener(url, key[0], items)
+                except Exception as e:
+                    logger.warning(f"Parse listener failed for {url}: {e}")
+        # Callers (and the API layer) may annotate items, so hand out copies
+        return [dict(item) for item in items]
+
+    def add_listener(self, listener: Callable[[str, str, List[Dict[str, Any]]], None]):
+        self._listeners.append(listener)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"parser": HTML_PARSER, "entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+parse_cache = ParseCache()
+
+def parse_items(url: str, html: Optional[str], extract: Callable[[BeautifulSoup], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Runs `extract` over the parsed page, reusing earlier results for identical HTML."""
+    if not html:
+        return []
+    return parse_cache.get_or_parse(url, html, extract)
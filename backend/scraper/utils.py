@@ -1,37 +1,52 @@
 import re
 import base64
+import asyncio
 import logging
-from typing import Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 from urllib.parse import urljoin
 
 logger = logging.getLogger("scraper_utils")
 
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key: the first caller runs the
+    work, later callers await the same future instead of repeating it.
+    """
+    _registry: List["SingleFlight"] = []
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.calls = 0
+        self.coalesced = 0
+        SingleFlight._registry.append(self)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            # Shield so one impatient caller cannot cancel the shared work
+            return await asyncio.shield(task)
+
+        task = asyncio.ensure_future(fn())
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": len(self._inflight)}
+
+    @classmethod
+    def all_stats(cls) -> Dict[str, Dict[str, Any]]:
+        return {sf.name: sf.stats() for sf in cls._registry}
+
 class MediaExtractor:
     @staticmethod
     def decode_packed(packed_str: str) -> Optional[str]:
         """Decodes Dean Edwards packed JavaScript."""
-        try:
-            pattern = r"\}\s*\('(.*?)',\s*(\d+),\s*(\d+),\s*'(.*?)'\.split"
-            match = re.search(pattern, packed_str)
-            if not match: return None
-            
-            p, a, c, k = match.groups()
-            a, c = int(a), int(c)
-            k = k.split('|')
-            
-            def baseN(num, b):
-                return ((num == 0) and "0") or \
-                       (baseN(num // b, b).lstrip("0") + "0123456789abcdefghijklmnopqrstuvwxyz"[num % b])
-
-            result = p
-            for i in range(c - 1, -1, -1):
-                key = baseN(i, a)
-                if i < len(k) and k[i]:
-                    result = re.sub(r'\b' + re.escape(key) + r'\b', k[i], result)
-            return result
-        except Exception as e:
-            logger.debug(f"Unpacking failed: {e}")
-            return None
+        from scraper.extractors.packer import unpack
+        return unpack(packed_str)
 
     @classmethod
     async def extract_direct_url(cls, html: str, current_url: str = "") -> Optional[str]:
@@ -36,6 +36,7 @@ async def test_sqlite_cache():
     
     # Cleanup
     await cache.clear()
+    await cache.close()
     sync_cache.clear()
     
     print("\n✅ جميع الاختبارات نجحت!")
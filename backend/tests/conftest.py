@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+# Tests import the backend packages (app, scraper) as top-level modules
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "live: hits the real source sites (set MOVIDO_LIVE_TESTS=1 to run)")
+
+
+def pytest_collection_modifyitems(config, items):
+    if os.environ.get("MOVIDO_LIVE_TESTS") == "1":
+        return
+    skip_live = pytest.mark.skip(reason="live network test (set MOVIDO_LIVE_TESTS=1 to run)")
+    for item in items:
+        if "live" in item.keywords:
+            item.add_marker(skip_live)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
@@ -1,4 +1,5 @@
 import asyncio
+import pytest
 import base64
 import sys
 import os
@@ -7,7 +8,9 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.getcwd())))
 sys.path.append(os.path.abspath(os.path.join(os.getcwd(), 'backend')))
 
-from backend.scraper.mycima import scraper
+from scraper.mycima import scraper
+
+pytestmark = [pytest.mark.live, pytest.mark.anyio]
 
 async def test_arabseed_fix():
     # URL provided by user
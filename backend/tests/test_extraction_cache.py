@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+from app.core.cache import PersistentCache
+from scraper.extractors.result_cache import (
+    DEFAULT_TTL, EXPIRY_MARGIN, NEGATIVE_TTL, ExtractionCache,
+)
+
+EMBED = "https://vidmoly.to/embed-abc.html"
+
+
+def _stream(query=""):
+    return {"url": f"https://cdn.test/master.m3u8{query}", "type": "hls"}
+
+
+def test_ttl_by_host_and_for_failures():
+    assert ExtractionCache.ttl_for(EMBED, None) == NEGATIVE_TTL
+    assert ExtractionCache.ttl_for("https://streamtape.com/e/1", _stream()) == 1200
+    assert ExtractionCache.ttl_for("https://unknown.test/e/1", _stream()) == DEFAULT_TTL
+
+
+@pytest.mark.parametrize("scale", [1, 1000])
+def test_ttl_respects_signed_url_expiry_in_seconds_or_ms(scale):
+    expires = int((time.time() + 600) * scale)
+    ttl = ExtractionCache.ttl_for(EMBED, _stream(f"?token=x&expires={expires}"))
+    assert 600 - EXPIRY_MARGIN - 2 <= ttl <= 600 - EXPIRY_MARGIN
+
+
+def test_ttl_is_zero_inside_the_margin():
+    expires = int(time.time() + EXPIRY_MARGIN // 2)
+    assert ExtractionCache.ttl_for(EMBED, _stream(f"?e={expires}")) == 0
+
+
+def test_expiring_results_are_not_cached():
+    cache = ExtractionCache(persistent=False)
+    cache.set(EMBED, _stream())
+    cache.set(EMBED, _stream(f"?expires={int(time.time())}"))
+    assert cache.get(EMBED) == (False, None)
+
+
+def test_hits_negative_hits_and_lru_bound():
+    cache = ExtractionCache(max_entries=2, persistent=False)
+    cache.set("https://a.test/e", _stream())
+    cache.set("https://b.test/e", None)
+    assert cache.get("https://a.test/e") == (True, _stream())
+    assert cache.get("https://b.test/e") == (True, None)
+    # a was read before b, so it is the least recently used
+    cache.set("https://c.test/e", _stream())
+
+    assert cache.get("https://a.test/e") == (False, None)
+    assert cache.stats() == {"entries": 2, "hits": 1, "negative_hits": 1, "misses": 1}
+
+
+def test_results_survive_restart_through_the_store(tmp_path):
+    store = PersistentCache(str(tmp_path / "extractor_cache.db"), sweep_interval=3600)
+    cache = ExtractionCache(persistent=False)
+    cache._store = store
+    cache.set(EMBED, _stream())
+
+    restarted = ExtractionCache(persistent=False)
+    restarted._store = store
+    assert restarted.get(EMBED) == (True, _stream())
@@ -0,0 +1,67 @@
+import pytest
+
+from scraper.extractors.engine import extractor_router
+from scraper.extractors.registry import ExtractorRouter
+
+
+async def _noop(url):
+    return None
+
+
+@pytest.fixture
+def router():
+    r = ExtractorRouter(cache_size=2)
+    r.register("suffix", _noop, domains=("ok.ru", ".example.com"))
+    r.register("brand", _noop, brands=("mixdrop",))
+    r.register("pattern", _noop, patterns=(r"(^|\.)d[o0]{2,}d",))
+    r.register("overlap", _noop, domains=("m.ok.ru",), brands=("mixdrop2",))
+    return r
+
+
+def _names(router, url):
+    return [route.name for route in router.routes_for(url)]
+
+
+def test_domains_match_on_label_boundaries(router):
+    assert _names(router, "https://ok.ru/video/1") == ["suffix"]
+    assert _names(router, "https://www.example.com/x") == ["suffix"]
+    assert _names(router, "https://api.example.com:8443/x") == ["suffix"]
+    assert _names(router, "https://book.ru/x") == []
+    assert _names(router, "https://notexample.com/x") == []
+
+
+def test_brands_match_any_tld_but_not_the_tld_itself(router):
+    assert _names(router, "https://mixdrop.ag/e/1") == ["brand"]
+    assert _names(router, "https://cdn.mixdrop.club/e/1") == ["brand"]
+    assert _names(router, "https://mixdropx.ag/e/1") == []
+    assert _names(router, "https://example.mixdrop/e/1") == []
+
+
+def test_patterns_and_registration_order(router):
+    assert _names(router, "https://d0000d.com/e/1") == ["pattern"]
+    assert _names(router, "https://m.ok.ru/video/1") == ["suffix", "overlap"]
+    assert _names(router, "https://mixdrop.mixdrop2.to/e") == ["brand", "overlap"]
+
+
+def test_resolution_cache_is_bounded_and_reset_on_register(router):
+    for host in ("a.ok.ru", "b.ok.ru", "c.ok.ru"):
+        router.routes_for(f"https://{host}/")
+    assert len(router._resolved) == 2
+    router.register("late", _noop, domains=("c.ok.ru",))
+    assert _names(router, "https://c.ok.ru/") == ["suffix", "late"]
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://a.asd.homes/embed/1", ["arabseed"]),
+    ("https://larooza.mom/play/1", ["okprime"]),
+    ("https://q.larozavideo.net/embed/1", ["okprime"]),
+    ("https://short.icu/abc", ["okprime", "shorticu"]),
+    ("https://vidspeed.cc/e/1", ["okprime", "universal"]),
+    ("https://random.homes/e/1", []),
+    ("https://site.bond/e/1", []),
+    ("https://voe.sx/e/1", ["voe"]),
+    ("https://dood.watch/e/1", ["doodstream"]),
+    ("https://filemoon.sx/e/1", ["mediaflow:FileMoon"]),
+])
+def test_engine_routes(url, expected):
+    assert _names(extractor_router, url) == expected
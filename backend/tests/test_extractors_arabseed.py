@@ -1,4 +1,5 @@
 import asyncio
+import pytest
 import sys
 import os
 
@@ -6,7 +7,9 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.getcwd())))
 sys.path.append(os.path.abspath(os.path.join(os.getcwd(), 'backend')))
 
-from backend.scraper.extractors.engine import ExtractorEngine
+from scraper.extractors.engine import ExtractorEngine
+
+pytestmark = [pytest.mark.live, pytest.mark.anyio]
 
 async def test_extractors():
     urls = [
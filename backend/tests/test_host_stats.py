@@ -0,0 +1,50 @@
+from scraper.extractors.host_stats import HostStats
+
+
+def _servers(*hosts):
+    return [{"name": host, "url": f"https://{host}/e/1"} for host in hosts]
+
+
+def _hosts(servers):
+    return [s["name"] for s in servers]
+
+
+def test_unknown_hosts_rank_between_good_and_bad():
+    stats = HostStats()
+    for _ in range(3):
+        stats.record("https://good.test/e", ok=True, latency=5.0)
+        stats.record("https://bad.test/e", ok=False, latency=5.0)
+    assert stats.score("https://good.test/x") > stats.score("https://new.test/x") > stats.score("https://bad.test/x")
+
+
+def test_faster_host_scores_higher_at_equal_success():
+    stats = HostStats()
+    for _ in range(5):
+        stats.record("https://fast.test/e", ok=True, latency=0.2)
+        stats.record("https://slow.test/e", ok=True, latency=8.0)
+    assert stats.score("https://fast.test/e") > stats.score("https://slow.test/e")
+
+
+def test_timeouts_slow_a_host_without_killing_it():
+    stats = HostStats(dead_after=2)
+    for _ in range(5):
+        stats.record_timeout("https://stuck.test/e", elapsed=20.0)
+    assert not stats.is_dead("https://stuck.test/e")
+    assert stats.score("https://stuck.test/e") < stats.score("https://new.test/e")
+
+
+def test_drop_dead_keeps_order_and_never_returns_nothing():
+    stats = HostStats(dead_after=3)
+    for _ in range(10):
+        stats.record("https://dead.test/e", ok=False, latency=1.0)
+    servers = _servers("b.test", "dead.test", "a.test")
+
+    assert _hosts(stats.drop_dead(servers)) == ["b.test", "a.test"]
+    assert _hosts(stats.drop_dead(_servers("dead.test"))) == ["dead.test"]
+
+
+def test_order_servers_is_stable_for_equal_scores():
+    stats = HostStats()
+    stats.record("https://fast.test/e", ok=True, latency=0.2)
+    ordered = stats.order_servers(_servers("b.test", "a.test", "fast.test"))
+    assert _hosts(ordered) == ["fast.test", "b.test", "a.test"]
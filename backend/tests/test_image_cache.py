@@ -0,0 +1,65 @@
+import os
+import time
+
+import pytest
+
+from app.core import image_variants
+from app.core.image_cache import STALE_TMP_AGE, ImageCache, ImageEntry
+
+PIL = pytest.importorskip("PIL.Image")
+
+
+def _touch(path, age=0.0):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"x")
+    if age:
+        then = time.time() - age
+        os.utime(path, (then, then))
+    return path
+
+
+@pytest.fixture
+def poster(tmp_path):
+    src = str(tmp_path / "poster.png")
+    PIL.new("RGB", (800, 1200), "red").save(src)
+    return src
+
+
+def test_render_writes_variant_without_leftovers(tmp_path, poster):
+    dst = str(tmp_path / "out.webp")
+    size = image_variants._render(poster, dst, 320, 75, "webp")
+    assert size == os.path.getsize(dst)
+    assert [n for n in os.listdir(tmp_path) if n.endswith(".tmp")] == []
+
+
+def test_render_removes_tmp_when_replace_fails(tmp_path, poster, monkeypatch):
+    def failing_replace(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(image_variants.os, "replace", failing_replace)
+    with pytest.raises(OSError):
+        image_variants._render(poster, str(tmp_path / "out.jpeg"), 320, 75, "jpeg")
+    assert [n for n in os.listdir(tmp_path) if n.endswith(".tmp")] == []
+
+
+def test_scan_sweeps_stale_tmp_files_only(tmp_path):
+    cache = ImageCache(str(tmp_path), max_bytes=1 << 20, fresh_ttl=60, max_image_bytes=1 << 20)
+    digest = "ab" + "0" * 38
+    _touch(cache.blob_path(digest))
+    _touch(cache.blob_path(digest) + ".w320.webp")
+    cache._write_meta("cd" + "1" * 30, ImageEntry("https://img.test/p.jpg", digest, "image/jpeg", 1, time.time()))
+
+    stale = [
+        _touch(os.path.join(cache.blob_dir, ".somekey.123.tmp"), age=STALE_TMP_AGE + 60),
+        _touch(cache.blob_path(digest) + ".w320.webp.123.tmp", age=STALE_TMP_AGE + 60),
+        _touch(os.path.join(cache.meta_dir, "cd", "cd" + "2" * 30 + ".json.123.tmp"), age=STALE_TMP_AGE + 60),
+    ]
+    in_progress = _touch(os.path.join(cache.blob_dir, ".otherkey.456.tmp"))
+
+    entries, variants = cache._scan()
+
+    assert list(entries) == ["cd" + "1" * 30]
+    assert variants == {digest + ".w320.webp": 1}
+    assert not any(os.path.exists(path) for path in stale)
+    assert os.path.exists(in_progress)
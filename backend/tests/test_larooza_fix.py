@@ -1,5 +1,6 @@
 
 import asyncio
+import pytest
 import sys
 import os
 
@@ -8,6 +9,8 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from scraper.engine import scraper
 
+pytestmark = [pytest.mark.live, pytest.mark.anyio]
+
 async def test_larooza():
     print("Testing Larooza Scraper...")
     try:
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from app.core.cache import PersistentCache
+from scraper import mirrors
+from scraper.mirrors import MirrorTable, ResourceMissing
+
+pytestmark = pytest.mark.anyio
+
+A, B, C = "https://a.test", "https://b.test", "https://c.test"
+
+
+@pytest.fixture(autouse=True)
+def fast_hedging(monkeypatch):
+    monkeypatch.setattr(mirrors, "DEFAULT_HEDGE_DELAY", 0.05)
+    monkeypatch.setattr(mirrors, "MIN_HEDGE_DELAY", 0.01)
+
+
+def _table():
+    return MirrorTable("test", [A, B, C], persistent=False)
+
+
+def _attempt(behaviour, calls):
+    """behaviour: origin -> ("ok", delay) | ("fail", delay) | ("missing", delay)"""
+    async def attempt(url):
+        origin = MirrorTable.origin_of(url)
+        calls.append(origin)
+        kind, delay = behaviour[origin]
+        await asyncio.sleep(delay)
+        if kind == "missing":
+            raise ResourceMissing(url)
+        if kind == "fail":
+            raise ConnectionError("refused")
+        return f"page from {origin}"
+    return attempt
+
+
+async def test_fast_best_mirror_is_not_hedged():
+    table, calls = _table(), []
+    result = await table.fetch([f"{m}/p" for m in (A, B, C)], _attempt({A: ("ok", 0)}, calls))
+    assert result == (f"{A}/p", f"page from {A}")
+    assert calls == [A]
+    assert table.hedged == 0
+
+
+async def test_slow_mirror_is_hedged_and_loses_rank():
+    table, calls = _table(), []
+    behaviour = {A: ("ok", 1.0), B: ("ok", 0.0), C: ("ok", 0.0)}
+    result = await table.fetch([f"{m}/p" for m in (A, B, C)], _attempt(behaviour, calls))
+
+    assert result == (f"{B}/p", f"page from {B}")
+    assert calls == [A, B]
+    assert (table.hedged, table.hedge_wins) == (1, 1)
+    assert table.ranked()[0] == B
+
+
+async def test_failure_moves_on_at_once_and_raises_error_rate():
+    table, calls = _table(), []
+    behaviour = {A: ("fail", 0), B: ("ok", 0)}
+    result = await table.fetch([f"{A}/p", f"{B}/p"], _attempt(behaviour, calls))
+
+    assert result[0] == f"{B}/p"
+    assert table.hedged == 0
+    assert table._mirrors[A].error > 0
+    assert table.ranked() == [B, C, A]
+
+
+async def test_missing_page_does_not_count_as_mirror_error():
+    table, calls = _table(), []
+    behaviour = {A: ("missing", 0), B: ("missing", 0), C: ("missing", 0)}
+    assert await table.fetch([f"{m}/p" for m in (A, B, C)], _attempt(behaviour, calls)) is None
+    assert sorted(calls) == [A, B, C]
+    assert all(table._mirrors[m].error == 0 and table._mirrors[m].samples == 1 for m in (A, B, C))
+
+
+async def test_in_flight_attempts_are_bounded():
+    table, calls = _table(), []
+    table.max_in_flight = 2
+    behaviour = {A: ("ok", 0.3), B: ("ok", 0.3), C: ("ok", 0.0)}
+    result = await table.fetch([f"{m}/p" for m in (A, B, C)], _attempt(behaviour, calls))
+    assert calls == [A, B]
+    assert result[0] in (f"{A}/p", f"{B}/p")
+
+
+def test_ranking_survives_restart(tmp_path):
+    store = PersistentCache(str(tmp_path / "mirrors.db"), sweep_interval=3600)
+    table = _table()
+    table._store = store
+    table.add("https://new.test/x")
+    table.record(f"{A}/p", ok=False, latency=1.0)
+    table.record(f"{C}/p", ok=True, latency=0.1)
+    table.save(force=True)
+
+    restarted = MirrorTable("test", [A, B, C], persistent=False)
+    restarted._store = store
+    restarted._load()
+    assert restarted.ranked() == table.ranked()
+    assert "https://new.test" in restarted.ranked()
@@ -0,0 +1,78 @@
+import re
+
+import pytest
+
+from scraper.extractors import packer
+
+_HEADER = "eval(function(p,a,c,k,e,d){while(c--)if(k[c])p=p.replace(new RegExp('\\\\b'+c.toString(a)+'\\\\b','g'),k[c]);return p}"
+
+
+def _pack(source, radix=62):
+    """Minimal Dean Edwards packer: every word becomes its base-`radix` index."""
+    words = list(dict.fromkeys(re.findall(r"\w+", source)))
+    keys = {word: packer.to_base(i, radix) for i, word in enumerate(words)}
+    payload = re.sub(r"\w+", lambda m: keys[m.group(0)], source)
+    payload = payload.replace("\\", "\\\\").replace("'", "\\'")
+    return f"{_HEADER}('{payload}',{radix},{len(words)},'{'|'.join(words)}'.split('|'),0,{{}}))"
+
+
+@pytest.mark.parametrize("num, radix, expected", [
+    (0, 10, "0"), (9, 10, "9"), (35, 36, "z"), (61, 62, "Z"), (62, 62, "10"), (255, 16, "ff"),
+])
+def test_to_base(num, radix, expected):
+    assert packer.to_base(num, radix) == expected
+
+
+@pytest.mark.parametrize("radix", [10, 36, 62])
+def test_unpack_roundtrip(radix):
+    source = "var player=jwplayer('vid');player.setup({file:\"https://cdn.test/hls/master.m3u8\",image:'p.jpg'});" * 3
+    assert packer.unpack(_pack(source, radix)) == source
+
+
+def test_unpack_rejects_non_packer_input():
+    assert packer.unpack("") is None
+    assert packer.unpack("console.log('plain')") is None
+    assert packer.unpack("eval(function(p,a,c,k,e,d){}('0',99,1,'x'.split('|'),0,{}))") is None
+
+
+def test_unpack_is_memoised(monkeypatch):
+    packed = _pack("sources=[{file:'https://cdn.test/memo.mp4'}]")
+    first = packer.unpack(packed)
+    monkeypatch.setattr(packer, "_decode", lambda _: pytest.fail("decoded twice"))
+    assert packer.unpack(packed) == first
+
+
+def test_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(packer, "_cache", packer.OrderedDict())
+    monkeypatch.setattr(packer, "_CACHE_SIZE", 3)
+    for i in range(5):
+        packer.unpack(_pack(f"var n{i}=1"))
+    assert len(packer._cache) == 3
+
+
+def test_unpack_all_follows_nested_layers():
+    inner = _pack("file:'https://cdn.test/deep.m3u8'")
+    outer = _pack(f"document.write(1);{inner}")
+    page = f"<html><script>{outer}</script><script>{outer}</script></html>"
+
+    text = packer.unpack_all(page)
+
+    assert text.startswith(page)
+    assert "https://cdn.test/deep.m3u8" in text
+    assert text.count("document.write(1)") == 1
+    assert packer.unpack_all(page, max_depth=1).count("deep.m3u8") == 0
+
+
+def test_unpack_all_without_packed_code_returns_input():
+    page = "<html>nothing packed here</html>"
+    assert packer.unpack_all(page) is page
+    assert packer.find_packed(page) == []
+
+
+def test_find_packed_accepts_both_call_endings():
+    stock = _pack("var a=1")
+    short = stock.replace(",0,{}))", "))")
+    page = f"<script>{stock}</script><script>{short}</script>"
+    # Blocks stop short of eval's own closing parenthesis
+    assert packer.find_packed(page) == [stock[:-1], short[:-1]]
+    assert packer.unpack(short) == "var a=1"
@@ -0,0 +1,63 @@
+import time
+
+from app.core.cache import PersistentCache
+
+
+def _store(tmp_path, **kwargs):
+    return PersistentCache(str(tmp_path / "scraper_cache.db"), sweep_interval=3600, **kwargs)
+
+
+def test_roundtrip_and_ttl(tmp_path):
+    cache = _store(tmp_path)
+    cache.set("fresh", {"a": 1}, ttl_seconds=60)
+    cache.set("stale", [1, 2], ttl_seconds=-1)
+
+    assert cache.get("fresh") == {"a": 1}
+    assert cache.get("stale") is None
+    assert cache.get("missing") is None
+
+
+def test_sweep_drops_expired_rows(tmp_path):
+    cache = _store(tmp_path)
+    cache.set("keep", "x" * 10, ttl_seconds=60)
+    cache.set("drop", "y" * 10, ttl_seconds=-1)
+
+    cache.sweep()
+
+    rows = cache._conn.execute("SELECT key FROM kv_store").fetchall()
+    assert rows == [("keep",)]
+    assert cache._total_bytes == len('"' + "x" * 10 + '"')
+
+
+def test_legacy_json_name_maps_to_db(tmp_path):
+    cache = PersistentCache(str(tmp_path / "legacy.json"))
+    assert cache.filename.endswith("legacy.db")
+
+
+def test_evicts_least_recently_used_down_to_low_water(tmp_path):
+    entry = "v" * 98  # 100 bytes once JSON encoded
+    cache = _store(tmp_path, max_bytes=1000)
+    cache.EVICT_BATCH = 3  # force several batches
+    for i in range(10):
+        cache.set(f"k{i}", entry, ttl_seconds=60)
+        time.sleep(0.001)
+    # Reading k0 makes it the most recently used entry
+    assert cache.get("k0") == entry
+
+    cache.set("k10", entry, ttl_seconds=60)
+
+    keys = {k for (k,) in cache._conn.execute("SELECT key FROM kv_store")}
+    assert cache._total_bytes <= 900
+    assert "k0" in keys and "k10" in keys
+    assert "k1" not in keys and "k2" not in keys
+    assert cache._total_bytes == sum(
+        size for (size,) in cache._conn.execute("SELECT size FROM kv_store")
+    )
+
+
+def test_total_bytes_restored_on_reopen(tmp_path):
+    cache = _store(tmp_path)
+    cache.set("a", "abc", ttl_seconds=60)
+    reopened = _store(tmp_path)
+    assert reopened.get("a") == "abc"
+    assert reopened._total_bytes == cache._total_bytes
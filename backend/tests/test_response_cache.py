@@ -0,0 +1,8 @@
+from app.core.cache import api_cache
+from app.core.config import settings
+from app.core.response_cache import response_cache
+
+
+def test_memory_tiers_share_one_budget():
+    total = api_cache.memory.max_bytes + response_cache.memory.max_bytes
+    assert total == settings.API_MEMORY_CACHE_MAX_BYTES
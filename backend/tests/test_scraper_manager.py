@@ -0,0 +1,128 @@
+import asyncio
+
+import pytest
+
+from app.core.scraper_manager import CircuitBreaker, CircuitOpenError, ScraperManager
+
+
+def _cool_down(breaker):
+    """Moves an open breaker to the end of its cooldown."""
+    breaker.opened_at -= breaker.cooldown
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=10)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    for _ in range(3):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    assert breaker.rejected == 1
+    assert 9 < breaker.retry_in() <= 10
+
+
+def test_half_open_allows_one_probe_and_backs_off():
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=10, max_cooldown=25)
+    breaker.record_failure()
+
+    _cool_down(breaker)
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()  # the probe slot is taken
+    breaker.record_failure()
+    assert (breaker.state, breaker.cooldown) == (CircuitBreaker.OPEN, 20)
+
+    _cool_down(breaker)
+    assert breaker.allow()
+    breaker.release()  # a cancelled probe hands the slot back
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.cooldown == 25
+
+    _cool_down(breaker)
+    assert breaker.allow()
+    breaker.record_success()
+    assert (breaker.state, breaker.cooldown, breaker.failures) == (CircuitBreaker.CLOSED, 10, 0)
+
+
+@pytest.fixture
+def manager():
+    mgr = ScraperManager()
+    for status in mgr.scrapers.values():
+        status.breaker = CircuitBreaker(failure_threshold=2, cooldown=60)
+    return mgr
+
+
+def test_call_fails_fast_once_open_and_counts_empty_results(manager):
+    calls = 0
+
+    async def empty():
+        nonlocal calls
+        calls += 1
+        return []
+
+    async def scenario():
+        assert await manager.call("larooza", empty) == []
+        await manager.call("larooza", empty, empty_is_failure=True)
+        await manager.call("larooza", empty, empty_is_failure=True)
+        with pytest.raises(CircuitOpenError):
+            await manager.call("larooza", empty)
+
+    asyncio.run(scenario())
+    assert calls == 3
+    assert manager.scrapers["larooza"].is_online is False
+    assert manager.scrapers["mycima"].breaker.state == CircuitBreaker.CLOSED
+
+
+def test_cancelled_probe_releases_the_half_open_slot(manager):
+    breaker = manager.scrapers["mycima"].breaker
+    breaker.record_failure()
+    breaker.record_failure()
+    _cool_down(breaker)
+
+    async def scenario():
+        task = asyncio.ensure_future(manager.call("mycima", lambda: asyncio.sleep(10)))
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return breaker.allow()
+
+    assert asyncio.run(scenario())
+
+
+def test_gather_returns_within_budget_and_hands_over_stragglers(manager):
+    async def fast():
+        return ["fast"]
+
+    async def broken():
+        raise ConnectionError("down")
+
+    async def slow():
+        await asyncio.sleep(0.2)
+        return ["slow"]
+
+    async def scenario():
+        results, stragglers = await manager.gather(
+            {"larooza": fast, "mycima": broken, "anime4up": slow}, budget=0.05
+        )
+        late = await stragglers
+        return results, late
+
+    results, late = asyncio.run(scenario())
+    assert results["larooza"] == ["fast"]
+    assert isinstance(results["mycima"], ConnectionError)
+    assert "anime4up" not in results
+    assert late == {"anime4up": ["slow"]}
+
+
+def test_gather_without_stragglers(manager):
+    async def ok():
+        return [1]
+
+    results, stragglers = asyncio.run(manager.gather({"larooza": ok}, budget=1))
+    assert results == {"larooza": [1]} and stragglers is None
+    assert asyncio.run(manager.gather({})) == ({}, None)
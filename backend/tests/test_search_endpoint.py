@@ -0,0 +1,71 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.api.endpoints import movies
+from app.core.cache import SQLiteCache
+from app.core.response_cache import ResponseCache
+from app.core.search_index import CatalogIndex
+
+pytestmark = pytest.mark.anyio
+
+
+def _item(item_id, title):
+    return {"id": item_id, "title": title, "poster": f"https://img.test/{item_id}.jpg", "type": "movie"}
+
+
+@pytest.fixture
+async def client(tmp_path, monkeypatch):
+    backend = SQLiteCache(str(tmp_path / "api_cache.db"), memory_max_bytes=1 << 20)
+    monkeypatch.setattr(movies, "response_cache", ResponseCache(backend, 1 << 20))
+
+    index = CatalogIndex(str(tmp_path / "catalog.db"), flush_interval=3600)
+    index.add_items("larooza", [_item(f"local-{i}", f"Local Hit {i}") for i in range(20)])
+    index.add_items("larooza", [_item("sparse", "Sparse Show")])
+    index.flush()
+    monkeypatch.setattr(movies, "catalog_index", index)
+    monkeypatch.setattr(movies.scraper_settings, "get_enabled_sources", lambda: ["larooza"])
+
+    upstream_calls = []
+
+    async def upstream(q):
+        upstream_calls.append(q)
+        return [_item(f"up-{q}", f"Upstream {q}")]
+
+    monkeypatch.setattr(movies, "_search_calls", lambda q: {"larooza": lambda: upstream(q)})
+
+    app = FastAPI()
+    app.include_router(movies.router)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+        http.upstream_calls = upstream_calls
+        yield http
+    await backend.close()
+
+
+async def _revalidate(client, q):
+    first = await client.get("/movies/search", params={"q": q})
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    second = await client.get("/movies/search", params={"q": q}, headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == etag
+    return first
+
+
+async def test_local_index_answer_supports_if_none_match(client):
+    first = await _revalidate(client, "local hit")
+    assert len(first.json()) == 20
+    assert client.upstream_calls == []
+
+
+async def test_merged_answer_supports_if_none_match(client):
+    first = await _revalidate(client, "sparse")
+    assert [item["id"] for item in first.json()] == ["sparse", "up-sparse"]
+    assert client.upstream_calls == ["sparse"]
+
+
+async def test_upstream_answer_supports_if_none_match(client):
+    first = await _revalidate(client, "nothing local")
+    assert [item["id"] for item in first.json()] == ["up-nothing local"]
+    assert client.upstream_calls == ["nothing local"]
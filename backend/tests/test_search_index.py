@@ -0,0 +1,78 @@
+import time
+
+import pytest
+
+from app.core.search_index import CatalogIndex, normalize_arabic
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("أحمد", "احمد"),
+    ("إسلام آمن", "اسلام امن"),
+    ("مُسَلْسَل", "مسلسل"),
+    ("الحـــلقة", "الحلقه"),
+    ("مستشفى", "مستشفي"),
+    ("الحلقة ٣٢", "الحلقه 32"),
+    ("  Breaking-Bad:  S01 ", "breaking bad s01"),
+    ("", ""),
+    (None, ""),
+])
+def test_normalize_arabic(raw, expected):
+    assert normalize_arabic(raw) == expected
+
+
+def _item(item_id, title):
+    return {"id": item_id, "title": title, "poster": f"https://img.test/{item_id}.jpg"}
+
+
+@pytest.fixture
+def index(tmp_path):
+    idx = CatalogIndex(str(tmp_path / "catalog.db"), flush_interval=3600)
+    idx.add_items("larooza", [
+        _item("1", "مسلسل الحشاشين"),
+        _item("2", "فيلم أولاد رزق 3"),
+        _item("3", "Breaking Bad"),
+        _item("", "no id"),
+        _item("4", ""),
+    ])
+    idx.add_items("arabseed", [_item("5", "مسلسل الحشاشين الحلقة 2")])
+    idx.flush()
+    return idx
+
+
+def _ids(results):
+    return [item["id"] for item in results]
+
+
+def test_prefix_and_normalised_matches(index):
+    assert _ids(index.search("الحشاشين")) == ["1", "5"]
+    # Hamza and generic words are folded away
+    assert _ids(index.search("فيلم اولاد")) == ["2"]
+    assert _ids(index.search("break")) == ["3"]
+
+
+def test_source_filter(index):
+    assert _ids(index.search("الحشاشين", sources=["arabseed"])) == ["5"]
+    assert index.search("الحشاشين", sources=[]) == []
+
+
+def test_substring_and_typo_matches(index):
+    if not index._trigram:
+        pytest.skip("SQLite without the FTS5 trigram tokenizer")
+    assert _ids(index.search("eaking")) == ["3"]
+    assert _ids(index.search("breeking")) == ["3"]
+
+
+def test_reindexing_updates_title_and_skips_invalid_items(index):
+    assert index.stats()["items"] == 4
+    index.add_items("larooza", [_item("3", "Better Call Saul")])
+    index.flush()
+    assert index.search("breaking") == []
+    assert _ids(index.search("saul")) == ["3"]
+
+
+def test_prune_drops_items_not_seen_within_retention(index):
+    index.retention = 60
+    index._connect().execute("UPDATE catalog_items SET seen_at = ? WHERE id = '3'", (time.time() - 120,))
+    index.prune()
+    assert index.search("breaking") == []
+    assert index.stats()["items"] == 3
@@ -0,0 +1,90 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from scraper.extractors.sessions import SessionPool
+
+
+class _CookieHandler(BaseHTTPRequestHandler):
+    """/set?v=x sets a cookie via a redirect to /echo, which returns the Cookie header."""
+    def do_GET(self):
+        if self.path.startswith("/set"):
+            value = self.path.split("v=", 1)[1]
+            self.send_response(302)
+            self.send_header("Set-Cookie", f"token={value}; Path=/")
+            self.send_header("Location", "/echo")
+            self.end_headers()
+            return
+        body = (self.headers.get("Cookie") or "").encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _CookieHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+def test_borrowed_sessions_have_their_own_cookie_jars(server):
+    pool = SessionPool()
+
+    async def scenario():
+        async with pool.session(timeout=5) as first, pool.session(timeout=5) as second:
+            # The cookie is set on a redirect hop and must survive it
+            echoed = await first.get(f"{server}/set?v=one")
+            await second.get(f"{server}/set?v=two")
+            again = await first.get(f"{server}/echo")
+            fresh = await pool.session(timeout=5).get(f"{server}/echo")
+        await pool.close()
+        return echoed.text, again.text, fresh.text, second.cookies.get("token")
+
+    echoed, again, fresh, second_token = asyncio.run(scenario())
+    assert echoed == "token=one"
+    assert again == "token=one"
+    assert fresh == ""
+    assert second_token == "two"
+
+
+def test_sessions_of_a_stopped_loop_are_released():
+    pool = SessionPool()
+
+    async def borrow():
+        return pool._get_session("chrome124", None)
+
+    old = asyncio.run(borrow())
+    new = asyncio.run(borrow())
+
+    assert new is not old
+    assert old.pool.empty()
+    assert list(pool._sessions.values()) == [new]
+
+
+def test_sessions_of_a_running_loop_are_closed_on_it():
+    pool = SessionPool()
+    other = asyncio.new_event_loop()
+    thread = threading.Thread(target=other.run_forever, daemon=True)
+    thread.start()
+    try:
+        async def borrow():
+            return pool._get_session("chrome124", None)
+
+        old = asyncio.run_coroutine_threadsafe(borrow(), other).result(5)
+        asyncio.run(borrow())
+        # close() was scheduled on the loop that owns the session
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0.05), other).result(5)
+        assert old._closed
+    finally:
+        other.call_soon_threadsafe(other.stop)
+        thread.join(5)
+        other.close()
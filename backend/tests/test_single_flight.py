@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from scraper.utils import SingleFlight
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+def flight():
+    sf = SingleFlight("test")
+    yield sf
+    SingleFlight._registry.remove(sf)
+
+
+async def test_concurrent_calls_share_one_run(flight):
+    runs = 0
+    release = asyncio.Event()
+
+    async def work():
+        nonlocal runs
+        runs += 1
+        await release.wait()
+        return {"runs": runs}
+
+    callers = [asyncio.create_task(flight.do("k", work)) for _ in range(5)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*callers)
+
+    assert runs == 1
+    assert all(r is results[0] for r in results)
+    assert flight.stats() == {"calls": 5, "coalesced": 4, "in_flight": 0}
+
+
+async def test_different_keys_and_later_calls_run_again(flight):
+    async def work(value):
+        await asyncio.sleep(0)
+        return value
+
+    assert await asyncio.gather(flight.do("a", lambda: work(1)), flight.do("b", lambda: work(2))) == [1, 2]
+    assert await flight.do("a", lambda: work(3)) == 3
+    assert flight.coalesced == 0
+
+
+async def test_errors_reach_every_waiter_and_are_not_cached(flight):
+    async def boom():
+        await asyncio.sleep(0)
+        raise ValueError("upstream down")
+
+    results = await asyncio.gather(flight.do("k", boom), flight.do("k", boom), return_exceptions=True)
+    assert all(isinstance(r, ValueError) for r in results)
+    assert flight.stats()["in_flight"] == 0
+
+    async def ok():
+        return "ok"
+
+    assert await flight.do("k", ok) == "ok"
+
+
+async def test_cancelled_caller_does_not_cancel_shared_work(flight):
+    release = asyncio.Event()
+
+    async def work():
+        await release.wait()
+        return "done"
+
+    impatient = asyncio.create_task(flight.do("k", work))
+    patient = asyncio.create_task(flight.do("k", work))
+    await asyncio.sleep(0)
+    impatient.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await patient == "done"
+    assert impatient.cancelled()
+
+
+def test_all_stats_lists_instances(flight):
+    assert SingleFlight.all_stats()["test"] == flight.stats()
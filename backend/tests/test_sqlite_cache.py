@@ -0,0 +1,110 @@
+import asyncio
+
+import pytest
+
+from app.core.cache import SQLiteCache
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def cache(tmp_path):
+    # A long flush interval keeps writes buffered until the test flushes them
+    store = SQLiteCache(str(tmp_path / "api_cache.db"), flush_interval=60, memory_max_bytes=1 << 20)
+    await store._init_db()
+    yield store
+    await store.close()
+
+
+async def _rows(cache):
+    async with cache._db.execute("SELECT key, value FROM kv_store ORDER BY key") as cursor:
+        return await cursor.fetchall()
+
+
+async def test_writes_are_buffered_then_flushed_in_one_batch(cache):
+    await cache.set("a", {"n": 1}, ttl_seconds=60, memory=False)
+    await cache.set("b", [1, 2], ttl_seconds=60, memory=False)
+
+    assert await _rows(cache) == []
+    # Reads see buffered writes before they reach the database
+    assert await cache.get("a", memory=False) == {"n": 1}
+
+    await cache.flush()
+
+    assert await _rows(cache) == [("a", '{"n": 1}'), ("b", "[1, 2]")]
+    assert cache._pending == {} and cache._flushing == {}
+
+
+async def test_batch_size_triggers_flush(cache):
+    cache.batch_size = 3
+    for i in range(3):
+        await cache.set(f"k{i}", i, ttl_seconds=60)
+    await asyncio.sleep(0.05)
+    assert len(await _rows(cache)) == 3
+
+
+async def test_failed_flush_keeps_batch_and_newer_writes_win(cache, monkeypatch):
+    await cache.set("k", "old", ttl_seconds=60, memory=False)
+    await cache.set("other", 1, ttl_seconds=60, memory=False)
+    real_executemany = cache._db.executemany
+
+    async def failing_executemany(*args):
+        # A write lands while the batch is in flight
+        await cache.set("k", "new", ttl_seconds=60, memory=False)
+        raise RuntimeError("disk I/O error")
+
+    monkeypatch.setattr(cache._db, "executemany", failing_executemany)
+    await cache.flush()
+
+    assert set(cache._pending) == {"k", "other"}
+    assert cache._flushing == {}
+    assert await cache.get("k", memory=False) == "new"
+
+    monkeypatch.setattr(cache._db, "executemany", real_executemany)
+    await cache.flush()
+    assert await _rows(cache) == [("k", '"new"'), ("other", "1")]
+
+
+async def test_flushes_are_serialized(cache, monkeypatch):
+    real_executemany = cache._db.executemany
+    active = 0
+    peak = 0
+
+    async def slow_executemany(*args):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.02)
+        active -= 1
+        return await real_executemany(*args)
+
+    monkeypatch.setattr(cache._db, "executemany", slow_executemany)
+    await cache.set("a", 1, ttl_seconds=60)
+    first = asyncio.create_task(cache.flush())
+    await asyncio.sleep(0)
+    await cache.set("b", 2, ttl_seconds=60)
+    await asyncio.gather(first, cache.flush())
+
+    assert peak == 1
+    assert [key for key, _ in await _rows(cache)] == ["a", "b"]
+
+
+async def test_clear_waits_for_flush_and_resets_buffers(cache, monkeypatch):
+    real_executemany = cache._db.executemany
+
+    async def slow_executemany(*args):
+        await asyncio.sleep(0.02)
+        return await real_executemany(*args)
+
+    monkeypatch.setattr(cache._db, "executemany", slow_executemany)
+    await cache.set("a", 1, ttl_seconds=60)
+    flushing = asyncio.create_task(cache.flush())
+    await asyncio.sleep(0)
+    assert cache._flushing
+
+    await cache.clear()
+    await flushing
+
+    assert cache._pending == {} and cache._flushing == {}
+    assert await _rows(cache) == []
+    assert await cache.get("a") is None
@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+from scraper.extractors.url_filter import (
+    AD_TERMS, PLACEHOLDER_TERMS, UrlClassifier, _compile, ad_filter, basic_filter,
+)
+
+
+def _naive(terms, url):
+    lowered = url.lower()
+    return any(t in lowered for t in terms)
+
+
+def test_trie_regex_matches_naive_substring_scan():
+    terms = AD_TERMS + PLACEHOLDER_TERMS
+    rng = random.Random(1234)
+    alphabet = "abcdeiklnoprstuxy./-:0123456789"
+    urls = ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 60))) for _ in range(3000)]
+    # Seed the sample with every term, in context and in upper case
+    urls += [f"https://CDN.test/{t.upper()}/v.m3u8" for t in terms]
+    for url in urls:
+        assert ad_filter.is_blocked(url) == _naive(terms, url), url
+
+
+def test_redundant_terms_are_dropped():
+    pattern = _compile(["ads", "popads", "ad", "", "AD"])
+    assert pattern.pattern == "ad"
+    assert _compile([]) is None
+    assert not UrlClassifier([]).is_blocked("https://ads.test/")
+
+
+@pytest.mark.parametrize("url, score", [
+    ("https://cdn.test/hls/master.m3u8?t=1", 2),
+    ("https://cdn.test/video.MP4", 1),
+    ("https://cdn.test/embed/1", 0),
+    ("https://doubleclick.net/x.m3u8", -1),
+    ("https://cdn.test/big_buck_bunny.mp4", -1),
+    ("", -1),
+])
+def test_score(url, score):
+    assert ad_filter.score(url) == score
+
+
+def test_rank_and_first_keep_page_order_for_ties():
+    urls = [
+        "https://cdn.test/a.mp4",
+        "https://ads.test/b.m3u8",
+        "https://cdn.test/c.m3u8",
+        "https://cdn.test/d.m3u8",
+    ]
+    assert ad_filter.rank(urls) == [(2, urls[2]), (2, urls[3]), (1, urls[0])]
+    assert ad_filter.first(urls[1:]) == urls[2]
+    assert ad_filter.first(["https://pixel.test/x"]) is None
+
+
+def test_basic_filter_is_narrower():
+    url = "https://cdn.test/promo/v.m3u8"
+    assert ad_filter.is_blocked(url)
+    assert not basic_filter.is_blocked(url)
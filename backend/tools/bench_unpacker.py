@@ -0,0 +1,86 @@
+"""
+Micro-benchmark: shared packer module vs. the unpackers it replaced.
+Run from backend/: python tools/bench_unpacker.py
+"""
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from scraper.extractors import packer
+
+def legacy_okprime(packed_str):
+    """OkPrimeExtractor._decode_packed before the shared unpacker."""
+    pattern = r"\}\s*\(\s*['\"](.*?)['\"]\s*,\s*(\d+)\s*,\s*(\d+)\s*,\s*['\"](.*?)['\"]\s*\.\s*split\s*\(\s*['\"]\|['\"]\s*\)"
+    match = re.search(pattern, packed_str)
+    if not match:
+        return None
+    p, a, c, k = match.group(1), int(match.group(2)), int(match.group(3)), match.group(4).split('|')
+
+    def baseN(num, b):
+        return ((num == 0) and "0") or \
+               (baseN(num // b, b).lstrip("0") + "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"[num % b])
+
+    d = {}
+    for i in range(c):
+        key = baseN(i, a)
+        if i < len(k):
+            d[key] = k[i] if k[i] else key
+    return re.sub(r"\b\w+\b", lambda m: d.get(m.group(0), m.group(0)), p)
+
+def legacy_multilevel(text):
+    """The generic fallback's 5-level loop before unpack_all()."""
+    all_text = text
+    for _ in range(5):
+        if "eval(function(p,a,c,k,e,d)" not in all_text:
+            break
+        packed_matches = re.findall(r'eval\(function\(p,a,c,k,e,d\).+?split\([\'"]\|[\'"]\)\)', all_text, re.DOTALL)
+        new_text = "".join(u for u in (legacy_okprime(p) for p in packed_matches) if u)
+        if not new_text or new_text in all_text:
+            break
+        all_text += "\n" + new_text
+    return all_text
+
+def pack(source, radix=62):
+    """Minimal p.a.c.k.e.r. encoder used to build benchmark input."""
+    words = []
+    for w in re.findall(r"\b\w+\b", source):
+        if w not in words:
+            words.append(w)
+    index = {w: packer.to_base(i, radix) for i, w in enumerate(words)}
+    payload = re.sub(r"\b\w+\b", lambda m: index[m.group(0)], source).replace("'", "\\'")
+    return ("eval(function(p,a,c,k,e,d){while(c--)if(k[c])p=p.replace(new RegExp('\\\\b'+c.toString(a)+'\\\\b','g'),k[c]);return p}"
+            f"('{payload}',{radix},{len(words)},'{'|'.join(words)}'.split('|')))")
+
+def make_page(n_vars=1500):
+    body = ";".join(f"var v{i}=\"https://cdn{i % 7}.example.net/hls/seg_{i}/index.m3u8\"" for i in range(n_vars))
+    player = 'jwplayer("vplayer").setup({sources:[{file:"https://edge.example.net/master.m3u8"}]})'
+    return "<html><script>" + pack(body + ";" + player) + "</script><script>" + pack(pack(player)) + "</script></html>"
+
+def main():
+    page = make_page()
+    block = re.findall(r'eval\(function\(p,a,c,k,e,d\).+?split\([\'"]\|[\'"]\)\)', page, re.DOTALL)[0]
+    assert packer.unpack(block) == legacy_okprime(block), "single-block output differs"
+    assert "master.m3u8" in packer.unpack_all(page)
+    print(f"page: {len(page) / 1024:.0f} KiB")
+
+    def uncached():
+        packer._cache.clear()
+        return packer.unpack(block)
+
+    cases = (
+        ("legacy single block", lambda: legacy_okprime(block)),
+        ("packer single block", uncached),
+        ("packer memoised hit", lambda: packer.unpack(block)),
+        ("legacy 5-level loop", lambda: legacy_multilevel(page)),
+        ("packer unpack_all", lambda: (packer._cache.clear(), packer.unpack_all(page))),
+    )
+    for name, fn in cases:
+        runs = 20
+        seconds = timeit.timeit(fn, number=runs) / runs
+        print(f"{name:<22} {seconds * 1000:8.2f} ms")
+
+if __name__ == "__main__":
+    main()